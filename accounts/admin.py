@@ -2,7 +2,9 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
 from django.utils.html import format_html
-from .models import UserProfile, WishlistItem, CustomerInquiry
+from gallery.changelist import LargeTableAdminMixin
+from .inquiries import DuplicateListFilter, annotate_cluster_size, bulk_update_status
+from .models import UserProfile, WishlistItem, CustomerInquiry, Newsletter
 
 
 class UserProfileInline(admin.StackedInline):
@@ -29,6 +31,7 @@ class UserProfileInline(admin.StackedInline):
 class ExtendedUserAdmin(UserAdmin):
     inlines = (UserProfileInline,)
     list_display = UserAdmin.list_display + ('profile_complete', 'newsletter_subscriber')
+    list_select_related = ('profile',)
     
     def profile_complete(self, obj):
         if hasattr(obj, 'profile'):
@@ -58,7 +61,7 @@ class UserProfileAdmin(admin.ModelAdmin):
                   'preferred_currency', 'country', 'created_at']
     search_fields = ['user__username', 'user__email', 'user__first_name', 
                     'user__last_name', 'phone', 'city']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['avatar_preview', 'created_at', 'updated_at']
     
     fieldsets = (
         ('User', {
@@ -75,7 +78,7 @@ class UserProfileAdmin(admin.ModelAdmin):
             'fields': ('newsletter_subscription', 'email_notifications', 'preferred_currency')
         }),
         ('Profile', {
-            'fields': ('profile_image', 'bio')
+            'fields': ('profile_image', 'avatar_preview', 'bio')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -83,6 +86,14 @@ class UserProfileAdmin(admin.ModelAdmin):
         }),
     )
 
+    
+    def avatar_preview(self, obj):
+        if not obj.profile_image:
+            return '-'
+        pending = ' (processing)' if obj.avatar_pending else ''
+        return format_html('<img src="{}" width="96" height="96" style="object-fit: cover;">{}',
+                           obj.avatar_medium_url, pending)
+    avatar_preview.short_description = 'Avatar'
 
 @admin.register(WishlistItem)
 class WishlistItemAdmin(admin.ModelAdmin):
@@ -102,10 +113,11 @@ class WishlistItemAdmin(admin.ModelAdmin):
 
 
 @admin.register(CustomerInquiry)
-class CustomerInquiryAdmin(admin.ModelAdmin):
+class CustomerInquiryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'inquiry_type', 'subject', 'status', 
-                   'related_artwork', 'created_at']
-    list_filter = ['inquiry_type', 'status', 'created_at']
+                   'related_artwork', 'duplicates', 'created_at']
+    list_filter = ['status', DuplicateListFilter, 'inquiry_type', 'created_at']
+    list_select_related = ['related_artwork']
     search_fields = ['name', 'email', 'subject', 'message']
     readonly_fields = ['created_at', 'updated_at']
     
@@ -132,15 +144,62 @@ class CustomerInquiryAdmin(admin.ModelAdmin):
             obj.response_date = timezone.now()
         super().save_model(request, obj, form, change)
     
-    actions = ['mark_as_resolved', 'mark_as_in_progress']
+    def get_queryset(self, request):
+        return annotate_cluster_size(super().get_queryset(request))
+    
+    def duplicates(self, obj):
+        return obj.cluster_size - 1 if getattr(obj, 'cluster_size', None) else 0
+    duplicates.short_description = 'Repeats'
+    
+    actions = ['mark_as_resolved', 'mark_as_in_progress', 'resolve_with_duplicates', 'close_with_duplicates']
     
     def mark_as_resolved(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.update(status='resolved', response_date=timezone.now())
+        updated = bulk_update_status(queryset, status='resolved', responded=True)
         self.message_user(request, f'{updated} inquiries marked as resolved.')
     mark_as_resolved.short_description = 'Mark selected inquiries as resolved'
     
     def mark_as_in_progress(self, request, queryset):
-        updated = queryset.update(status='in_progress')
+        updated = bulk_update_status(queryset, status='in_progress')
         self.message_user(request, f'{updated} inquiries marked as in progress.')
     mark_as_in_progress.short_description = 'Mark selected inquiries as in progress'
+    
+    def resolve_with_duplicates(self, request, queryset):
+        updated = bulk_update_status(queryset, include_duplicates=True, status='resolved', responded=True)
+        self.message_user(request, f'{updated} inquiries (including repeats) marked as resolved.')
+    resolve_with_duplicates.short_description = 'Resolve selected inquiries and their repeats'
+    
+    def close_with_duplicates(self, request, queryset):
+        updated = bulk_update_status(queryset, include_duplicates=True, status='closed', responded=True)
+        self.message_user(request, f'{updated} inquiries (including repeats) closed.')
+    close_with_duplicates.short_description = 'Close selected inquiries and their repeats (spam)'
+
+
+@admin.register(Newsletter)
+class NewsletterAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'sent_count', 'failed_count', 'started_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    readonly_fields = ['status', 'last_user_id', 'sent_count', 'failed_count', 'started_at',
+                       'finished_at', 'last_error', 'created_at', 'updated_at']
+    
+    fieldsets = (
+        ('Content', {
+            'fields': ('subject', 'body')
+        }),
+        ('Delivery', {
+            'fields': ('status', 'sent_count', 'failed_count', 'last_user_id',
+                      'started_at', 'finished_at', 'last_error')
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    actions = ['queue_for_sending']
+    
+    def queue_for_sending(self, request, queryset):
+        # The send_newsletters worker picks these up; failed sends resume where they stopped
+        updated = queryset.filter(status__in=['draft', 'failed']).update(status='queued')
+        self.message_user(request, f'{updated} newsletters queued for sending.')
+    queue_for_sending.short_description = 'Queue selected newsletters for sending'
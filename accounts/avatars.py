@@ -0,0 +1,128 @@
+"""
+Background processing of uploaded profile images.
+
+edit_profile only stores the upload and marks the profile avatar_pending. After
+the transaction commits, the profile id is handed to a small thread pool which:
+
+- applies the EXIF orientation, then re-encodes the image without any EXIF
+  (phone photos carry GPS coordinates), capped at MAX_SIZE pixels;
+- stores square small and medium variants next to it;
+- swaps the new files in with a conditional UPDATE, so an upload that arrived
+  in the meantime is never overwritten, and deletes the files replaced.
+
+Profiles left pending by a restarted process are picked up by the
+process_avatars management command.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+MAX_SIZE = 1600
+VARIANTS = {
+    'avatar_small': 96,
+    'avatar_medium': 320,
+}
+JPEG_QUALITY = 85
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='avatars')
+
+
+def _encode(image):
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def render_variants(fileobj):
+    """Return {field name: JPEG bytes} for the cleaned original and every variant"""
+    from PIL import Image, ImageOps
+
+    with Image.open(fileobj) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+
+    original = image.copy()
+    original.thumbnail((MAX_SIZE, MAX_SIZE))
+    rendered = {'profile_image': _encode(original)}
+    for field_name, size in VARIANTS.items():
+        rendered[field_name] = _encode(ImageOps.fit(image, (size, size), Image.LANCZOS))
+    return rendered
+
+
+def process_avatar(profile_id):
+    """Process one pending profile image; returns True if new files were stored"""
+    profile = UserProfile.objects.filter(pk=profile_id, avatar_pending=True).first()
+    if profile is None:
+        return False
+    if not profile.profile_image:
+        UserProfile.objects.filter(pk=profile_id).update(avatar_pending=False)
+        return False
+
+    uploaded_name = profile.profile_image.name
+    try:
+        with profile.profile_image.open('rb') as fh:
+            rendered = render_variants(fh)
+    except Exception:
+        logger.exception("Could not process profile image %s of profile %s", uploaded_name, profile_id)
+        UserProfile.objects.filter(pk=profile_id, profile_image=uploaded_name).update(avatar_pending=False)
+        return False
+
+    stem = os.path.splitext(os.path.basename(uploaded_name))[0]
+    stored = {}
+    for field_name, data in rendered.items():
+        field = profile._meta.get_field(field_name)
+        name = field.generate_filename(profile, f'{stem}.jpg')
+        stored[field_name] = field.storage.save(name, ContentFile(data))
+
+    replaced = [getattr(profile, name).name for name in VARIANTS if getattr(profile, name)]
+    updated = UserProfile.objects.filter(pk=profile_id, profile_image=uploaded_name).update(
+        avatar_pending=False, **stored
+    )
+    storage = profile.profile_image.storage
+    if not updated:
+        # A newer upload replaced this one while we worked; its own job handles it
+        for name in stored.values():
+            storage.delete(name)
+        return False
+
+    for name in [uploaded_name, *replaced]:
+        if name not in stored.values():
+            storage.delete(name)
+    return True
+
+
+def _run(profile_id):
+    close_old_connections()
+    try:
+        process_avatar(profile_id)
+    except Exception:
+        logger.exception("Avatar processing failed for profile %s", profile_id)
+    finally:
+        close_old_connections()
+
+
+def process_async(profile_id):
+    """Queue a profile for processing in the background thread pool"""
+    _executor.submit(_run, profile_id)
+
+
+def process_pending(limit=100):
+    """Process profiles still marked pending; returns how many were processed"""
+    processed = 0
+    for profile_id in UserProfile.objects.filter(avatar_pending=True).values_list('pk', flat=True)[:limit]:
+        processed += process_avatar(profile_id)
+    return processed
@@ -1,18 +1,42 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.core.exceptions import PermissionDenied
+from .models import LoginEmail, normalize_login_email
+from .throttling import allow_login
 
 
 class EmailBackend(ModelBackend):
     """
     Custom authentication backend that allows users to log in using their email address.
+    
+    Emails are looked up in the indexed LoginEmail table (case-insensitive), with
+    the (also indexed) username as the fallback. Throttled attempts are refused
+    before any password hashing.
     """
     
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # Try to find the user by email first, then by username
-            user = User.objects.get(Q(email=username) | Q(username=username))
-        except User.DoesNotExist:
+        if username is None or password is None:
+            return None
+        
+        if not allow_login(request, username):
+            if request is not None:
+                request.login_throttled = True
+            # Stops django.contrib.auth.authenticate() from trying any other backend
+            raise PermissionDenied
+        
+        user = None
+        if '@' in username:
+            login_email = LoginEmail.objects.select_related('user').filter(
+                email=normalize_login_email(username)
+            ).first()
+            if login_email:
+                user = login_email.user
+        if user is None:
+            user = User.objects.filter(username=username).first()
+        
+        if user is None:
+            # Run the password hasher anyway so a miss takes as long as a wrong password
+            User().set_password(password)
             return None
         
         # Check the password
@@ -25,4 +49,4 @@ class EmailBackend(ModelBackend):
         try:
             return User.objects.get(pk=user_id)
         except User.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
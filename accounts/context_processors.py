@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+
+from .wishlist import wishlisted_artwork_ids
+
+
+def wishlist_context(request):
+    """Add the ids of the user's wishlisted artworks to all templates (loaded only when used)"""
+    return {
+        'wishlisted_artwork_ids': SimpleLazyObject(lambda: wishlisted_artwork_ids(request.user))
+    }
@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from .models import UserProfile
+from .models import LoginEmail, UserProfile, get_profile, normalize_login_email
 
 
 class EmailAuthenticationForm(AuthenticationForm):
@@ -24,6 +24,14 @@ class EmailAuthenticationForm(AuthenticationForm):
         super().__init__(*args, **kwargs)
         self.fields['username'].label = 'Email Address'
 
+    def get_invalid_login_error(self):
+        if getattr(self.request, 'login_throttled', False):
+            return forms.ValidationError(
+                "Too many login attempts. Please wait a few minutes and try again.",
+                code='throttled',
+            )
+        return super().get_invalid_login_error()
+
 
 class CustomUserCreationForm(UserCreationForm):
     """Custom registration form with email as username"""
@@ -81,7 +89,7 @@ class CustomUserCreationForm(UserCreationForm):
 
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
+        if LoginEmail.objects.filter(email=normalize_login_email(email)).exists():
             raise forms.ValidationError("A user with this email already exists.")
         return email
 
@@ -94,8 +102,8 @@ class CustomUserCreationForm(UserCreationForm):
         
         if commit:
             user.save()
-            # Create or update the user profile with phone number
-            profile, created = UserProfile.objects.get_or_create(user=user)
+            # Fill in the phone number on the profile created for the new user
+            profile = get_profile(user)
             profile.phone = self.cleaned_data['phone']
             profile.save()
         
@@ -0,0 +1,83 @@
+"""
+Triage helpers for CustomerInquiry and pages.ContactSubmission.
+
+Every inquiry carries a dedup_key: a hash of the sender's email and the
+normalized subject. Repeat submissions (a visitor pressing send five times,
+or a spam run) share a key and form a cluster. The admin shows the cluster
+size, can hide the repeats, and can update a whole cluster with one UPDATE.
+"""
+import hashlib
+import re
+
+from django.contrib import admin
+from django.db.models import Count, DateTimeField, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+_REPLY_PREFIX = re.compile(r'^\s*((re|fwd?|aw)\s*:\s*)+', re.IGNORECASE)
+
+
+def dedup_key(email, subject):
+    """Hash identifying repeat submissions from the same sender about the same thing"""
+    email = (email or '').strip().lower()
+    subject = _REPLY_PREFIX.sub('', subject or '')
+    subject = ' '.join(subject.lower().split())
+    return hashlib.sha256(f'{email}\n{subject}'.encode()).hexdigest()
+
+
+# The selection is materialized first: MySQL can't UPDATE a table filtered by a
+# subquery on the same table (the admin's duplicate filter and cluster lookups are)
+UPDATE_CHUNK = 1000
+
+
+def bulk_update_status(queryset, include_duplicates=False, responded=False, **fields):
+    """Set-based update of the selection (optionally with every row in the same clusters)
+
+    responded=True stamps response_date on the rows that don't have one yet.
+    """
+    now = timezone.now()
+    manager = queryset.model._default_manager
+    if include_duplicates:
+        lookup = 'dedup_key__in'
+        values = list(queryset.order_by().values_list('dedup_key', flat=True).distinct())
+    else:
+        lookup = 'pk__in'
+        values = list(queryset.order_by().values_list('pk', flat=True))
+    if responded:
+        fields['response_date'] = Coalesce('response_date', Value(now, output_field=DateTimeField()))
+
+    updated = 0
+    for start in range(0, len(values), UPDATE_CHUNK):
+        # update() bypasses auto_now
+        updated += manager.filter(**{lookup: values[start:start + UPDATE_CHUNK]}).update(updated_at=now, **fields)
+    return updated
+
+
+def annotate_cluster_size(queryset):
+    """Add cluster_size: how many rows share each row's dedup key"""
+    model = queryset.model
+    cluster = model._default_manager.filter(dedup_key=OuterRef('dedup_key')).order_by().values('dedup_key')
+    return queryset.annotate(cluster_size=Subquery(cluster.annotate(size=Count('*')).values('size')))
+
+
+class DuplicateListFilter(admin.SimpleListFilter):
+    """Hide repeat submissions (show the first of each cluster), or show only the repeats"""
+    title = 'duplicates'
+    parameter_name = 'duplicates'
+
+    def lookups(self, request, model_admin):
+        return [
+            ('first', 'First of each cluster'),
+            ('repeats', 'Repeats only'),
+        ]
+
+    def queryset(self, request, queryset):
+        earlier = queryset.model._default_manager.filter(
+            dedup_key=OuterRef('dedup_key'),
+            created_at__lt=OuterRef('created_at'),
+        )
+        if self.value() == 'first':
+            return queryset.filter(~Exists(earlier))
+        if self.value() == 'repeats':
+            return queryset.filter(Exists(earlier))
+        return queryset
@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Share of requests per kind, roughly what the access logs show
+REQUEST_MIX = {
+    'anonymous_browse': 0.50,   # gallery pages, no session cookie
+    'authenticated_page': 0.35, # session loaded, nothing changed
+    'cart_write': 0.10,         # anonymous add-to-cart, new session
+    'login': 0.05,              # key cycled and session rewritten
+}
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a synthetic request mix against each session backend and report time and '
+        'database queries per request. Uses the configured database and session cache, and '
+        'removes the sessions it creates.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per backend')
+        parser.add_argument('--users', type=int, default=200, help='Logged-in sessions to start with')
+        parser.add_argument('--engines', nargs='+', choices=sorted(settings.SESSION_ENGINES),
+                            default=sorted(settings.SESSION_ENGINES))
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['users'] < 1:
+            raise CommandError('--requests and --users must be positive')
+
+        self.stdout.write(f"Session cache: {settings.CACHES[settings.SESSION_CACHE_ALIAS]['BACKEND']}")
+        self.stdout.write(f"{'backend':<16}{'ms/req':>9}{'p95 ms':>9}{'queries/req':>13}{'writes/req':>12}")
+        for name in options['engines']:
+            result = self.run_engine(settings.SESSION_ENGINES[name], options)
+            self.stdout.write(
+                f"{name:<16}{result['mean_ms']:>9.3f}{result['p95_ms']:>9.3f}"
+                f"{result['queries']:>13.2f}{result['writes']:>12.2f}"
+            )
+
+    def run_engine(self, engine, options):
+        SessionStore = import_module(engine).SessionStore
+        rng = random.Random(options['seed'])
+        kinds, weights = zip(*REQUEST_MIX.items())
+
+        created = []
+        users = []
+        for i in range(options['users']):
+            store = SessionStore()
+            store['_auth_user_id'] = str(i + 1)
+            store.save()
+            users.append(store.session_key)
+            created.append(store.session_key)
+
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for kind in rng.choices(kinds, weights, k=options['requests']):
+                started = time.perf_counter()
+                if kind == 'anonymous_browse':
+                    SessionStore().get('cart_key')
+                elif kind == 'authenticated_page':
+                    SessionStore(rng.choice(users)).get('_auth_user_id')
+                elif kind == 'cart_write':
+                    store = SessionStore()
+                    store['cart_key'] = f'{rng.getrandbits(128):032x}'
+                    store.save()
+                    created.append(store.session_key)
+                else:
+                    index = rng.randrange(len(users))
+                    store = SessionStore(users[index])
+                    store.cycle_key()
+                    store['_auth_user_id'] = str(index + 1)
+                    store.save()
+                    users[index] = store.session_key
+                    created.append(store.session_key)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        for session_key in created:
+            SessionStore(session_key).delete()
+
+        statements = [q['sql'].lstrip().upper() for q in queries.captured_queries]
+        timings.sort()
+        return {
+            'mean_ms': statistics.fmean(timings),
+            'p95_ms': timings[int(len(timings) * 0.95) - 1 if len(timings) > 1 else 0],
+            'queries': len(statements) / len(timings),
+            'writes': sum(s.startswith(WRITE_PREFIXES) for s in statements) / len(timings),
+        }
@@ -0,0 +1,28 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand
+
+from accounts.newsletter import audience_batches
+
+
+class Command(BaseCommand):
+    help = 'Write the newsletter audience (user id, email, currency) as CSV, reading it in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='CSV file to write (default: stdout)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fh = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            writer = csv.writer(fh)
+            writer.writerow(['user_id', 'email', 'currency'])
+            count = 0
+            for batch in audience_batches(options['batch_size']):
+                writer.writerows(batch)
+                count += len(batch)
+        finally:
+            if options['output']:
+                fh.close()
+        self.stderr.write(f'Exported {count} subscribers')
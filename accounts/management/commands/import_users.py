@@ -0,0 +1,108 @@
+import csv
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from accounts.models import LoginEmail, UserProfile, normalize_login_email
+
+PROFILE_FIELDS = [
+    'phone', 'address_line_1', 'address_line_2', 'city', 'state', 'postal_code', 'country',
+    'preferred_currency', 'bio',
+]
+BOOLEAN_PROFILE_FIELDS = ['newsletter_subscription', 'email_notifications']
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import customers from a CSV (email, first_name, last_name, password and any '
+        'UserProfile columns). Users, profiles and login emails are inserted in batches '
+        'without per-row signals.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='CSV file with a header row; only "email" is required')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as fh:
+                rows = list(csv.DictReader(fh))
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["csv_file"]}: {e}')
+
+        rows, skipped = self.clean_rows(rows)
+        for message in skipped:
+            self.stderr.write(message)
+
+        batch_size = options['batch_size']
+        created = 0
+        for start in range(0, len(rows), batch_size):
+            with transaction.atomic():
+                created += self.import_batch(rows[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f'Imported {created} users ({len(skipped)} rows skipped)'))
+
+    def clean_rows(self, rows):
+        """Drop rows with bad or already-registered emails; returns (rows, messages)"""
+        skipped = []
+        seen = set()
+        valid = []
+        for line, row in enumerate(rows, start=2):
+            email = normalize_login_email(row.get('email'))
+            try:
+                validate_email(email)
+            except ValidationError:
+                skipped.append(f'Row {line}: invalid email "{row.get("email", "")}"')
+                continue
+            if email in seen:
+                skipped.append(f'Row {line}: duplicate email "{email}"')
+                continue
+            seen.add(email)
+            valid.append((line, email, row))
+
+        existing = set()
+        emails = [email for _, email, _ in valid]
+        for start in range(0, len(emails), 1000):
+            chunk = emails[start:start + 1000]
+            existing.update(LoginEmail.objects.filter(email__in=chunk).values_list('email', flat=True))
+            existing.update(e.lower() for e in User.objects.filter(username__in=chunk).values_list('username', flat=True))
+
+        cleaned = []
+        for line, email, row in valid:
+            if email in existing:
+                skipped.append(f'Row {line}: "{email}" is already registered')
+            else:
+                cleaned.append((email, row))
+        return cleaned, skipped
+
+    def import_batch(self, batch):
+        users = []
+        for email, row in batch:
+            password = row.get('password', '').strip()
+            users.append(User(
+                username=email,
+                email=email,
+                first_name=row.get('first_name', '').strip()[:150],
+                last_name=row.get('last_name', '').strip()[:150],
+                # Without a password the customer sets one through password reset
+                password=make_password(password or None),
+            ))
+        User.objects.bulk_create(users)
+
+        # MySQL does not return ids from bulk inserts; usernames are unique
+        ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'pk'))
+
+        profiles = []
+        for email, row in batch:
+            values = {f: row[f].strip() for f in PROFILE_FIELDS if row.get(f, '').strip()}
+            values.update({
+                f: row[f].strip().lower() in ('1', 'true', 'yes', 'y')
+                for f in BOOLEAN_PROFILE_FIELDS if row.get(f, '').strip()
+            })
+            profiles.append(UserProfile(user_id=ids[email], **values))
+        UserProfile.objects.bulk_create(profiles)
+        LoginEmail.objects.bulk_create([LoginEmail(user_id=ids[email], email=email) for email, _ in batch])
+        return len(users)
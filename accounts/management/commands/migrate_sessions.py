@@ -0,0 +1,77 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# Per-process or discarding caches lose the sessions; the others cull entries past MAX_ENTRIES
+UNSAFE_BACKENDS = (LocMemCache, DummyCache, DatabaseCache, FileBasedCache)
+
+
+class Command(BaseCommand):
+    help = (
+        'One-off step after switching SESSION_STORE to cache: move live sessions from the '
+        'django_session table into the session cache, so nobody is logged out'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        engine = settings.SESSION_ENGINE
+        if engine.endswith('.db') or engine.endswith('.cached_db'):
+            self.stdout.write('Sessions are read from the database, nothing to copy.')
+            return
+        if engine.endswith('.signed_cookies'):
+            self.stdout.write(self.style.WARNING(
+                'Signed-cookie sessions live in the browser; database sessions cannot be moved '
+                'there. Visitors will have to log in again. Run clearsessions to empty the table.'
+            ))
+            return
+
+        SessionStore = import_module(engine).SessionStore
+        cache = caches[settings.SESSION_CACHE_ALIAS]
+        if isinstance(cache, UNSAFE_BACKENDS):
+            raise CommandError(
+                f'The {settings.SESSION_CACHE_ALIAS!r} cache ({type(cache).__name__}) would lose or cull sessions. '
+                'Point SESSION_CACHE_BACKEND at redis or memcached before moving sessions into it.'
+            )
+        now = timezone.now()
+
+        # Rows are deleted once their copy has been read back: the cache is the only store from now
+        # on, and a row left behind would bring back a session that was since logged out on a re-run
+        moved = failed = 0
+        last_key = ''
+        while True:
+            batch = list(Session.objects.filter(expire_date__gt=now, pk__gt=last_key).order_by('pk')[
+                :options['batch_size']
+            ])
+            if not batch:
+                break
+            last_key = batch[-1].pk
+
+            copies = {}
+            for session in batch:
+                timeout = int((session.expire_date - now).total_seconds())
+                if timeout > 0:
+                    cache_key = SessionStore(session_key=session.session_key).cache_key
+                    copies[cache_key] = (session, session.get_decoded())
+                    cache.set(cache_key, copies[cache_key][1], timeout)
+            stored = cache.get_many(list(copies))
+            verified = [session.pk for key, (session, data) in copies.items() if stored.get(key) == data]
+            Session.objects.filter(pk__in=verified).delete()
+            moved += len(verified)
+            failed += len(copies) - len(verified)
+        expired, _ = Session.objects.filter(expire_date__lte=now).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} live sessions into {engine}, deleted {expired} expired rows'
+        ))
+        if failed:
+            raise CommandError(f'{failed} sessions could not be read back from the cache and were kept; run again')
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Process profile images still waiting for their avatar variants (e.g. after a restart)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and check every N seconds (default: once and exit)')
+        parser.add_argument('--limit', type=int, default=100, help='Profiles per pass')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending(options['limit'])
+            self.stdout.write(f'Processed {processed} profile images')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.newsletter import process_queue
+
+
+class Command(BaseCommand):
+    help = 'Send queued newsletters and resume interrupted ones (run from cron, or with --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and check the queue every N seconds (default: once and exit)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Subscribers per audience query')
+        parser.add_argument('--rate', type=float, default=None, help='Maximum messages per second')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = process_queue(options['batch_size'], options['rate'])
+            if sent is None:
+                self.stdout.write('Another worker is sending newsletters')
+            else:
+                self.stdout.write(f'Sent {sent} newsletter emails')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.notifications import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Fan out wishlist price-drop/restock events and email per-user digests (run from cron, or with --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and process the outbox every N seconds (default: once and exit)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per fan-out insert')
+        parser.add_argument('--digest-batch-size', type=int, default=100, help='Users per batch of digest emails')
+
+    def handle(self, *args, **options):
+        while True:
+            result = process_outbox(options['batch_size'], options['digest_batch_size'])
+            if result is None:
+                self.stdout.write('Another worker is processing the outbox')
+            else:
+                self.stdout.write(f"Queued {result['queued']} notifications, sent {result['emails']} digest emails")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,94 @@
+import socketserver
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept mail from smtplib and write each message to a file"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 localhost smtp sink ready')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.partition(':')[2].strip(' <>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for raw in self.rfile:
+                    if raw in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(raw[1:] if raw.startswith(b'..') else raw)
+                self.server.store(recipients, b''.join(data))
+                self.reply('250 OK')
+            elif verb == 'RSET':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSinkServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, directory, stdout):
+        super().__init__(address, SMTPSinkHandler)
+        self.directory = directory
+        self.stdout = stdout
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def store(self, recipients, data):
+        with self.lock:
+            self.count += 1
+            count = self.count
+        path = self.directory / f'{datetime.now():%Y%m%d-%H%M%S}-{count:06d}.eml'
+        path.write_bytes(data)
+        self.stdout.write(f"#{count} to {', '.join(recipients)} -> {path.name}")
+
+
+class Command(BaseCommand):
+    help = (
+        'Local stand-in SMTP server for testing outgoing mail: accepts every message and saves '
+        'it as an .eml file. Use with EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend, '
+        'EMAIL_HOST=localhost, EMAIL_PORT=1025.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1025)
+        parser.add_argument('--directory', default='sent_mail', help='Where to save received messages')
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory'])
+        directory.mkdir(parents=True, exist_ok=True)
+        with SMTPSinkServer((options['host'], options['port']), directory, self.stdout) as server:
+            self.stdout.write(f"SMTP sink listening on {options['host']}:{options['port']}, saving to {directory}/")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
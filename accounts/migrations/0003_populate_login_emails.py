@@ -0,0 +1,34 @@
+# Generated manually to index the emails of existing users
+
+from django.db import migrations
+
+
+def populate_login_emails(apps, schema_editor):
+    """Create a LoginEmail for every user with an email; the oldest account wins on collisions"""
+    User = apps.get_model('auth', 'User')
+    LoginEmail = apps.get_model('accounts', 'LoginEmail')
+    
+    seen = set()
+    batch = []
+    for user_id, email in User.objects.exclude(email='').order_by('pk').values_list('pk', 'email').iterator():
+        email = email.strip().lower()
+        if not email or email in seen:
+            continue
+        seen.add(email)
+        batch.append(LoginEmail(user_id=user_id, email=email))
+    LoginEmail.objects.bulk_create(batch, batch_size=1000)
+
+
+def clear_login_emails(apps, schema_editor):
+    apps.get_model('accounts', 'LoginEmail').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_loginemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_login_emails, clear_login_emails),
+    ]
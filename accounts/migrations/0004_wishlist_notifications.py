@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_populate_login_emails'),
+        ('gallery', '0005_sculptureimage_height_sculptureimage_width'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WishlistEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('price_drop', 'Price Drop'), ('back_in_stock', 'Back in Stock')], max_length=20)),
+                ('old_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('new_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('fanned_out_at', models.DateTimeField(blank=True, null=True)),
+                ('artwork', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wishlist_events', to='gallery.artwork')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WishlistNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='accounts.wishlistevent')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wishlist_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='wishlistevent',
+            index=models.Index(fields=['fanned_out_at', 'created_at'], name='accounts_wi_fanned__e60d60_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlistnotification',
+            index=models.Index(fields=['sent_at', 'user'], name='accounts_wi_sent_at_c76c88_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='wishlistnotification',
+            unique_together={('user', 'event')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_wishlist_notifications'),
+        ('gallery', '0005_sculptureimage_height_sculptureimage_width'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerinquiry',
+            name='dedup_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='customerinquiry',
+            index=models.Index(fields=['-created_at', '-id'], name='accounts_cu_created_eeb86a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerinquiry',
+            index=models.Index(fields=['status', 'created_at'], name='accounts_cu_status_6aa1a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerinquiry',
+            index=models.Index(fields=['dedup_key', 'created_at'], name='accounts_cu_dedup_k_20ee70_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated manually to cluster existing inquiries
+
+import hashlib
+import re
+
+from django.db import migrations
+
+_REPLY_PREFIX = re.compile(r'^\s*((re|fwd?|aw)\s*:\s*)+', re.IGNORECASE)
+
+
+def dedup_key(email, subject):
+    """Copy of accounts.inquiries.dedup_key as it was when this migration was written"""
+    email = (email or '').strip().lower()
+    subject = _REPLY_PREFIX.sub('', subject or '')
+    subject = ' '.join(subject.lower().split())
+    return hashlib.sha256(f'{email}\n{subject}'.encode()).hexdigest()
+
+
+def backfill_dedup_keys(apps, schema_editor):
+    """Compute dedup_key for inquiries created before the field existed"""
+    CustomerInquiry = apps.get_model('accounts', 'CustomerInquiry')
+    
+    batch = []
+    for inquiry in CustomerInquiry.objects.filter(dedup_key='').only('pk', 'email', 'subject').iterator():
+        inquiry.dedup_key = dedup_key(inquiry.email, inquiry.subject)
+        batch.append(inquiry)
+        if len(batch) >= 1000:
+            CustomerInquiry.objects.bulk_update(batch, ['dedup_key'])
+            batch = []
+    CustomerInquiry.objects.bulk_update(batch, ['dedup_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_inquiry_triage'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_dedup_keys, migrations.RunPython.noop),
+    ]
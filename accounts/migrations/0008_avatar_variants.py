@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_newsletter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_medium',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profiles/medium/'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_pending',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_small',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profiles/small/'),
+        ),
+    ]
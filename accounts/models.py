@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.core.exceptions import ValidationError
+from django.template import Template, TemplateSyntaxError
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from gallery.models import TimestampedModel
+from gallery.models import Artwork, TimestampedModel
 
 
 class UserProfile(TimestampedModel):
@@ -31,15 +33,87 @@ class UserProfile(TimestampedModel):
         ('CAD', 'Canadian Dollar'),
     ])
     
-    # Profile image
+    # Profile image; the upload is stored as-is and a background worker strips EXIF,
+    # downsizes it and fills in the avatar variants (see accounts.avatars)
     profile_image = models.ImageField(upload_to='profiles/', null=True, blank=True)
+    avatar_small = models.ImageField(upload_to='profiles/small/', null=True, blank=True, editable=False)
+    avatar_medium = models.ImageField(upload_to='profiles/medium/', null=True, blank=True, editable=False)
+    avatar_pending = models.BooleanField(default=False, editable=False)
     
     # Bio for art collectors/enthusiasts
     bio = models.TextField(blank=True, help_text="Tell us about your interest in art")
     
+    class Meta:
+        # Newsletter audience: subscribed profiles walked in user id order
+        indexes = [models.Index(fields=['newsletter_subscription', 'user'])]
+    
     def __str__(self):
         return f"{self.user.username}'s Profile"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def get_dirty_fields(self):
+        """Names of fields changed since the profile was loaded from the database"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.attname not in loaded or field.primary_key:
+                continue
+            value = getattr(self, field.attname)
+            if isinstance(field, models.FileField) and value and not value._committed:
+                dirty.append(field.name)  # a freshly uploaded file, even if the name is unchanged
+            elif field.get_prep_value(value) != field.get_prep_value(loaded[field.attname]):
+                dirty.append(field.name)
+        return dirty
+    
+    def save(self, *args, **kwargs):
+        # Only write the columns that actually changed; skip the UPDATE when nothing did
+        if self._state.adding:
+            image_changed = True
+        elif kwargs.get('update_fields') is not None:
+            image_changed = 'profile_image' in kwargs['update_fields']
+        else:
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                kwargs['update_fields'] = dirty + ['updated_at']
+            image_changed = dirty is None or 'profile_image' in dirty
+        
+        if image_changed and kwargs.get('update_fields') is not None:
+            # A new list, the caller's may be a tuple or reused
+            kwargs['update_fields'] = [*kwargs['update_fields'], 'avatar_pending', 'avatar_small', 'avatar_medium']
+        if image_changed:
+            # The old variants stay on show until the worker replaces them
+            self.avatar_pending = bool(self.profile_image)
+            if not self.profile_image:
+                self.avatar_small = self.avatar_medium = None
+        
+        super().save(*args, **kwargs)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+        
+        if image_changed and self.avatar_pending:
+            from .avatars import process_async
+            transaction.on_commit(lambda: process_async(self.pk))
+    
+    @property
+    def avatar_small_url(self):
+        """Small avatar, or the original until it has been processed"""
+        image = self.avatar_small or self.profile_image
+        return image.url if image else ''
+    
+    @property
+    def avatar_medium_url(self):
+        """Medium avatar, or the original until it has been processed"""
+        image = self.avatar_medium or self.profile_image
+        return image.url if image else ''
+    
     @property
     def full_name(self):
         return f"{self.user.first_name} {self.user.last_name}".strip() or self.user.username
@@ -51,18 +125,67 @@ class UserProfile(TimestampedModel):
         return all(field.strip() for field in required_fields)
 
 
+def get_profile(user):
+    """The user's profile, created on first use for accounts that don't have one yet"""
+    profile = getattr(user, 'profile', None) if User.profile.is_cached(user) else None
+    if profile is None:
+        profile, created = UserProfile.objects.get_or_create(user=user)
+        user.profile = profile
+    return profile
+
+
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
     """Automatically create profile when user is created"""
-    if created:
+    if created and not raw:
+        # Creating with user=instance also caches it as instance.profile
         UserProfile.objects.create(user=instance)
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Save profile when user is saved"""
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
+def save_user_profile(sender, instance, created, **kwargs):
+    """Save changes made through user.profile when the user is saved"""
+    # Never load the profile just to save it (e.g. the last_login update on every login);
+    # UserProfile.save() itself skips the UPDATE when no profile field changed
+    profile = getattr(instance, 'profile', None) if User.profile.is_cached(instance) else None
+    if not created and profile is not None:
+        profile.save()
+
+
+def normalize_login_email(email):
+    """Canonical form of an email used for login lookups"""
+    return (email or '').strip().lower()
+
+
+class LoginEmail(models.Model):
+    """Indexed, case-normalized copy of User.email used by the login backend"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='login_email')
+    email = models.CharField(max_length=254, unique=True)
+    
+    def __str__(self):
+        return self.email
+
+
+@receiver(post_save, sender=User)
+def sync_login_email(sender, instance, update_fields=None, **kwargs):
+    """Keep the login email in step with User.email"""
+    # Saves that don't touch the email (e.g. the last_login update on every login) are skipped
+    if update_fields is not None and 'email' not in update_fields:
+        return
+    
+    email = normalize_login_email(instance.email)
+    if not email:
+        LoginEmail.objects.filter(user=instance).delete()
+        return
+    
+    owner_id = LoginEmail.objects.filter(email=email).values_list('user_id', flat=True).first()
+    if owner_id == instance.pk:
+        return
+    if owner_id is not None:
+        # Another account already logs in with this address; this one keeps username login only
+        LoginEmail.objects.filter(user=instance).delete()
+        return
+    LoginEmail.objects.update_or_create(user=instance, defaults={'email': email})
 
 
 class WishlistItem(TimestampedModel):
@@ -83,6 +206,102 @@ class WishlistItem(TimestampedModel):
         return f"{self.user.username} - {self.artwork.title} ({self.get_item_type_display()})"
 
 
+@receiver(post_save, sender=WishlistItem)
+@receiver(post_delete, sender=WishlistItem)
+def invalidate_wishlist_cache(sender, instance, **kwargs):
+    """Drop the cached wishlist membership and profile summary of the item's user"""
+    from . import summary, wishlist
+    user_id = instance.user_id
+    
+    def invalidate():
+        wishlist.invalidate(user_id)
+        summary.invalidate(user_id)
+    
+    # After commit, or a request in between would cache the old wishlist again
+    transaction.on_commit(invalidate)
+
+
+class WishlistEvent(TimestampedModel):
+    """A price drop or restock of an artwork, waiting to be fanned out to wishlisting users"""
+    KIND_CHOICES = [
+        ('price_drop', 'Price Drop'),
+        ('back_in_stock', 'Back in Stock'),
+    ]
+    
+    artwork = models.ForeignKey('gallery.Artwork', on_delete=models.CASCADE, related_name='wishlist_events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    fanned_out_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['fanned_out_at', 'created_at'])]
+    
+    def __str__(self):
+        return f"{self.artwork} - {self.get_kind_display()}"
+
+
+class WishlistNotification(TimestampedModel):
+    """Outbox entry: one event for one user, sent with the user's next digest email"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wishlist_notifications')
+    event = models.ForeignKey(WishlistEvent, on_delete=models.CASCADE, related_name='notifications')
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        unique_together = ['user', 'event']
+        indexes = [models.Index(fields=['sent_at', 'user'])]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.event}"
+
+
+@receiver(post_save, sender=Artwork)
+def queue_wishlist_events(sender, instance, created, raw=False, **kwargs):
+    """Record price drops and restocks; the fan-out happens in the notification worker"""
+    if created or raw:
+        return
+    from .notifications import record_artwork_changes
+    record_artwork_changes(instance)
+
+
+class Newsletter(TimestampedModel):
+    """A newsletter issue and the progress of sending it"""
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=200)
+    body = models.TextField(help_text="Template text. Available: {{ site_name }}, {{ currency }}, "
+                                      "{{ site_url }}; rendered once per currency segment")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    
+    # Progress; recipients are sent in user id order so a stopped send can resume
+    last_user_id = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+    
+    def clean(self):
+        # Caught here rather than by the send_newsletters worker, once it is queued
+        try:
+            Template(self.body)
+        except TemplateSyntaxError as e:
+            raise ValidationError({'body': f"The template doesn't compile: {e}"})
+
+
 class CustomerInquiry(TimestampedModel):
     """Customer inquiries and contact form submissions"""
     INQUIRY_TYPES = [
@@ -121,9 +340,22 @@ class CustomerInquiry(TimestampedModel):
     # User reference (if logged in)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     
+    # Hash of email + normalized subject; repeat submissions share it
+    dedup_key = models.CharField(max_length=64, blank=True, editable=False)
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "Customer Inquiries"
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['dedup_key', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.subject} ({self.get_status_display()})"
+    
+    def save(self, *args, **kwargs):
+        from .inquiries import dedup_key
+        self.dedup_key = dedup_key(self.email, self.subject)
+        super().save(*args, **kwargs)
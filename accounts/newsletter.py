@@ -0,0 +1,165 @@
+"""
+Newsletter sending pipeline.
+
+Staff write a Newsletter in the admin and queue it; the send_newsletters
+worker (cron, or --interval) does the sending, so no web request ever waits
+on it.
+
+- The audience is walked in user id order, batch_size subscribed profiles at
+  a time, with a keyset query on the (newsletter_subscription, user) index.
+- The issue is rendered once per segment (the subscriber's currency), not
+  once per recipient.
+- Messages go out over one SMTP connection, throttled to `rate` per second.
+- Newsletter.last_user_id records progress after every batch and on errors,
+  so a stopped or crashed send resumes where it left off.
+
+For local testing, run `manage.py smtp_sink` and point EMAIL_BACKEND at the
+SMTP backend with EMAIL_HOST=localhost and EMAIL_PORT=1025.
+"""
+import logging
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Newsletter, UserProfile
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'accounts:newsletter:sending'
+LOCK_TIMEOUT = 60 * 60
+DEFAULTS = {
+    'batch_size': 200,
+    'rate': 10,  # messages per second
+}
+
+
+def _config():
+    return {**DEFAULTS, **getattr(settings, 'NEWSLETTER', {})}
+
+
+def audience(after_user_id=0):
+    """(user_id, email, currency) of subscribed, active users after the given id, in id order"""
+    return UserProfile.objects.filter(
+        newsletter_subscription=True,
+        user__is_active=True,
+        user_id__gt=after_user_id,
+    ).exclude(user__email='').order_by('user_id').values_list('user_id', 'user__email', 'preferred_currency')
+
+
+def audience_batches(batch_size, after_user_id=0):
+    """Yield lists of audience rows, one keyset query per batch"""
+    while True:
+        batch = list(audience(after_user_id)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        after_user_id = batch[-1][0]
+
+
+def newsletter_enabled():
+    from pages.site_settings import get_site_settings
+    site_settings = get_site_settings()
+    return site_settings is None or site_settings.enable_newsletter
+
+
+class SegmentRenderer:
+    """Renders a newsletter body once per segment and reuses it for every recipient in it"""
+
+    def __init__(self, newsletter):
+        from pages.site_settings import get_site_settings
+        self.newsletter = newsletter
+        self.template = Template(newsletter.body)
+        site_settings = get_site_settings()
+        self.site_name = site_settings.site_name if site_settings else 'Jasem Shuman Art'
+        self.site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+        self._rendered = {}
+
+    def render(self, currency):
+        if currency not in self._rendered:
+            context = {
+                'site_name': self.site_name,
+                'site_url': self.site_url,
+                'currency': currency,
+            }
+            self._rendered[currency] = render_to_string('accounts/emails/newsletter.txt', {
+                **context,
+                'body': self.template.render(Context(context, autoescape=False)),  # a plain-text email
+                'preferences_url': self.site_url + reverse('accounts:edit_profile'),
+            })
+        return self._rendered[currency]
+
+
+def _save_progress(newsletter, **fields):
+    for name, value in fields.items():
+        setattr(newsletter, name, value)
+    newsletter.save(update_fields=[*fields, 'last_user_id', 'sent_count', 'failed_count', 'updated_at'])
+
+
+def send_newsletter(newsletter, batch_size=None, rate=None):
+    """Send (or resume sending) one newsletter; returns the number of messages sent in this run"""
+    config = _config()
+    batch_size = batch_size or config['batch_size']
+    rate = rate or config['rate']
+
+    _save_progress(newsletter, status='sending', started_at=newsletter.started_at or timezone.now(), last_error='')
+    sent = 0
+    started = time.monotonic()
+
+    try:
+        # Inside the try: a body that doesn't compile fails this newsletter, not the whole queue
+        renderer = SegmentRenderer(newsletter)
+        with get_connection() as connection:
+            for batch in audience_batches(batch_size, newsletter.last_user_id):
+                for user_id, email, currency in batch:
+                    message = EmailMessage(
+                        newsletter.subject, renderer.render(currency), settings.DEFAULT_FROM_EMAIL, [email],
+                        connection=connection,
+                    )
+                    try:
+                        message.send()
+                        newsletter.sent_count += 1
+                        sent += 1
+                    except smtplib.SMTPRecipientsRefused:
+                        newsletter.failed_count += 1
+                    newsletter.last_user_id = user_id
+
+                    # Throttle: never get ahead of `rate` messages per second
+                    delay = sent / rate - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                _save_progress(newsletter)
+                cache.touch(LOCK_KEY, LOCK_TIMEOUT)  # long sends keep the worker lock
+    except Exception as e:
+        logger.exception("Newsletter %s stopped after user %s", newsletter.pk, newsletter.last_user_id)
+        _save_progress(newsletter, status='failed', last_error=str(e))
+        raise
+
+    _save_progress(newsletter, status='sent', finished_at=timezone.now())
+    return sent
+
+
+def process_queue(batch_size=None, rate=None):
+    """Send every queued newsletter (and resume interrupted ones); None if another worker is running"""
+    if not newsletter_enabled():
+        logger.info("Newsletters are disabled in site settings, nothing sent")
+        return 0
+    if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        return None
+    try:
+        sent = 0
+        for newsletter in Newsletter.objects.filter(status__in=['queued', 'sending']).order_by('created_at'):
+            try:
+                sent += send_newsletter(newsletter, batch_size, rate)
+            except Exception:
+                # send_newsletter logged it and marked the newsletter failed; the others still go out
+                logger.error("Newsletter %s failed, continuing with the queue", newsletter.pk)
+        return sent
+    finally:
+        cache.delete(LOCK_KEY)
@@ -0,0 +1,152 @@
+"""
+Wishlist price-drop and back-in-stock notifications.
+
+Saving an artwork only records a WishlistEvent row when its price dropped or it
+became available again; nothing else happens in the request. The
+send_wishlist_notifications worker then:
+
+1. fans each event out to the users who wishlisted the artwork (and want
+   email notifications), inserting WishlistNotification outbox rows in batches
+   of user ids, and
+2. sends every user with pending notifications a single digest email covering
+   all of them, over one mail connection per batch of users.
+
+Both steps are idempotent, so a worker that dies half way can simply be run
+again.
+"""
+import logging
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import WishlistEvent, WishlistItem, WishlistNotification
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'accounts:wishlist_notifications:running'
+LOCK_TIMEOUT = 600
+AVAILABILITY_FIELDS = ('is_available', 'is_limited_edition', 'total_copies', 'sold_copies')
+
+
+def _was_available(loaded):
+    """Artwork.copies_available as it was when loaded, or None if unknown"""
+    if any(name not in loaded for name in AVAILABILITY_FIELDS):
+        return None
+    if not loaded['is_limited_edition'] or loaded['total_copies'] == 0:
+        return loaded['is_available']
+    return loaded['is_available'] and loaded['sold_copies'] < loaded['total_copies']
+
+
+def record_artwork_changes(artwork):
+    """Queue events for a saved artwork whose price dropped or which is back in stock"""
+    loaded = getattr(artwork, '_loaded_values', None)
+    if not loaded:
+        return []
+
+    events = []
+    old_price = loaded.get('price')
+    if old_price is not None and artwork.price is not None and artwork.price < old_price:
+        events.append(WishlistEvent(artwork=artwork, kind='price_drop', old_price=old_price, new_price=artwork.price))
+    if _was_available(loaded) is False and artwork.copies_available:
+        events.append(WishlistEvent(artwork=artwork, kind='back_in_stock', new_price=artwork.price))
+
+    if events and artwork.is_active:
+        WishlistEvent.objects.bulk_create(events)
+    return events
+
+
+def fan_out_events(batch_size=500):
+    """Create outbox rows for every pending event; returns the number of notifications queued"""
+    queued = 0
+    for event in WishlistEvent.objects.filter(fanned_out_at__isnull=True):
+        recipients = WishlistItem.objects.filter(
+            artwork_id=event.artwork_id,
+            user__is_active=True,
+            user__profile__email_notifications=True,
+        ).exclude(user__email='').values_list('user_id', flat=True).distinct().order_by('user_id')
+
+        last_user_id = 0
+        while True:
+            user_ids = list(recipients.filter(user_id__gt=last_user_id)[:batch_size])
+            if not user_ids:
+                break
+            WishlistNotification.objects.bulk_create(
+                [WishlistNotification(user_id=user_id, event=event) for user_id in user_ids],
+                ignore_conflicts=True,
+            )
+            queued += len(user_ids)
+            last_user_id = user_ids[-1]
+
+        WishlistEvent.objects.filter(pk=event.pk).update(fanned_out_at=timezone.now())
+    return queued
+
+
+def _digest_items(notifications):
+    """Latest event per (artwork, kind) for one user's digest"""
+    latest = {}
+    for notification in notifications:
+        event = notification.event
+        latest[(event.artwork_id, event.kind)] = event
+    return sorted(latest.values(), key=lambda event: event.created_at)
+
+
+def send_digests(batch_size=100):
+    """Email each user with pending notifications one digest; returns the number of emails sent"""
+    pending = WishlistNotification.objects.filter(sent_at__isnull=True)
+    site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+    sent = 0
+    last_user_id = 0
+
+    with get_connection() as connection:
+        while True:
+            user_ids = list(
+                pending.filter(user_id__gt=last_user_id)
+                .values_list('user_id', flat=True).distinct().order_by('user_id')[:batch_size]
+            )
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            notifications = list(
+                pending.filter(user_id__in=user_ids)
+                .select_related('user', 'event__artwork')
+                .order_by('user_id', 'event__created_at')
+            )
+            messages = []
+            for user, user_notifications in groupby(notifications, key=lambda n: n.user):
+                items = _digest_items(user_notifications)
+                body = render_to_string('accounts/emails/wishlist_digest.txt', {
+                    'user': user,
+                    'events': items,
+                    'site_url': site_url,
+                })
+                subject = (
+                    f'{items[0].artwork.title}: {items[0].get_kind_display().lower()}' if len(items) == 1
+                    else f'{len(items)} updates on your wishlist'
+                )
+                messages.append(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email]))
+
+            connection.send_messages(messages)
+            WishlistNotification.objects.filter(
+                pk__in=[notification.pk for notification in notifications]
+            ).update(sent_at=timezone.now())
+            sent += len(messages)
+    return sent
+
+
+def process_outbox(batch_size=500, digest_batch_size=100):
+    """Run one fan-out and digest pass unless another worker is already running one"""
+    if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        logger.info("Wishlist notification worker already running, skipping")
+        return None
+    try:
+        return {
+            'queued': fan_out_events(batch_size),
+            'emails': send_digests(digest_batch_size),
+        }
+    finally:
+        cache.delete(LOCK_KEY)
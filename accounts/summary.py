@@ -0,0 +1,68 @@
+"""
+Precomputed per-user summary for the profile page.
+
+The profile page is the most visited logged-in page. Its recent orders and
+wishlist preview are built as plain data (no model instances, so templates
+cannot trigger lazy loads) in two queries, and cached per user. Order and
+WishlistItem signals drop the entry when either changes; the timeout bounds
+how long artwork edits (title, price, image) can show stale.
+"""
+from django.core.cache import cache
+
+from .models import WishlistItem
+
+CACHE_TIMEOUT = 60 * 30
+RECENT_ORDERS = 5
+WISHLIST_PREVIEW = 4
+
+
+def _cache_key(user_id):
+    return f'accounts:summary:{user_id}'
+
+
+def build_summary(user):
+    """Recent orders and a wishlist preview for the user, as plain dicts"""
+    from store.models import Order
+
+    status_labels = dict(Order.ORDER_STATUS_CHOICES)
+    recent_orders = [
+        {**order, 'status_display': status_labels.get(order['order_status'], order['order_status'])}
+        for order in Order.objects.filter(customer=user).order_by('-created_at').values(
+            'id', 'created_at', 'order_status', 'total_amount'
+        )[:RECENT_ORDERS]
+    ]
+
+    item_labels = dict(WishlistItem._meta.get_field('item_type').choices)
+    wishlist_items = [
+        {
+            'artwork_id': item.artwork_id,
+            'title': item.artwork.title,
+            'price': item.artwork.price,
+            'thumbnail_url': item.artwork.main_image.url if item.artwork.main_image else '',
+            'url': item.artwork.get_absolute_url(),
+            'item_type': item.item_type,
+            'item_type_display': item_labels.get(item.item_type, item.item_type),
+        }
+        for item in WishlistItem.objects.filter(user=user).select_related('artwork').only(
+            'artwork_id', 'item_type', 'artwork__title', 'artwork__price', 'artwork__main_image'
+        ).order_by('-created_at')[:WISHLIST_PREVIEW]
+    ]
+
+    return {
+        'recent_orders': recent_orders,
+        'wishlist_items': wishlist_items,
+    }
+
+
+def get_summary(user):
+    """Cached summary; at most two queries on a miss, none on a hit"""
+    key = _cache_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_summary(user)
+        cache.set(key, summary, CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate(user_id):
+    cache.delete(_cache_key(user_id))
@@ -1,3 +1,274 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from gallery.models import Artwork, Category
+from . import newsletter, throttling
+from .models import Newsletter, UserProfile, WishlistEvent
+
+
+@override_settings(LOGIN_THROTTLE={'ip': (3, 1.0), 'account': (2, 0.5), 'register_ip': (1, 0.1)})
+class ThrottlingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        patcher = mock.patch.object(throttling.time, 'time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, ip='203.0.113.1'):
+        return RequestFactory().post('/accounts/login/', REMOTE_ADDR=ip)
+
+    def test_bucket_empties_and_refills(self):
+        self.assertEqual([throttling.take_token('bucket', 3, 1.0) for _ in range(4)], [True, True, True, False])
+        self.now += 0.5
+        self.assertFalse(throttling.take_token('bucket', 3, 1.0))
+        self.now += 1.0
+        self.assertTrue(throttling.take_token('bucket', 3, 1.0))
+        self.assertFalse(throttling.take_token('bucket', 3, 1.0))
+
+    def test_refill_is_capped_at_capacity(self):
+        throttling.take_token('bucket', 3, 1.0)
+        self.now += 3600
+        self.assertEqual([throttling.take_token('bucket', 3, 1.0) for _ in range(4)], [True, True, True, False])
+
+    def test_login_limits_each_account(self):
+        self.assertTrue(throttling.allow_login(self.request('203.0.113.1'), 'Collector'))
+        self.assertTrue(throttling.allow_login(self.request('203.0.113.2'), 'collector '))
+        # A third address can't get around the account's bucket, but other accounts are unaffected
+        self.assertFalse(throttling.allow_login(self.request('203.0.113.3'), 'COLLECTOR'))
+        self.assertTrue(throttling.allow_login(self.request('203.0.113.3'), 'someone-else'))
+
+    def test_login_limits_each_ip(self):
+        allowed = [throttling.allow_login(self.request(), f'user{n}') for n in range(4)]
+        self.assertEqual(allowed, [True, True, True, False])
+        self.assertTrue(throttling.allow_login(self.request('198.51.100.7'), 'user3'))
+
+    def test_registration_and_metrics(self):
+        self.assertTrue(throttling.allow_registration(self.request()))
+        self.assertFalse(throttling.allow_registration(self.request()))
+        self.now += 10
+        self.assertTrue(throttling.allow_registration(self.request()))
+
+        metrics = throttling.get_metrics()
+        self.assertEqual((metrics['register_allowed'], metrics['register_throttled']), (2, 1))
+        self.assertEqual(metrics['hashes_avoided'], 1)
+
+    @override_settings(LOGIN_THROTTLE={'num_proxies': 1})
+    def test_client_ip_behind_proxy(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.9')
+        self.assertEqual(throttling.get_client_ip(request), '203.0.113.9')
+        self.assertEqual(throttling.get_client_ip(RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')), '10.0.0.1')
+
+
+class ProfileSaveTests(TestCase):
+    """UserProfile.save() only writes the columns that changed"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('collector', 'collector@example.com', 'password')
+
+    def load(self):
+        return UserProfile.objects.get(user=self.user)
+
+    def test_unchanged_profile_is_not_written(self):
+        profile = self.load()
+        with self.assertNumQueries(0):
+            profile.save()
+
+    def test_only_changed_columns_are_written(self):
+        profile = self.load()
+        profile.bio = 'Collects bronze'
+        with CaptureQueriesContext(connection) as queries:
+            profile.save()
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertIn(connection.ops.quote_name('bio'), sql)
+        self.assertIn(connection.ops.quote_name('updated_at'), sql)
+        self.assertNotIn(connection.ops.quote_name('city'), sql)
+        self.assertEqual(self.load().bio, 'Collects bronze')
+
+        # The saved values are the new baseline
+        with self.assertNumQueries(0):
+            profile.save()
+
+    def test_login_does_not_touch_the_profile(self):
+        user = User.objects.get(pk=self.user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            user.save(update_fields=['last_login'])
+        self.assertFalse([q for q in queries if 'accounts_userprofile' in q['sql']])
+
+    def test_user_save_writes_profile_changes(self):
+        user = User.objects.select_related('profile').get(pk=self.user.pk)
+        user.profile.city = 'Amman'
+        user.save()
+        self.assertEqual(self.load().city, 'Amman')
+
+
+class ProfileImageTests(TestCase):
+    """A new profile image marks the avatar as pending and queues processing once committed"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.process_async = self.enterContext(mock.patch('accounts.avatars.process_async'))
+        user = User.objects.create_user('collector', 'collector@example.com', 'password')
+        self.profile = UserProfile.objects.get(user=user)
+
+    def upload(self, update_fields=None):
+        self.profile.profile_image = SimpleUploadedFile('me.jpg', b'not decoded here', content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save(update_fields=update_fields)
+        return UserProfile.objects.get(pk=self.profile.pk)
+
+    def test_upload_marks_pending_and_queues_processing(self):
+        saved = self.upload()
+        self.assertTrue(saved.avatar_pending)
+        self.assertTrue(saved.profile_image.name.startswith('profiles/'))
+        self.process_async.assert_called_once_with(self.profile.pk)
+
+    def test_update_fields_tuple_with_image(self):
+        update_fields = ('profile_image',)
+        saved = self.upload(update_fields=update_fields)
+        self.assertTrue(saved.avatar_pending)
+        self.assertEqual(update_fields, ('profile_image',))
+        self.process_async.assert_called_once_with(self.profile.pk)
+
+    def test_update_fields_without_image_leaves_avatar_alone(self):
+        UserProfile.objects.filter(pk=self.profile.pk).update(avatar_small='profiles/small/old.jpg')
+        profile = UserProfile.objects.get(pk=self.profile.pk)
+        profile.bio = 'Collects bronze'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save(update_fields=('bio',))
+
+        saved = UserProfile.objects.get(pk=profile.pk)
+        self.assertEqual((saved.bio, saved.avatar_small.name), ('Collects bronze', 'profiles/small/old.jpg'))
+        self.process_async.assert_not_called()
+
+    def test_removing_the_image_clears_the_variants(self):
+        self.upload()
+        UserProfile.objects.filter(pk=self.profile.pk).update(
+            avatar_pending=False, avatar_small='profiles/small/me.jpg', avatar_medium='profiles/medium/me.jpg'
+        )
+        profile = UserProfile.objects.get(pk=self.profile.pk)
+        profile.profile_image = None
+        profile.save()
+
+        saved = UserProfile.objects.get(pk=profile.pk)
+        self.assertFalse(saved.avatar_small or saved.avatar_medium or saved.avatar_pending)
+
+
+class ArtworkChangeEventTests(TestCase):
+    """Saving an artwork records an event only for a price drop or a restock"""
+
+    def setUp(self):
+        category, _ = Category.objects.get_or_create(
+            name='signed_print_painting', defaults={'display_name': 'Signed Print'}
+        )
+        artwork = Artwork.objects.create(
+            title='Print', description='-', artist_statement='-', artwork_creation_date=date(2020, 1, 1),
+            height=10, width=10, main_image='artworks/test.jpg', price=Decimal('100.00'), category=category,
+            is_limited_edition=True, total_copies=2, sold_copies=2,
+        )
+        self.artwork = Artwork.objects.get(pk=artwork.pk)
+
+    def kinds(self):
+        return list(WishlistEvent.objects.order_by('pk').values_list('kind', flat=True))
+
+    def test_unrelated_change_and_price_rise_record_nothing(self):
+        self.artwork.description = 'Updated'
+        self.artwork.price = Decimal('120.00')
+        self.artwork.save()
+        self.assertEqual(self.kinds(), [])
+
+    def test_price_drop_and_restock(self):
+        self.artwork.price = Decimal('80.00')
+        self.artwork.save()
+        self.artwork.total_copies = 5
+        self.artwork.save()
+        self.assertEqual(self.kinds(), ['price_drop', 'back_in_stock'])
+
+        # The same instance saved again compares against what was just written
+        self.artwork.save()
+        self.assertEqual(len(self.kinds()), 2)
+        event = WishlistEvent.objects.get(kind='price_drop')
+        self.assertEqual((event.old_price, event.new_price), (Decimal('100.00'), Decimal('80.00')))
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+class MigrateSessionsTests(TestCase):
+
+    def setUp(self):
+        caches['sessions'].clear()
+        self.keys = []
+        for n in range(3):
+            store = DatabaseSessionStore()
+            store['cart'] = n
+            store.create()
+            self.keys.append(store.session_key)
+
+    def migrate(self):
+        # The test cache is local memory, which the command refuses for real deployments
+        with mock.patch('accounts.management.commands.migrate_sessions.UNSAFE_BACKENDS', ()):
+            call_command('migrate_sessions', batch_size=2, stdout=io.StringIO())
+
+    def test_refuses_a_cache_that_loses_sessions(self):
+        with self.assertRaises(CommandError):
+            call_command('migrate_sessions', stdout=io.StringIO())
+        self.assertEqual(Session.objects.count(), 3)
+
+    def test_moves_sessions_and_deletes_the_rows(self):
+        self.migrate()
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual([CacheSessionStore(session_key=key).load().get('cart') for key in self.keys], [0, 1, 2])
+
+    def test_keeps_rows_that_were_not_stored(self):
+        with mock.patch.object(caches['sessions'], 'get_many', return_value={}), self.assertRaises(CommandError):
+            self.migrate()
+        self.assertEqual(Session.objects.count(), 3)
+
+
+class NewsletterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user('collector', 'collector@example.com', 'password')
+        UserProfile.objects.filter(user=user).update(newsletter_subscription=True)
+
+    def test_body_must_compile(self):
+        with self.assertRaises(ValidationError) as raised:
+            Newsletter(subject='Spring', body='{% if %}').full_clean()
+        self.assertIn('body', raised.exception.message_dict)
+
+    def test_broken_newsletter_does_not_block_the_queue(self):
+        broken = Newsletter.objects.create(subject='Broken', body='{% if %}', status='queued')
+        issue = Newsletter.objects.create(subject='Spring', body='Prints & drawings in {{ currency }}',
+                                          status='queued')
+
+        self.assertEqual(newsletter.process_queue(rate=1000), 1)
+        broken.refresh_from_db()
+        issue.refresh_from_db()
+        self.assertEqual(broken.status, 'failed')
+        self.assertTrue(broken.last_error)
+        self.assertEqual((issue.status, issue.sent_count), ('sent', 1))
+
+        # A plain-text email: nothing is HTML-escaped
+        self.assertIn('Prints & drawings in USD', mail.outbox[0].body)
@@ -0,0 +1,107 @@
+"""
+Token-bucket throttling for login and registration.
+
+Every login attempt and registration costs a full password hash, so a burst
+of credential stuffing can pin every worker's CPU. Each client IP, and each
+account being logged into, gets a bucket of tokens that refills at a steady
+rate. An attempt that finds its bucket empty is rejected before any hashing
+happens.
+
+Buckets and counters live in the cache named by LOGIN_THROTTLE['cache']. The
+default local-memory cache keeps them per process; point it at a shared cache
+to throttle across workers. Reads and writes are not atomic, so a burst can
+sneak a token or two past the limit. That is fine for this purpose.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'cache': 'default',
+    'num_proxies': 0,
+    # (capacity, tokens refilled per second)
+    'ip': (20, 1 / 6),
+    'account': (5, 1 / 60),
+    'register_ip': (5, 1 / 300),
+}
+METRICS = ('login_allowed', 'login_throttled', 'register_allowed', 'register_throttled')
+
+
+def _config():
+    return {**DEFAULTS, **getattr(settings, 'LOGIN_THROTTLE', {})}
+
+
+def _cache():
+    return caches[_config()['cache']]
+
+
+def get_client_ip(request):
+    """Client address, skipping the configured number of trusted reverse proxies"""
+    num_proxies = _config()['num_proxies']
+    if num_proxies:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if forwarded:
+            return forwarded[-min(num_proxies, len(forwarded))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def take_token(key, capacity, refill_rate):
+    """Take one token from the bucket under `key`; False when the bucket is empty"""
+    cache = _cache()
+    now = time.time()
+    tokens, updated_at = cache.get(key) or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    # An untouched bucket is full again after capacity / refill_rate seconds
+    cache.set(key, (tokens, now), int(capacity / refill_rate) + 1)
+    return allowed
+
+
+def _count(metric):
+    cache = _cache()
+    key = f'accounts:throttle:metrics:{metric}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def allow_login(request, username):
+    """Consume a login attempt for the client IP and the account; False if throttled"""
+    config = _config()
+    ip = get_client_ip(request) if request is not None else ''
+    account = (username or '').strip().lower()
+
+    allowed = (
+        take_token(f'accounts:throttle:login:ip:{ip}', *config['ip'])
+        and take_token(f'accounts:throttle:login:account:{account}', *config['account'])
+    )
+    _count('login_allowed' if allowed else 'login_throttled')
+    if not allowed:
+        logger.warning("Login throttled for ip=%s account=%s", ip, account)
+    return allowed
+
+
+def allow_registration(request):
+    """Consume a registration attempt for the client IP; False if throttled"""
+    ip = get_client_ip(request)
+    allowed = take_token(f'accounts:throttle:register:ip:{ip}', *_config()['register_ip'])
+    _count('register_allowed' if allowed else 'register_throttled')
+    if not allowed:
+        logger.warning("Registration throttled for ip=%s", ip)
+    return allowed
+
+
+def get_metrics():
+    """Attempt counters, plus how many password hashes throttling saved"""
+    values = _cache().get_many([f'accounts:throttle:metrics:{m}' for m in METRICS])
+    metrics = {m: values.get(f'accounts:throttle:metrics:{m}', 0) for m in METRICS}
+    metrics['hashes_avoided'] = metrics['login_throttled'] + metrics['register_throttled']
+    return metrics
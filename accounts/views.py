@@ -1,11 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, authenticate, logout
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
 from django.http import JsonResponse
-from .models import UserProfile, WishlistItem
+from .models import UserProfile, WishlistItem, get_profile
 from .forms import UserProfileForm, CustomUserCreationForm
+from .throttling import allow_registration
+from .summary import get_summary
+from .wishlist import add_wishlist_item
 from gallery.models import Artwork
 
 
@@ -24,19 +27,16 @@ def register(request):
     """User registration view"""
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
-        if form.is_valid():
+        # Throttled before validation so no password gets hashed
+        if not allow_registration(request):
+            form = CustomUserCreationForm()
+            messages.error(request, 'Too many registration attempts from your network. Please try again later.')
+        elif form.is_valid():
             user = form.save()
-            # Authenticate the user with our custom backend
-            authenticated_user = authenticate(
-                request, 
-                username=user.email,  # Using email as username
-                password=form.cleaned_data['password1'],
-                backend='accounts.backends.EmailBackend'
-            )
-            if authenticated_user:
-                login(request, authenticated_user, backend='accounts.backends.EmailBackend')
-                messages.success(request, 'Welcome to Jasem Shuman Art! Your account has been created.')
-                return redirect('gallery:home')
+            # The password was just set, no need to hash it a second time through authenticate()
+            login(request, user, backend='accounts.backends.EmailBackend')
+            messages.success(request, 'Welcome to Jasem Shuman Art! Your account has been created.')
+            return redirect('gallery:home')
     else:
         form = CustomUserCreationForm()
     
@@ -50,14 +50,13 @@ def register(request):
 @login_required
 def profile(request):
     """User profile view"""
-    profile = request.user.profile
-    recent_orders = []  # Will implement with store app
-    wishlist_items = WishlistItem.objects.filter(user=request.user)[:5]
+    profile = get_profile(request.user)
+    summary = get_summary(request.user)
     
     context = {
         'profile': profile,
-        'recent_orders': recent_orders,
-        'wishlist_items': wishlist_items,
+        'recent_orders': summary['recent_orders'],
+        'wishlist_items': summary['wishlist_items'],
         'page_title': f'{request.user.username} - Profile',
     }
     return render(request, 'accounts/profile.html', context)
@@ -66,7 +65,7 @@ def profile(request):
 @login_required
 def edit_profile(request):
     """Edit user profile view"""
-    profile = request.user.profile
+    profile = get_profile(request.user)
     
     if request.method == 'POST':
         form = UserProfileForm(request.POST, request.FILES, instance=profile)
@@ -100,29 +99,16 @@ def wishlist(request):
 def add_to_wishlist(request, artwork_id):
     """Add artwork to wishlist (AJAX)"""
     if request.method == 'POST':
-        artwork = get_object_or_404(Artwork, id=artwork_id)
+        artwork = get_object_or_404(Artwork.objects.only('id', 'title'), id=artwork_id)
         item_type = request.POST.get('item_type', 'original')
         
-        # Check if already in wishlist
-        existing = WishlistItem.objects.filter(
-            user=request.user,
-            artwork=artwork,
-            item_type=item_type
-        ).first()
-        
-        if existing:
+        # Add to wishlist, or report that it is already there
+        if not add_wishlist_item(request.user, artwork.id, item_type):
             return JsonResponse({
                 'success': False,
                 'message': 'This item is already in your wishlist.'
             })
         
-        # Add to wishlist
-        WishlistItem.objects.create(
-            user=request.user,
-            artwork=artwork,
-            item_type=item_type
-        )
-        
         return JsonResponse({
             'success': True,
             'message': f'{artwork.title} added to your wishlist.'
@@ -0,0 +1,52 @@
+"""
+Wishlist membership lookups for artwork grids.
+
+A user's wishlist is loaded with one query as a set of (artwork_id, item_type)
+pairs and cached per user, so "hearted" indicators on a grid cost nothing per
+tile. The cache entry is dropped whenever the user's wishlist changes.
+"""
+from django.core.cache import cache
+
+from . import summary
+from .models import WishlistItem
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _cache_key(user_id):
+    return f'accounts:wishlist:{user_id}'
+
+
+def get_wishlist_entries(user):
+    """Frozenset of (artwork_id, item_type) pairs on the user's wishlist"""
+    if not user.is_authenticated:
+        return frozenset()
+    key = _cache_key(user.pk)
+    entries = cache.get(key)
+    if entries is None:
+        entries = frozenset(WishlistItem.objects.filter(user=user).values_list('artwork_id', 'item_type'))
+        cache.set(key, entries, CACHE_TIMEOUT)
+    return entries
+
+
+def wishlisted_artwork_ids(user):
+    """Frozenset of ids of artworks on the user's wishlist, in any item type"""
+    return frozenset(artwork_id for artwork_id, _ in get_wishlist_entries(user))
+
+
+def add_wishlist_item(user, artwork_id, item_type='original'):
+    """Insert-or-ignore against the unique (user, artwork, item_type) constraint; True if newly added"""
+    if (artwork_id, item_type) in get_wishlist_entries(user):
+        return False
+    WishlistItem.objects.bulk_create(
+        [WishlistItem(user=user, artwork_id=artwork_id, item_type=item_type)],
+        ignore_conflicts=True,
+    )
+    # bulk_create sends no post_save, so drop both caches here
+    invalidate(user.pk)
+    summary.invalidate(user.pk)
+    return True
+
+
+def invalidate(user_id):
+    cache.delete(_cache_key(user_id))
@@ -21,10 +21,16 @@ export ALLOWED_HOSTS="your-domain.com,your-aws-ip-address"
 echo "Running database migrations..."
 python manage.py migrate
 
+# Create the cache tables (the database cache is the default with DEBUG=False)
+python manage.py createcachetable
+
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Pre-render the public pages (kept up to date on save when PRERENDER=True)
+python manage.py prerender
+
 # Create superuser if needed (optional)
 # python manage.py createsuperuser
 
@@ -37,4 +43,35 @@ echo "Next steps:"
 echo "1. Configure your web server (nginx/apache)"
 echo "2. Set up SSL certificates"
 echo "3. Configure your domain name"
-echo "4. Set up proper environment variables"
\ No newline at end of file
+echo "4. Set up proper environment variables"
+echo "5. Add a cron entry to keep the admin dashboard warm:"
+echo "   * * * * * cd ~/jasem-shuman && django_env/bin/python manage.py refresh_dashboard"
+echo "6. With SESSION_STORE=db or cached_db, purge expired sessions nightly:"
+echo "   0 4 * * * cd ~/jasem-shuman && django_env/bin/python manage.py clearsessions"
+echo "   SESSION_STORE=cache needs SESSION_CACHE_BACKEND set to redis or memcached (the database cache culls)."
+echo "   When switching SESSION_STORE to cache, run once (not on every deploy): python manage.py migrate_sessions"
+echo "7. Send wishlist price-drop/restock emails every few minutes:"
+echo "   */5 * * * * cd ~/jasem-shuman && django_env/bin/python manage.py send_wishlist_notifications"
+echo "8. Send queued newsletters:"
+echo "   */10 * * * * cd ~/jasem-shuman && django_env/bin/python manage.py send_newsletters"
+echo "9. Store contact form posts and notify staff every minute:"
+echo "   * * * * * cd ~/jasem-shuman && django_env/bin/python manage.py process_contact_queue"
+echo "   Queued attachments wait in PRIVATE_MEDIA_ROOT (private_media/): never serve that directory."
+echo "10. Serve pre-rendered pages to anonymous visitors (PRERENDER=True, prerendered/ under the project):"
+echo "   location / {"
+echo "       set \$prerendered /prerendered\${uri}index.html;"
+echo "       if (\$cookie_sessionid) { set \$prerendered /nonexistent; }"
+echo "       if (\$cookie_csrftoken = \"\") { set \$prerendered /nonexistent; }  # first visit: Django sets the cookie"
+echo "       if (\$cookie_messages) { set \$prerendered /nonexistent; }"
+echo "       if (\$args) { set \$prerendered /nonexistent; }"
+echo "       root /path/to/jasem-shuman;"
+echo "       try_files \$prerendered @django;"
+echo "   }"
+echo "11. Re-render the pre-rendered pages nightly, so date-based sections (current/upcoming exhibitions) roll over:"
+echo "   30 0 * * * cd ~/jasem-shuman && django_env/bin/python manage.py prerender"
+echo "12. Large uploads arrive in 8 MB chunks (CHUNKED_UPLOADS in settings): set client_max_body_size 10m"
+echo "    in nginx, keep CHUNKED_UPLOAD_DIR on the same filesystem as media/, and delete abandoned uploads hourly:"
+echo "   0 * * * * cd ~/jasem-shuman && django_env/bin/python manage.py clear_uploads"
+echo "13. Run bulk artwork imports queued from the admin:"
+echo "   * * * * * cd ~/jasem-shuman && django_env/bin/python manage.py process_artwork_imports"
+echo "    Uploaded manifests and zips wait in PRIVATE_MEDIA_ROOT until the import has run."
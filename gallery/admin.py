@@ -1,7 +1,10 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import redirect, render
 from django.utils.html import format_html
-from django.urls import reverse
-from .models import Category, Artwork, SculptureImage
+from django.urls import path, reverse
+from . import categories, import_queue
+from .forms import ArtworkAdminForm, ArtworkImportForm
+from .models import Category, Artwork, ArtworkImportJob, SculptureImage
 
 
 @admin.register(Category)
@@ -37,12 +40,13 @@ class CategoryListFilter(admin.SimpleListFilter):
     parameter_name = 'category'
 
     def lookups(self, request, model_admin):
-        categories = Category.objects.all().order_by('name')
-        return [(cat.name, cat.display_name) for cat in categories]
+        ordered = sorted(categories.all_categories(), key=lambda cat: cat.name)
+        return [(cat.name, cat.display_name) for cat in ordered]
 
     def queryset(self, request, queryset):
         if self.value():
-            return queryset.filter(category__name=self.value())
+            category = categories.get_category_by_name(self.value())
+            return queryset.filter(category=category) if category else queryset.none()
         return queryset
 
 
@@ -53,7 +57,8 @@ class SculptureImageInline(admin.TabularInline):
     
     def get_formset(self, request, obj=None, **kwargs):
         # Only show inline for sculptures
-        if obj and 'sculpture' not in obj.category.name.lower():
+        category = categories.get_category(obj.category_id) if obj else None
+        if category and 'sculpture' not in category.name.lower():
             kwargs['max_num'] = 0
         return super().get_formset(request, obj, **kwargs)
 
@@ -64,23 +69,19 @@ class ArtworkAdmin(admin.ModelAdmin):
                     'featured', 'created_at']
     list_filter = [CategoryListFilter, 'is_available', 'is_limited_edition', 'featured', 'created_at']
     search_fields = ['title', 'description', 'artist_statement']
+    form = ArtworkAdminForm
     
     inlines = [SculptureImageInline]
     
+    def get_category(self, request, obj=None):
+        """Category of the edited object, or the one pre-selected via ?category=<id>"""
+        if obj:
+            return categories.get_category(obj.category_id)
+        return categories.get_category(request.GET.get('category'))
+    
     def get_fieldsets(self, request, obj=None):
         """Customize fieldsets based on category"""
-        
-        # Get category from request or object
-        category_id = request.GET.get('category')
-        category = None
-        
-        if obj:
-            category = obj.category
-        elif category_id:
-            try:
-                category = Category.objects.get(id=category_id)
-            except Category.DoesNotExist:
-                pass
+        category = self.get_category(request, obj)
         
         # Base fieldsets that all categories have
         fieldsets = [
@@ -222,23 +223,20 @@ class ArtworkAdmin(admin.ModelAdmin):
                 'fields': ('is_active', 'featured')
             }))
         
+        # Large files can be uploaded in chunks next to the plain file inputs
+        upload_fields = {field: token_field for token_field, (field, _) in ArtworkAdminForm.UPLOAD_FIELDS.items()}
+        for _, options in fieldsets:
+            options['fields'] = tuple(
+                name for field in options['fields'] for name in (field, upload_fields.get(field)) if name
+            )
+        
         return fieldsets
     
     def get_inline_instances(self, request, obj=None):
         """Show sculpture images inline only for sculpture categories"""
         inlines = super().get_inline_instances(request, obj)
         
-        # Get category from request or object
-        category_id = request.GET.get('category')
-        category = None
-        
-        if obj:
-            category = obj.category
-        elif category_id:
-            try:
-                category = Category.objects.get(id=category_id)
-            except Category.DoesNotExist:
-                pass
+        category = self.get_category(request, obj)
         
         # Only show sculpture images for sculpture categories
         if category:
@@ -253,15 +251,18 @@ class ArtworkAdmin(admin.ModelAdmin):
         form = super().get_form(request, obj, **kwargs)
         
         # Pre-select category if provided in URL
-        if not obj and 'category' in request.GET:
-            try:
-                category_id = int(request.GET['category'])
-                form.base_fields['category'].initial = category_id
-            except (ValueError, Category.DoesNotExist):
-                pass
+        if not obj:
+            category = self.get_category(request)
+            if category:
+                form.base_fields['category'].initial = category.id
         
+        form.upload_user = request.user
         return form
     
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        form.release_uploads()
+    
     def inventory_status(self, obj):
         if not obj.is_limited_edition:
             return 'Unique' if obj.is_original else 'Unlimited'
@@ -272,6 +273,45 @@ class ArtworkAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('category', 'original_artwork')
+    
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='gallery_artwork_import'),
+        ]
+        return urls + super().get_urls()
+    
+    def import_view(self, request):
+        """Bulk import artworks from a manifest and a zip of images"""
+        if not self.has_add_permission(request):
+            return redirect('admin:gallery_artwork_changelist')
+        
+        form = ArtworkImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            # Validating and importing decode every image: the process_artwork_imports worker does that
+            job = import_queue.enqueue(
+                form.cleaned_data['manifest'], form.cleaned_data['images'], form.cleaned_data['dry_run'], request.user
+            )
+            messages.success(request, f'Import {job.pk} is queued. Its result will appear here once it has run.')
+            return redirect('admin:gallery_artworkimportjob_changelist')
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Bulk import artworks',
+            'form': form,
+        }
+        return render(request, 'admin/gallery/artwork/import.html', context)
+
+
+@admin.register(ArtworkImportJob)
+class ArtworkImportJobAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'status', 'dry_run', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'dry_run']
+    readonly_fields = ['manifest', 'images', 'dry_run', 'created_by', 'status', 'result',
+                       'created_at', 'finished_at']
+    
+    def has_add_permission(self, request):
+        return False  # jobs are queued from the artwork import page
 
 
 @admin.register(SculptureImage)
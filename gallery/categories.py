@@ -0,0 +1,51 @@
+"""
+Process-local registry of art categories.
+
+There are only a handful of categories and they almost never change, yet the
+admin forms, list filters and gallery/store views each looked them up on every
+request. They are kept in a jasem_site.registry.VersionedRegistry, invalidated
+by the Category post_save/post_delete signals.
+
+The returned Category instances are shared between requests - treat them as
+read-only.
+"""
+from jasem_site.registry import VersionedRegistry
+
+VERSION_KEY = 'gallery:categories:version'
+
+
+def _load():
+    from .models import Category
+
+    ordered = list(Category.objects.all())
+    return {
+        'ordered': ordered,
+        'by_id': {category.id: category for category in ordered},
+        'by_name': {category.name: category for category in ordered},
+    }
+
+
+_registry = VersionedRegistry(VERSION_KEY, _load)
+
+
+def all_categories():
+    """All categories in the model's default (display_name) order"""
+    return list(_registry.get()['ordered'])
+
+
+def get_category(category_id):
+    """Category by primary key (int or numeric string), or None"""
+    try:
+        category_id = int(category_id)
+    except (TypeError, ValueError):
+        return None
+    return _registry.get()['by_id'].get(category_id)
+
+
+def get_category_by_name(name):
+    """Category by its unique name, or None"""
+    return _registry.get()['by_name'].get(name)
+
+
+def invalidate():
+    _registry.invalidate()
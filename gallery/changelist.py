@@ -0,0 +1,158 @@
+"""
+Admin changelist helpers for tables that grow without bound (orders, carts,
+contact submissions).
+
+LargeTableAdminMixin swaps the exact COUNT(*) for MySQL's table statistics
+when the list is unfiltered and pages through the default ordering with a
+(created_at, id) cursor instead of OFFSET. Sorting by a column header falls
+back to the normal numbered pages. CachedChoicesListFilter keeps the choice
+list of a filter in the cache instead of rebuilding it on every page view.
+"""
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+EXACT_COUNT_THRESHOLD = 10000  # below this an exact COUNT(*) is cheap enough
+ESTIMATE_CACHE_TIMEOUT = 60
+
+
+def estimated_row_count(model):
+    """Approximate number of rows in the model's table, cached for a minute"""
+    table = model._meta.db_table
+    cache_key = f'admin:estimated_count:{table}'
+    count = cache.get(cache_key)
+    if count is not None:
+        return count
+
+    if connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+            row = cursor.fetchone()
+        count = row[0] if row else None
+
+    # InnoDB statistics are rough for small tables, where counting is cheap anyway
+    if count is None or count < EXACT_COUNT_THRESHOLD:
+        count = model._default_manager.count()
+
+    cache.set(cache_key, count, ESTIMATE_CACHE_TIMEOUT)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses table statistics instead of COUNT(*) for unfiltered lists"""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            self.estimated = True
+            return estimated_row_count(self.object_list.model)
+        self.estimated = False
+        return super().count
+
+
+def encode_cursor(obj):
+    return f'{obj.created_at.isoformat()},{obj.pk}'
+
+
+def decode_cursor(value):
+    created_at, _, pk = value.rpartition(',')
+    created_at = parse_datetime(created_at)
+    if created_at is None or not pk.isdigit():
+        return None
+    return created_at, int(pk)
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList that pages the default ordering with a (created_at, id) cursor"""
+
+    def __init__(self, request, *args, **kwargs):
+        # The cursor is not a field lookup, keep it away from the filter machinery
+        self.cursor_var, self.cursor = None, None
+        for var in (AFTER_VAR, BEFORE_VAR):
+            if var in request.GET:
+                self.cursor_var, self.cursor = var, decode_cursor(request.GET[var])
+                request.GET = request.GET.copy()
+                del request.GET[var]
+        super().__init__(request, *args, **kwargs)
+
+    @property
+    def keyset(self):
+        return ORDER_VAR not in self.params and not self.show_all
+
+    def get_results(self, request):
+        if not self.keyset:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset.order_by('-created_at', '-pk')
+
+        if self.cursor and self.cursor_var == AFTER_VAR:
+            created_at, pk = self.cursor
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        elif self.cursor and self.cursor_var == BEFORE_VAR:
+            created_at, pk = self.cursor
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+            ).order_by('created_at', 'pk')
+
+        rows = list(queryset[:self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+
+        if self.cursor_var == BEFORE_VAR and self.cursor:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, bool(self.cursor)
+
+        self.next_url = self.get_query_string({AFTER_VAR: encode_cursor(rows[-1])}) if self.has_next and rows else None
+        self.previous_url = self.get_query_string({BEFORE_VAR: encode_cursor(rows[0])}) if self.has_previous and rows else None
+
+        self.result_count = paginator.count
+        self.result_count_estimated = getattr(paginator, 'estimated', False)
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = self.has_next or self.has_previous
+        self.paginator = paginator
+
+
+class LargeTableAdminMixin:
+    """ModelAdmin mixin: estimated totals and cursor paging for big, time-ordered tables"""
+    change_list_template = 'admin/large_table_change_list.html'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+class CachedChoicesListFilter(admin.SimpleListFilter):
+    """SimpleListFilter whose lookups() result is cached; subclasses implement get_choices()"""
+    cache_timeout = 600
+
+    def get_choices(self, request, model_admin):
+        raise NotImplementedError
+
+    def lookups(self, request, model_admin):
+        cache_key = f'admin:filter_choices:{model_admin.model._meta.label_lower}:{self.parameter_name}'
+        choices = cache.get(cache_key)
+        if choices is None:
+            choices = list(self.get_choices(request, model_admin))
+            cache.set(cache_key, choices, self.cache_timeout)
+        return choices
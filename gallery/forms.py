@@ -0,0 +1,111 @@
+from django import forms
+
+
+class ArtworkImportForm(forms.Form):
+    """Admin form for bulk artwork import"""
+    manifest = forms.FileField(help_text="CSV or JSON manifest, one artwork per row")
+    images = forms.FileField(help_text="Zip archive containing every image named in the manifest")
+    dry_run = forms.BooleanField(required=False, help_text="Only validate the manifest, do not create anything")
+
+    def clean_images(self):
+        images = self.cleaned_data['images']
+        if not images.name.lower().endswith('.zip'):
+            raise forms.ValidationError("Please upload the images as a .zip archive.")
+        return images
+
+
+class ChunkedUploadWidget(forms.HiddenInput):
+    """Hidden token input plus a file picker that uploads in chunks (gallery/js/chunked_upload.js)"""
+
+    def __init__(self, purpose, attrs=None):
+        super().__init__(attrs)
+        self.purpose = purpose
+
+    class Media:
+        js = ('gallery/js/chunked_upload.js',)
+
+    def render(self, name, value, attrs=None, renderer=None):
+        from django.urls import reverse
+        from django.utils.html import format_html
+
+        hidden = super().render(name, value, attrs, renderer)
+        return format_html(
+            '{}<input type="file" data-chunked-upload="{}" data-start-url="{}" data-target="{}">'
+            '<div class="help chunked-upload-status"></div>',
+            hidden, self.purpose, reverse('gallery:upload_start'), (attrs or {}).get('id', f'id_{name}'),
+        )
+
+
+class ArtworkAdminForm(forms.ModelForm):
+    """Artwork form whose image and video can instead be uploaded in chunks, for large files"""
+    # token field -> (model field, upload purpose)
+    UPLOAD_FIELDS = {
+        'main_image_upload': ('main_image', 'artwork_image'),
+        'artwork_video_upload': ('artwork_video', 'artwork_video'),
+    }
+
+    main_image_upload = forms.CharField(
+        required=False, label="Or upload a large image",
+        widget=ChunkedUploadWidget('artwork_image'),
+    )
+    artwork_video_upload = forms.CharField(
+        required=False, label="Or upload a large video",
+        widget=ChunkedUploadWidget('artwork_video'),
+    )
+
+    upload_user = None  # set by ArtworkAdmin.get_form
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunked_uploads = []
+        if 'main_image' in self.fields:
+            # Required unless it comes through main_image_upload, see clean()
+            self.fields['main_image'].required = False
+
+    def clean(self):
+        from PIL import Image
+
+        from . import uploads
+
+        cleaned_data = super().clean()
+        for token_field, (field, purpose) in self.UPLOAD_FIELDS.items():
+            token = cleaned_data.get(token_field)
+            if not token or field not in self.fields:
+                continue
+            try:
+                upload = uploads.claim(token, purpose, self.upload_user)
+            except uploads.UploadError as e:
+                self.add_error(token_field, str(e))
+                continue
+            if purpose == 'artwork_image':
+                try:
+                    with Image.open(uploads.part_path(upload)) as image:
+                        image.verify()
+                except Exception:
+                    self.add_error(token_field, "The uploaded file is not a valid image.")
+                    continue
+            cleaned_data[field] = uploads.open_file(upload)
+            self.chunked_uploads.append((upload, cleaned_data[field]))
+
+        if 'main_image' in self.fields and not cleaned_data.get('main_image') and 'main_image' not in self.errors:
+            self.add_error('main_image', forms.Field.default_error_messages['required'])
+        return cleaned_data
+
+    def full_clean(self):
+        super().full_clean()
+        if self._errors:
+            # Nothing will be saved; the tokens stay valid for the next submission
+            self.close_uploads()
+
+    def close_uploads(self):
+        for _, file in self.chunked_uploads:
+            file.close()
+        self.chunked_uploads = []
+
+    def release_uploads(self):
+        """Drop the claimed uploads once the artwork, and so their files, are saved"""
+        from . import uploads
+
+        for upload, _ in self.chunked_uploads:
+            uploads.release(upload)
+        self.close_uploads()
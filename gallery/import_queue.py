@@ -0,0 +1,91 @@
+"""
+Admin bulk imports, run off-request.
+
+Validating a manifest decodes every image in a ProcessPoolExecutor, and
+importing stores all of them, which is no work for a gunicorn worker. The
+admin import view only stores the uploaded manifest and zip as an
+ArtworkImportJob, in private storage (see jasem_site.storage). The
+process_artwork_imports worker (cron, or --interval) then runs queued jobs one
+at a time, records the summary or the rejected rows in the job's result, and
+deletes both files.
+"""
+import logging
+import tempfile
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .importers import ArtworkImporter, ImageSource, ManifestError, read_manifest
+from .models import ArtworkImportJob
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'gallery:import_queue:running'
+LOCK_TIMEOUT = 60 * 60
+
+
+def enqueue(manifest, images, dry_run=False, user=None):
+    """Store an uploaded manifest and image zip for the worker"""
+    job = ArtworkImportJob(dry_run=dry_run, created_by=user)
+    job.manifest.save(manifest.name, manifest, save=False)
+    job.images.save(images.name, images, save=False)
+    job.save()
+    return job
+
+
+def _import(job, images_path):
+    with job.manifest.open('rb') as fh:
+        rows = read_manifest(fh, job.manifest.name)
+    importer = ArtworkImporter(rows, ImageSource(images_path))
+    if not importer.validate():
+        raise ManifestError(importer.errors)
+    if job.dry_run:
+        return f'{len(importer.entries)} rows are valid. Nothing was created.'
+    summary = importer.run()
+    return (
+        f"Imported {summary['artworks']} artworks, {summary['editions']} editions "
+        f"and {summary['sculpture_images']} sculpture images."
+    )
+
+
+def run_job(job):
+    """Run one queued job; False if another worker claimed it first"""
+    if not ArtworkImportJob.objects.filter(pk=job.pk, status='queued').update(status='running'):
+        return False
+
+    status = 'done'
+    try:
+        try:
+            result = _import(job, job.images.path)
+        except NotImplementedError:
+            # Remote storage: the importer needs a local file
+            with tempfile.NamedTemporaryFile(suffix='.zip') as images_zip, job.images.open('rb') as fh:
+                for chunk in fh.chunks():
+                    images_zip.write(chunk)
+                images_zip.flush()
+                result = _import(job, images_zip.name)
+    except ManifestError as e:
+        status, result = 'failed', '\n'.join(e.errors)
+    except Exception as e:
+        logger.exception("Artwork import %s failed", job.pk)
+        status, result = 'failed', f'{type(e).__name__}: {e}'
+
+    job.manifest.delete(save=False)
+    job.images.delete(save=False)
+    ArtworkImportJob.objects.filter(pk=job.pk).update(
+        status=status, result=result, manifest='', images='', finished_at=timezone.now()
+    )
+    return True
+
+
+def process_queue():
+    """Run every queued job; None if another worker is running, else how many ran"""
+    if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        return None
+    try:
+        ran = 0
+        for job in ArtworkImportJob.objects.filter(status='queued').order_by('pk'):
+            ran += run_job(job)
+        return ran
+    finally:
+        cache.delete(LOCK_KEY)
@@ -0,0 +1,336 @@
+"""
+Bulk artwork ingest from a CSV/JSON manifest plus a folder or zip of images.
+
+Manifest columns (CSV header or JSON object keys):
+
+    key                    optional row id, used by other rows' ``original`` column
+    title, description, artist_statement, artwork_creation_date (YYYY-MM-DD)
+    height, width, depth   dimensions in cm (depth optional)
+    price
+    category               Category.name or Category.display_name
+    image                  main image file name inside the image folder/zip
+    angle_images           optional "file|description;file|description" list (sculptures only)
+    original               optional ``key``/title of another manifest row, or id of an existing artwork
+    is_available, is_limited_edition, featured, is_active   yes/no, true/false, 1/0
+    total_copies, sold_copies
+"""
+import csv
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .categories import all_categories
+from .models import Artwork, SculptureImage
+
+
+REQUIRED_COLUMNS = [
+    'title', 'description', 'artist_statement', 'artwork_creation_date',
+    'height', 'width', 'price', 'category', 'image',
+]
+MAX_ANGLE_IMAGES = 8
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', ''}
+
+
+class ManifestError(ValueError):
+    """Raised when a manifest cannot be read or contains invalid rows"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('\n'.join(errors))
+
+
+class ImageSource:
+    """Read image files from a directory or a zip archive by name"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.is_zip = zipfile.is_zipfile(self.path)
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                self.names = {os.path.basename(n): n for n in archive.namelist() if not n.endswith('/')}
+        elif os.path.isdir(self.path):
+            self.names = {n: n for n in os.listdir(self.path)}
+        else:
+            raise ManifestError([f'Image source "{self.path}" is neither a directory nor a zip file'])
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def read(self, name):
+        return read_image_bytes(self.path, self.is_zip, self.names[name])
+
+
+def read_image_bytes(path, is_zip, member):
+    if is_zip:
+        with zipfile.ZipFile(path) as archive:
+            return archive.read(member)
+    with open(os.path.join(path, member), 'rb') as fh:
+        return fh.read()
+
+
+def inspect_image(args):
+    """Fully decode one image in a worker process; returns (name, error or None)"""
+    from PIL import Image
+
+    path, is_zip, member, name = args
+    try:
+        with Image.open(io.BytesIO(read_image_bytes(path, is_zip, member))) as img:
+            img.load()
+    except Exception as e:
+        return name, f'{type(e).__name__}: {e}'
+    return name, None
+
+
+def read_manifest(fileobj, filename=''):
+    """Parse a CSV or JSON manifest into a list of dicts with stripped string values"""
+    raw = fileobj.read()
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8-sig')
+
+    if filename.lower().endswith('.json') or raw.lstrip().startswith('['):
+        try:
+            rows = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ManifestError([f'Invalid JSON manifest: {e}'])
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ManifestError(['JSON manifest must be a list of objects'])
+    else:
+        rows = list(csv.DictReader(io.StringIO(raw)))
+
+    return [
+        {str(k).strip(): ('' if v is None else str(v).strip()) for k, v in row.items()}
+        for row in rows
+    ]
+
+
+def _parse_bool(value, default):
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return default if value == '' else False
+    raise ValueError(f'"{value}" is not a yes/no value')
+
+
+def _parse_decimal(value):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'"{value}" is not a number')
+
+
+class ArtworkImporter:
+    """Validate a manifest against an image source and bulk-create the artworks"""
+
+    def __init__(self, rows, images, chunk_size=100, workers=None):
+        self.rows = rows
+        self.images = images
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.errors = []
+        self.entries = []
+
+    def validate(self):
+        """Check every row; collects messages in self.errors and returns True when clean"""
+        categories = {}
+        for category in all_categories():
+            categories[category.name.lower()] = category
+            categories[category.display_name.lower()] = category
+
+        keys = set()
+        main_images = set()
+        for line, row in enumerate(self.rows, start=2):
+            entry = self._validate_row(line, row, categories)
+            if entry is None:
+                continue
+            if entry['key'] in keys:
+                self.errors.append(f'Row {line}: duplicate key "{entry["key"]}"')
+                continue
+            if entry['image'] in main_images:
+                self.errors.append(f'Row {line}: main image "{entry["image"]}" is used by another row')
+                continue
+            keys.add(entry['key'])
+            main_images.add(entry['image'])
+            self.entries.append(entry)
+
+        self._resolve_originals(keys)
+        if not self.errors:
+            self._inspect_images()
+        return not self.errors
+
+    def _validate_row(self, line, row, categories):
+        missing = [col for col in REQUIRED_COLUMNS if not row.get(col)]
+        if missing:
+            self.errors.append(f'Row {line}: missing {", ".join(missing)}')
+            return None
+
+        category = categories.get(row['category'].lower())
+        if category is None:
+            self.errors.append(f'Row {line}: unknown category "{row["category"]}"')
+            return None
+
+        try:
+            fields = {
+                'title': row['title'],
+                'description': row['description'],
+                'artist_statement': row['artist_statement'],
+                'artwork_creation_date': date.fromisoformat(row['artwork_creation_date']),
+                'height': _parse_decimal(row['height']),
+                'width': _parse_decimal(row['width']),
+                'depth': _parse_decimal(row['depth']) if row.get('depth') else None,
+                'price': _parse_decimal(row['price']),
+                'category': category,
+                'is_available': _parse_bool(row.get('is_available', ''), True),
+                'is_limited_edition': _parse_bool(row.get('is_limited_edition', ''), False),
+                'total_copies': int(row.get('total_copies') or 0),
+                'sold_copies': int(row.get('sold_copies') or 0),
+                'featured': _parse_bool(row.get('featured', ''), False),
+                'is_active': _parse_bool(row.get('is_active', ''), True),
+            }
+        except ValueError as e:
+            self.errors.append(f'Row {line}: {e}')
+            return None
+
+        angle_images = []
+        for part in filter(None, (p.strip() for p in row.get('angle_images', '').split(';'))):
+            name, _, description = part.partition('|')
+            angle_images.append((name.strip(), description.strip() or 'View'))
+        if angle_images and 'sculpture' not in category.name.lower():
+            self.errors.append(f'Row {line}: only sculpture categories can have angle images')
+            return None
+        if len(angle_images) > MAX_ANGLE_IMAGES:
+            self.errors.append(f'Row {line}: at most {MAX_ANGLE_IMAGES} angle images are allowed')
+            return None
+
+        missing_images = [n for n in [row['image']] + [n for n, _ in angle_images] if n not in self.images]
+        if missing_images:
+            self.errors.append(f'Row {line}: image(s) not found: {", ".join(missing_images)}')
+            return None
+
+        return {
+            'line': line,
+            'key': row.get('key') or row['title'],
+            'fields': fields,
+            'image': row['image'],
+            'angle_images': angle_images,
+            'original': row.get('original', ''),
+        }
+
+    def _resolve_originals(self, keys):
+        """Point each edition either at another manifest row or at an existing artwork id"""
+        existing_ids = [int(e['original']) for e in self.entries
+                        if e['original'] and e['original'] not in keys and e['original'].isdigit()]
+        existing = Artwork.objects.in_bulk(existing_ids)
+
+        for entry in self.entries:
+            ref = entry['original']
+            entry['original_key'] = None
+            if not ref:
+                continue
+            if ref in keys:
+                if ref == entry['key']:
+                    self.errors.append(f'Row {entry["line"]}: an artwork cannot be its own original')
+                entry['original_key'] = ref
+            elif ref.isdigit() and int(ref) in existing:
+                entry['fields']['original_artwork'] = existing[int(ref)]
+            else:
+                self.errors.append(f'Row {entry["line"]}: original "{ref}" not found')
+
+        by_key = {e['key']: e for e in self.entries}
+        for entry in self.entries:
+            parent = by_key.get(entry['original_key'])
+            if parent and parent['original_key']:
+                self.errors.append(f'Row {entry["line"]}: original "{parent["key"]}" is itself an edition')
+
+    def _inspect_images(self):
+        names = set()
+        for entry in self.entries:
+            names.add(entry['image'])
+            names.update(n for n, _ in entry['angle_images'])
+
+        jobs = [(self.images.path, self.images.is_zip, self.images.names[n], n) for n in sorted(names)]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for name, error in pool.map(inspect_image, jobs, chunksize=8):
+                if error:
+                    self.errors.append(f'Image "{name}" is not a readable image ({error})')
+
+    def run(self):
+        """Validate, store the image files and create everything; returns a summary dict"""
+        if not self.entries and not self.errors:
+            self.validate()
+        if self.errors:
+            raise ManifestError(self.errors)
+
+        saved_files = []
+        try:
+            stored = {}
+            for entry in self.entries:
+                for name, upload_to in [(entry['image'], 'artworks/')] + [
+                        (n, 'sculptures/angles/') for n, _ in entry['angle_images']]:
+                    if (name, upload_to) not in stored:
+                        path = default_storage.save(upload_to + name, ContentFile(self.images.read(name)))
+                        stored[(name, upload_to)] = path
+                        saved_files.append(path)
+
+            with transaction.atomic():
+                return self._create(stored)
+        except Exception:
+            for path in saved_files:
+                default_storage.delete(path)
+            raise
+
+    def _create(self, stored):
+        originals = [e for e in self.entries if not e['original_key']]
+        editions = [e for e in self.entries if e['original_key']]
+
+        artworks = {}
+        artworks.update(self._bulk_create_artworks(originals, stored, artworks))
+        artworks.update(self._bulk_create_artworks(editions, stored, artworks))
+
+        angle_images = []
+        for entry in self.entries:
+            for order, (name, description) in enumerate(entry['angle_images'], start=1):
+                angle_images.append(SculptureImage(
+                    artwork=artworks[entry['key']],
+                    image=stored[(name, 'sculptures/angles/')],
+                    angle_description=description,
+                    order=order,
+                ))
+        SculptureImage.objects.bulk_create(angle_images, batch_size=self.chunk_size)
+
+        return {
+            'artworks': len(originals),
+            'editions': len(editions),
+            'sculpture_images': len(angle_images),
+        }
+
+    def _bulk_create_artworks(self, entries, stored, created):
+        objs = []
+        for entry in entries:
+            fields = dict(entry['fields'])
+            if entry['original_key']:
+                fields['original_artwork'] = created[entry['original_key']]
+            objs.append(Artwork(main_image=stored[(entry['image'], 'artworks/')], **fields))
+
+        for start in range(0, len(objs), self.chunk_size):
+            Artwork.objects.bulk_create(objs[start:start + self.chunk_size])
+
+        # MySQL does not return primary keys from bulk inserts; the stored image
+        # paths are unique, so use them to look the new rows back up.
+        if any(obj.pk is None for obj in objs):
+            pks = dict(Artwork.objects.filter(
+                main_image__in=[obj.main_image.name for obj in objs]
+            ).values_list('main_image', 'pk'))
+            for obj in objs:
+                obj.pk = pks[obj.main_image.name]
+
+        return {entry['key']: obj for entry, obj in zip(entries, objs)}
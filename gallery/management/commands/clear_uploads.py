@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from gallery import uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked uploads that were never finished or never submitted with their form'
+
+    def handle(self, *args, **options):
+        deleted = uploads.clear_expired()
+        self.stdout.write(f"Deleted {deleted} expired uploads")
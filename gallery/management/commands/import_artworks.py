@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gallery.importers import ArtworkImporter, ImageSource, ManifestError, read_manifest
+
+
+class Command(BaseCommand):
+    help = 'Bulk import artworks from a CSV/JSON manifest and a folder or zip of images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='Path to the CSV or JSON manifest')
+        parser.add_argument('images', help='Directory or zip file containing the images')
+        parser.add_argument('--chunk-size', type=int, default=100, help='Rows per bulk insert')
+        parser.add_argument('--workers', type=int, default=None, help='Image-check processes (default: CPU count)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, do not create anything')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['manifest'], 'rb') as fh:
+                rows = read_manifest(fh, options['manifest'])
+            importer = ArtworkImporter(
+                rows,
+                ImageSource(options['images']),
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+            )
+            if not importer.validate():
+                raise ManifestError(importer.errors)
+        except (OSError, ManifestError) as e:
+            raise CommandError(f'Manifest rejected:\n{e}')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{len(importer.entries)} rows are valid (dry run, nothing created)'))
+            return
+
+        summary = importer.run()
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['artworks']} artworks, {summary['editions']} editions "
+            f"and {summary['sculpture_images']} sculpture images"
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gallery.import_queue import process_queue
+
+
+class Command(BaseCommand):
+    help = 'Run artwork imports queued from the admin (run from cron, or with --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and check for queued imports every N seconds (default: once and exit)')
+
+    def handle(self, *args, **options):
+        while True:
+            ran = process_queue()
+            if ran is None:
+                self.stdout.write('Another worker is running imports')
+            else:
+                self.stdout.write(f'Ran {ran} queued imports')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_sculptureimage_height_sculptureimage_width'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('token', models.CharField(max_length=64, unique=True)),
+                ('purpose', models.CharField(choices=[('artwork_video', 'Artwork video'), ('artwork_image', 'Artwork image'), ('contact_attachment', 'Contact form attachment')], max_length=30)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0, help_text='Bytes stored so far, always from the start')),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('writing', 'Writing a chunk'), ('complete', 'Complete')], default='uploading', max_length=20)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['updated_at'], name='gallery_chu_updated_e949b7_idx')],
+            },
+        ),
+    ]
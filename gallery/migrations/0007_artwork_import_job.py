@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:50
+
+import django.db.models.deletion
+import jasem_site.storage
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0006_chunked_upload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtworkImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('manifest', models.FileField(blank=True, help_text='Deleted once the import has run', storage=jasem_site.storage.private_storage, upload_to=jasem_site.storage.RandomName('imports'))),
+                ('images', models.FileField(blank=True, help_text='Deleted once the import has run', storage=jasem_site.storage.private_storage, upload_to=jasem_site.storage.RandomName('imports'))),
+                ('dry_run', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('result', models.TextField(blank=True, help_text='Summary, or the reasons the manifest was rejected')),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.urls import reverse
+from . import categories
+from jasem_site.storage import RandomName, private_storage
 
 
 class TimestampedModel(models.Model):
@@ -27,6 +31,13 @@ class Category(TimestampedModel):
         return self.display_name
 
 
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_registry(sender, **kwargs):
+    """Reload the cached category registry in every process"""
+    transaction.on_commit(categories.invalidate)
+
+
 class Artwork(TimestampedModel):
     """Main artwork model - supports 4 categories: original paintings, original sculptures, signed prints, signed photo sets"""
     
@@ -77,6 +88,21 @@ class Artwork(TimestampedModel):
     def get_absolute_url(self):
         return reverse('gallery:artwork_detail', kwargs={'pk': self.pk})
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept so saves can tell what changed (wishlist price-drop/restock notifications,
+        # pre-rendering the category an artwork moved out of)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Only now, after every post_save receiver compared against it, does the saved state become the baseline
+        loaded = getattr(self, '_loaded_values', None)
+        names = loaded.keys() if loaded is not None else [field.attname for field in self._meta.concrete_fields]
+        self._loaded_values = {name: getattr(self, name) for name in names}
+    
     @property
     def dimensions_display(self):
         """Format dimensions for display"""
@@ -143,6 +169,62 @@ class SculptureImage(TimestampedModel):
     
     def save(self, *args, **kwargs):
         # Allow for both sculptures and printed sculpture sets
-        if self.artwork.category and 'sculpture' not in self.artwork.category.name.lower():
+        category = categories.get_category(self.artwork.category_id) or self.artwork.category  # registry may be stale
+        if 'sculpture' not in category.name.lower():
             raise ValueError("Only sculptures and printed sculpture sets can have multiple angle images")
         super().save(*args, **kwargs)
+
+
+class ArtworkImportJob(TimestampedModel):
+    """A bulk import uploaded in the admin, waiting for the process_artwork_imports worker"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    # Kept out of MEDIA_ROOT until the worker has run the import, then deleted
+    manifest = models.FileField(upload_to=RandomName('imports'), storage=private_storage, blank=True,
+                                help_text="Deleted once the import has run")
+    images = models.FileField(upload_to=RandomName('imports'), storage=private_storage, blank=True,
+                              help_text="Deleted once the import has run")
+    dry_run = models.BooleanField(default=False)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    result = models.TextField(blank=True, help_text="Summary, or the reasons the manifest was rejected")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Import {self.pk} ({self.get_status_display()})"
+
+
+class ChunkedUpload(TimestampedModel):
+    """A large file being uploaded in chunks; forms refer to it by token once complete"""
+    PURPOSES = [
+        ('artwork_video', 'Artwork video'),
+        ('artwork_image', 'Artwork image'),
+        ('contact_attachment', 'Contact form attachment'),
+    ]
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('writing', 'Writing a chunk'),
+        ('complete', 'Complete'),
+    ]
+    
+    token = models.CharField(max_length=64, unique=True)
+    purpose = models.CharField(max_length=30, choices=PURPOSES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0, help_text="Bytes stored so far, always from the start")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    
+    class Meta:
+        indexes = [models.Index(fields=['updated_at'])]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
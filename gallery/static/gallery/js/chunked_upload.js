@@ -0,0 +1,250 @@
+/*
+ * Chunked, resumable uploads (see gallery/uploads.py).
+ *
+ * ChunkedUpload.upload(file, {purpose, startUrl, onProgress}) resolves with a
+ * token to submit in place of the file. Each chunk is sent with its SHA-256
+ * and retried on failure; the session is remembered in localStorage, so
+ * picking the same file again after a reload or a dropped connection resumes
+ * where the server left off.
+ *
+ * <input type="file" data-chunked-upload="<purpose>" data-start-url="..."
+ *        data-target="<id of the hidden token input>"> is wired up
+ * automatically; its form can't be submitted while an upload is running.
+ */
+(function () {
+    'use strict';
+
+    const RETRIES = 5;
+
+    function csrfToken() {
+        const match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        if (match) {
+            return decodeURIComponent(match[1]);
+        }
+        const input = document.querySelector('input[name="csrfmiddlewaretoken"]');
+        return input ? input.value : '';
+    }
+
+    function storageKey(file, purpose) {
+        return ['chunked-upload', purpose, file.name, file.size, file.lastModified].join(':');
+    }
+
+    function remember(key, value) {
+        try {
+            if (value) {
+                localStorage.setItem(key, JSON.stringify(value));
+            } else {
+                localStorage.removeItem(key);
+            }
+        } catch (e) {
+            // Private browsing: uploads still work, they just can't resume after a reload
+        }
+    }
+
+    function recall(key) {
+        try {
+            return JSON.parse(localStorage.getItem(key));
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function request(url, options) {
+        options.headers = Object.assign({'X-CSRFToken': csrfToken()}, options.headers || {});
+        options.credentials = 'same-origin';
+        return fetch(url, options).then(response => response.json().then(data => {
+            data.httpStatus = response.status;
+            if (!response.ok && response.status !== 409) {
+                const error = new Error(data.error || 'Upload failed');
+                error.retry = response.status >= 500 || response.status === 400;
+                throw error;
+            }
+            return data;
+        }));
+    }
+
+    const K = new Uint32Array([
+        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+    ]);
+
+    function rotr(x, n) {
+        return (x >>> n) | (x << (32 - n));
+    }
+
+    // crypto.subtle only exists in secure contexts; plain http still gets a checksum for every chunk
+    function sha256Fallback(buffer) {
+        const bytes = new Uint8Array(buffer);
+        const padded = new Uint8Array((bytes.length + 72) & ~63);
+        padded.set(bytes);
+        padded[bytes.length] = 0x80;
+        const view = new DataView(padded.buffer);
+        view.setUint32(padded.length - 8, Math.floor(bytes.length / 0x20000000));
+        view.setUint32(padded.length - 4, bytes.length * 8);
+
+        const hash = new Uint32Array([
+            0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+        ]);
+        const w = new Uint32Array(64);
+        for (let offset = 0; offset < padded.length; offset += 64) {
+            for (let i = 0; i < 16; i++) {
+                w[i] = view.getUint32(offset + i * 4);
+            }
+            for (let i = 16; i < 64; i++) {
+                const s0 = rotr(w[i - 15], 7) ^ rotr(w[i - 15], 18) ^ (w[i - 15] >>> 3);
+                const s1 = rotr(w[i - 2], 17) ^ rotr(w[i - 2], 19) ^ (w[i - 2] >>> 10);
+                w[i] = w[i - 16] + s0 + w[i - 7] + s1;
+            }
+            let [a, b, c, d, e, f, g, h] = hash;
+            for (let i = 0; i < 64; i++) {
+                const t1 = h + (rotr(e, 6) ^ rotr(e, 11) ^ rotr(e, 25)) + ((e & f) ^ (~e & g)) + K[i] + w[i];
+                const t2 = (rotr(a, 2) ^ rotr(a, 13) ^ rotr(a, 22)) + ((a & b) ^ (a & c) ^ (b & c));
+                [h, g, f, e, d, c, b, a] = [g, f, e, (d + t1) | 0, c, b, a, (t1 + t2) | 0];
+            }
+            [a, b, c, d, e, f, g, h].forEach((value, i) => {
+                hash[i] += value;
+            });
+        }
+        const digest = new Uint8Array(32);
+        hash.forEach((word, i) => new DataView(digest.buffer).setUint32(i * 4, word));
+        return digest;
+    }
+
+    function sha256(blob) {
+        const digest = window.crypto && crypto.subtle
+            ? buffer => crypto.subtle.digest('SHA-256', buffer)
+            : sha256Fallback;
+        return blob.arrayBuffer()
+            .then(digest)
+            .then(result => Array.from(new Uint8Array(result), b => b.toString(16).padStart(2, '0')).join(''));
+    }
+
+    function resumeOrStart(file, options, key) {
+        const saved = recall(key);
+        const start = () => request(options.startUrl, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({purpose: options.purpose, filename: file.name, size: file.size})
+        }).then(session => {
+            remember(key, {url: session.url, token: session.token});
+            return session;
+        });
+        if (!saved) {
+            return start();
+        }
+        return request(saved.url, {method: 'GET'}).catch(() => null).then(session => {
+            if (session && session.token && session.httpStatus === 200) {
+                return session;
+            }
+            remember(key, null);
+            return start();
+        });
+    }
+
+    function sendChunks(file, session, onProgress) {
+        let attempts = 0;
+
+        function next(received) {
+            onProgress(received, file.size);
+            if (received >= file.size) {
+                return Promise.resolve(session.token);
+            }
+            const end = Math.min(received + session.chunk_size, file.size);
+            const chunk = file.slice(received, end);
+            return sha256(chunk).then(checksum => request(session.url, {
+                method: 'PUT',
+                headers: {'Content-Range': `bytes ${received}-${end - 1}/${file.size}`, 'X-Chunk-SHA256': checksum},
+                body: chunk
+            })).then(data => {
+                if (data.httpStatus === 409 && data.received === received) {
+                    // An earlier copy of this chunk is still being written: wait, then try again
+                    const error = new Error(data.error);
+                    error.retry = true;
+                    throw error;
+                }
+                return data;
+            }).then(data => {
+                attempts = 0;
+                // 409: the server has a different offset (a retried chunk did land), carry on from there
+                return next(data.received);
+            }, error => {
+                attempts += 1;
+                if (error.retry === false || attempts > RETRIES) {
+                    throw error;
+                }
+                const delay = 1000 * Math.pow(2, attempts - 1);
+                return new Promise(resolve => setTimeout(resolve, delay)).then(() => next(received));
+            });
+        }
+
+        return next(session.received);
+    }
+
+    function upload(file, options) {
+        const key = storageKey(file, options.purpose);
+        const onProgress = options.onProgress || function () {};
+        return resumeOrStart(file, options, key)
+            .then(session => session.complete ? session.token : sendChunks(file, session, onProgress))
+            .then(token => {
+                remember(key, null);
+                return token;
+            });
+    }
+
+    function bind(input) {
+        const target = document.getElementById(input.dataset.target);
+        const status = input.parentNode.querySelector('.chunked-upload-status');
+        const form = input.form;
+        let running = 0;
+
+        input.addEventListener('change', function () {
+            const file = input.files[0];
+            target.value = '';
+            if (!file) {
+                return;
+            }
+            running += 1;
+            upload(file, {
+                purpose: input.dataset.chunkedUpload,
+                startUrl: input.dataset.startUrl,
+                onProgress: (received, size) => {
+                    if (status) {
+                        status.textContent = `Uploading ${file.name}: ${Math.floor(100 * received / size)}%`;
+                    }
+                }
+            }).then(token => {
+                target.value = token;
+                if (status) {
+                    status.textContent = `${file.name} uploaded, save to attach it.`;
+                }
+            }).catch(error => {
+                if (status) {
+                    status.textContent = `Upload failed: ${error.message}. Choose the file again to resume.`;
+                }
+            }).finally(() => {
+                running -= 1;
+            });
+        });
+
+        if (form) {
+            form.addEventListener('submit', function (e) {
+                if (running) {
+                    e.preventDefault();
+                    alert('Please wait for the upload to finish.');
+                }
+            });
+        }
+    }
+
+    window.ChunkedUpload = {upload: upload};
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('input[type="file"][data-chunked-upload]').forEach(bind);
+    });
+})();
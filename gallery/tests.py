@@ -1,3 +1,240 @@
-from django.test import TestCase
+import hashlib
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jasem_site.registry import VersionedRegistry
+from . import categories, import_queue, uploads
+from .models import Artwork, Category, ChunkedUpload, SculptureImage
+
+
+class ChunkedUploadTests(TestCase):
+    """Chunks are only counted in order, whole and with a matching checksum"""
+
+    CONTENT = b'0123456789abcdefghijklmnopqrstuvwxy'  # 35 bytes: chunks of 10, 10, 10 and 5
+
+    def setUp(self):
+        cache.clear()
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        self.enterContext(override_settings(CHUNKED_UPLOADS={
+            'temp_dir': temp_dir, 'chunk_size': 10, 'max_anonymous': 2, 'start_ip': (3, 1 / 60),
+        }))
+
+    def start(self, filename='letter.pdf', size=None):
+        return uploads.start(None, 'contact_attachment', filename, len(self.CONTENT) if size is None else size)
+
+    def put(self, upload, first, last, data=None, checksum=None):
+        data = self.CONTENT[first:last + 1] if data is None else data
+        checksum = hashlib.sha256(data).hexdigest() if checksum is None else checksum
+        return uploads.write_chunk(upload, io.BytesIO(data), f'bytes {first}-{last}/{upload.size}', checksum)
+
+    def assertUploadError(self, status, *args, **kwargs):
+        with self.assertRaises(uploads.UploadError) as raised:
+            self.put(*args, **kwargs)
+        self.assertEqual(raised.exception.status, status)
+
+    def test_chunks_assemble_into_the_file(self):
+        upload = self.start()
+        for first in range(0, len(self.CONTENT), 10):
+            upload = self.put(upload, first, min(first + 9, len(self.CONTENT) - 1))
+        self.assertEqual((upload.received, upload.status), (35, 'complete'))
+
+        claimed = uploads.claim(upload.token, 'contact_attachment')
+        with uploads.open_file(claimed) as assembled:
+            self.assertEqual((assembled.name, assembled.read()), ('letter.pdf', self.CONTENT))
+        uploads.release(claimed)
+        self.assertFalse(uploads.part_path(claimed).exists())
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_out_of_order_and_repeated_chunks_are_rejected(self):
+        upload = self.start()
+        self.assertUploadError(409, upload, 10, 19)
+        upload = self.put(upload, 0, 9)
+        self.assertUploadError(409, upload, 0, 9)
+        # A stale copy of the upload can't advance it from an old offset either
+        stale = ChunkedUpload.objects.get(pk=upload.pk)
+        stale.received = 0
+        self.assertUploadError(409, stale, 0, 9)
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload.pk).received, 10)
+
+    def test_short_chunk_is_not_counted(self):
+        upload = self.start()
+        self.assertUploadError(400, upload, 0, 9, data=self.CONTENT[:6])
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload.pk).received, 0)
+        self.assertEqual(self.put(upload, 0, 9).received, 10)
+
+    def test_checksum_mismatch_is_not_counted(self):
+        upload = self.start()
+        self.assertUploadError(400, upload, 0, 9, checksum=hashlib.sha256(b'other').hexdigest())
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload.pk).received, 0)
+        self.assertEqual(self.put(upload, 0, 9).received, 10)
+
+    def test_chunk_without_checksum_is_rejected(self):
+        upload = self.start()
+        self.assertUploadError(400, upload, 0, 9, checksum='')
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload.pk).received, 0)
+
+    def test_range_is_claimed_before_it_is_written(self):
+        upload = self.start()
+        self.put(upload, 0, 9)
+        # Another request is writing the same chunk
+        ChunkedUpload.objects.filter(pk=upload.pk).update(status='writing', updated_at=timezone.now())
+        stale = ChunkedUpload.objects.get(pk=upload.pk)
+        self.assertUploadError(409, stale, 10, 19, data=b'X' * 10)
+        with open(uploads.part_path(upload), 'rb') as fh:
+            self.assertEqual(fh.read(), self.CONTENT[:10])
+
+        # A claim left behind by a request that died can be taken over
+        ChunkedUpload.objects.filter(pk=upload.pk).update(
+            updated_at=timezone.now() - uploads.WRITE_CLAIM_TIMEOUT - timedelta(seconds=1)
+        )
+        upload = self.put(ChunkedUpload.objects.get(pk=upload.pk), 10, 19)
+        self.assertEqual((upload.received, ChunkedUpload.objects.get(pk=upload.pk).status), (20, 'uploading'))
+
+    def test_chunk_limits(self):
+        upload = self.start()
+        self.assertUploadError(413, upload, 0, 19)
+        with self.assertRaises(uploads.UploadError):
+            uploads.write_chunk(
+                upload, io.BytesIO(b'x'), f'bytes 0-0/{upload.size + 1}', hashlib.sha256(b'x').hexdigest()
+            )
+        with self.assertRaises(uploads.UploadError):
+            uploads.claim(upload.token, 'contact_attachment')  # not finished
+
+    def test_start_checks_purpose_and_file(self):
+        for purpose, filename, size, status in [
+            ('artwork_video', 'clip.mp4', 10, 403),
+            ('contact_attachment', 'run.exe', 10, 400),
+            ('contact_attachment', 'letter.pdf', 0, 400),
+            ('contact_attachment', 'letter.pdf', 11 * uploads.MB, 413),
+        ]:
+            with self.subTest(purpose=purpose, filename=filename), self.assertRaises(uploads.UploadError) as raised:
+                uploads.start(None, purpose, filename, size)
+            self.assertEqual(raised.exception.status, status)
+
+    def test_anonymous_sessions_are_limited(self):
+        self.start()
+        self.start()
+        with self.assertRaises(uploads.UploadError) as raised:
+            self.start()
+        self.assertEqual(raised.exception.status, 503)
+
+    def test_upload_over_http(self):
+        response = self.client.post(
+            reverse('gallery:upload_start'),
+            {'purpose': 'contact_attachment', 'filename': 'letter.pdf', 'size': 35},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        url = response.json()['url']
+
+        def put(first, last):
+            data = self.CONTENT[first:last + 1]
+            return self.client.put(url, data, content_type='application/octet-stream', headers={
+                'Content-Range': f'bytes {first}-{last}/35', 'X-Chunk-SHA256': hashlib.sha256(data).hexdigest(),
+            })
+
+        response = put(10, 19)
+        self.assertEqual((response.status_code, response.json()['received']), (409, 0))
+        response = self.client.put(url, self.CONTENT[:10], content_type='application/octet-stream',
+                                   headers={'Content-Range': 'bytes 0-9/35'})
+        self.assertEqual(response.status_code, 400)  # no checksum
+        response = put(0, 9)
+        self.assertEqual((response.status_code, response.json()['received']), (200, 10))
+        self.assertEqual(self.client.get(url).json()['received'], 10)
+
+    def test_session_starts_are_throttled_per_ip(self):
+        statuses = [
+            self.client.post(
+                reverse('gallery:upload_start'),
+                {'purpose': 'contact_attachment', 'filename': 'run.exe', 'size': 10},
+                content_type='application/json',
+            ).status_code
+            for _ in range(4)
+        ]
+        self.assertEqual(statuses, [400, 400, 400, 429])
+
+
+class VersionedRegistryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.loads = 0
+
+    def registry(self):
+        """One process's registry; every process shares the cache"""
+        def load():
+            self.loads += 1
+            return self.loads
+        return VersionedRegistry('tests:registry:version', load, check_interval=0)
+
+    def test_other_processes_reload_after_invalidate(self):
+        first, second = self.registry(), self.registry()
+        self.assertEqual((first.get(), second.get()), (1, 2))
+        first.invalidate()
+        self.assertEqual(second.get(), 3)
+        self.assertEqual(second.get(), 3)
+
+    def test_invalidate_after_the_version_was_evicted(self):
+        first, second = self.registry(), self.registry()
+        first.invalidate()
+        self.assertEqual((first.get(), second.get()), (1, 2))
+        cache.delete('tests:registry:version')
+        first.invalidate()
+        # A counter restarted at 1 would match the version second already holds
+        self.assertEqual(second.get(), 3)
+
+
+class SculptureImageTests(TestCase):
+
+    def setUp(self):
+        self.painting, _ = Category.objects.get_or_create(
+            name='original_painting', defaults={'display_name': 'Original Painting'}
+        )
+
+    def test_category_check_does_not_depend_on_the_registry(self):
+        artwork = Artwork.objects.create(
+            title='Canvas', description='-', artist_statement='-', artwork_creation_date=date(2020, 1, 1),
+            height=10, width=10, main_image='artworks/test.jpg', price=100, category=self.painting,
+        )
+        # A process whose registry hasn't seen the category yet
+        with mock.patch.object(categories, 'get_category', return_value=None):
+            with self.assertRaises(ValueError):
+                SculptureImage(artwork=artwork, image='sculptures/side.jpg').save()
+        self.assertFalse(SculptureImage.objects.exists())
+
+
+class ArtworkImportJobTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        media_root, private_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        for path in (media_root, private_root):
+            self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, PRIVATE_MEDIA_ROOT=private_root))
+        self.media_root, self.private_root = Path(media_root), Path(private_root)
+
+    def test_uploads_are_private_and_deleted_once_processed(self):
+        job = import_queue.enqueue(
+            SimpleUploadedFile('manifest.json', b'{"not": "a list"}'), SimpleUploadedFile('images.zip', b'PK'),
+        )
+        self.assertEqual(len(list(self.private_root.rglob('*.*'))), 2)
+        self.assertTrue(job.manifest.name.endswith('.json'))
+        self.assertEqual(list(self.media_root.rglob('*.*')), [])
+
+        self.assertEqual(import_queue.process_queue(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('JSON manifest must be a list', job.result)
+        self.assertFalse(job.manifest or job.images)
+        self.assertEqual(list(self.private_root.rglob('*.*')), [])
@@ -0,0 +1,273 @@
+"""
+Chunked, resumable uploads.
+
+Large files (admin artwork videos and high-resolution images, contact form
+attachments) are not posted with their form. The browser
+(gallery/js/chunked_upload.js) instead:
+
+1. starts an upload session: POST /uploads/ with purpose, filename and size,
+   getting back a token;
+2. PUTs the file to /uploads/<token>/ in chunks of at most chunk_size bytes,
+   each with a Content-Range header and an X-Chunk-SHA256 checksum. A chunk is
+   written into CHUNKED_UPLOADS['temp_dir']/<token>.part at its offset and
+   only counted once its checksum matches, so a failed chunk is simply sent
+   again. The range is claimed in the database before it is written, so two
+   copies of a retried chunk never write at once;
+3. after an interruption, GETs /uploads/<token>/ and resumes from `received`;
+4. submits the form with the token instead of the file.
+
+No request holds a worker for longer than one chunk takes. When the form is
+saved the assembled file is moved (not copied) into media storage, as the
+temp directory is on the same filesystem. Unfinished and unclaimed uploads
+are deleted by `manage.py clear_uploads`.
+
+Anyone can start a contact attachment upload, so sessions are rate limited per
+client IP with the accounts.throttling token buckets, and at most
+max_anonymous anonymous sessions are open at once.
+"""
+import hashlib
+import logging
+import os
+import re
+import secrets
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ChunkedUpload
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+PURPOSES = {
+    'artwork_video': {'max_size': 2048 * MB, 'staff_only': True, 'extensions': ('.mp4', '.m4v', '.mov', '.webm')},
+    'artwork_image': {'max_size': 200 * MB, 'staff_only': True,
+                      'extensions': ('.jpg', '.jpeg', '.png', '.webp', '.tif', '.tiff')},
+    # The contact worker checks size and file type again, see pages.contact_queue
+    'contact_attachment': {'max_size': 10 * MB, 'staff_only': False,
+                           'extensions': ('.pdf', '.jpg', '.jpeg', '.png', '.gif')},
+}
+DEFAULTS = {
+    'chunk_size': 8 * MB,
+    'expire_hours': 24,
+    'max_anonymous': 100,
+    # (capacity, tokens refilled per second) of each client IP's session bucket
+    'start_ip': (10, 1 / 60),
+}
+READ_BLOCK = 64 * 1024
+WRITE_CLAIM_TIMEOUT = timedelta(minutes=10)  # a chunk is written within one request
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(Exception):
+    """An upload request that can't be honoured; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _config():
+    config = {**DEFAULTS, **getattr(settings, 'CHUNKED_UPLOADS', {})}
+    config.setdefault('temp_dir', str(Path(settings.BASE_DIR) / 'uploads_tmp'))
+    return config
+
+
+def part_path(upload):
+    return Path(_config()['temp_dir']) / f'{upload.token}.part'
+
+
+def _check_user(upload_or_purpose, user):
+    purpose = getattr(upload_or_purpose, 'purpose', upload_or_purpose)
+    if PURPOSES[purpose]['staff_only'] and not (user and user.is_staff):
+        raise UploadError("Only staff can upload this kind of file.", status=403)
+    if isinstance(upload_or_purpose, ChunkedUpload) and upload_or_purpose.user_id:
+        if not user or user.pk != upload_or_purpose.user_id:
+            raise UploadError("This upload belongs to someone else.", status=403)
+
+
+def allow_start(request):
+    """Consume a session start for the client IP; False if throttled"""
+    from accounts.throttling import get_client_ip, take_token
+
+    ip = get_client_ip(request)
+    allowed = take_token(f'gallery:uploads:start:ip:{ip}', *_config()['start_ip'])
+    if not allowed:
+        logger.warning("Upload session throttled for ip=%s", ip)
+    return allowed
+
+
+def start(user, purpose, filename, size):
+    """Open an upload session and create its empty part file"""
+    if purpose not in PURPOSES:
+        raise UploadError("Unknown upload purpose.")
+    _check_user(purpose, user)
+    anonymous = not (user and user.is_authenticated)
+    if anonymous and ChunkedUpload.objects.filter(user__isnull=True).count() >= _config()['max_anonymous']:
+        raise UploadError("Too many uploads in progress, please try again later.", status=503)
+    rules = PURPOSES[purpose]
+    filename = os.path.basename(str(filename or ''))[-255:]
+    if not filename:
+        raise UploadError("A filename is required.")
+    if os.path.splitext(filename)[1].lower() not in rules['extensions']:
+        raise UploadError(f"Allowed file types: {', '.join(rules['extensions'])}.")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("The file size is required.")
+    if size <= 0:
+        raise UploadError("The file is empty.")
+    if size > rules['max_size']:
+        raise UploadError(f"Files can be at most {rules['max_size'] // MB} MB.", status=413)
+
+    upload = ChunkedUpload.objects.create(
+        token=secrets.token_urlsafe(32),
+        purpose=purpose,
+        filename=filename,
+        size=size,
+        user=None if anonymous else user,
+    )
+    path = part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def get_upload(token, user):
+    upload = ChunkedUpload.objects.filter(token=token).first()
+    if upload is None:
+        raise UploadError("Upload not found or expired.", status=404)
+    _check_user(upload, user)
+    return upload
+
+
+def parse_content_range(header):
+    """(first byte, last byte, total size) from a Content-Range header"""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError("A Content-Range header like 'bytes 0-8388607/52428800' is required.")
+    first, last, total = (int(value) for value in match.groups())
+    if last < first:
+        raise UploadError("Invalid Content-Range.")
+    return first, last, total
+
+
+def write_chunk(upload, stream, content_range, checksum):
+    """Store one chunk read from stream; returns the upload with its new progress"""
+    first, last, total = parse_content_range(content_range)
+    length = last - first + 1
+    if not checksum:
+        raise UploadError("An X-Chunk-SHA256 header with the chunk's checksum is required.")
+    if upload.status == 'complete':
+        raise UploadError("This upload is already complete.", status=409)
+    if total != upload.size or last >= upload.size:
+        raise UploadError("Content-Range does not match the file size.")
+    if length > _config()['chunk_size']:
+        raise UploadError(f"Chunks can be at most {_config()['chunk_size']} bytes.", status=413)
+    if first != upload.received:
+        # Out of order or repeated: the client resumes from `received`
+        raise UploadError(f"Expected the chunk starting at byte {upload.received}.", status=409)
+
+    # Claim the range before touching the part file, so concurrent retries of a chunk never write
+    # over each other. The claim's timestamp identifies it; one left by a crashed worker goes stale.
+    claimed_at = timezone.now()
+    claimable = Q(status='uploading') | Q(status='writing', updated_at__lt=claimed_at - WRITE_CLAIM_TIMEOUT)
+    if not ChunkedUpload.objects.filter(claimable, pk=upload.pk, received=first).update(
+        status='writing', updated_at=claimed_at
+    ):
+        upload.refresh_from_db()
+        raise UploadError(f"Expected the chunk starting at byte {upload.received}.", status=409)
+    claim = ChunkedUpload.objects.filter(pk=upload.pk, status='writing', updated_at=claimed_at)
+
+    try:
+        digest = hashlib.sha256()
+        written = 0
+        with open(part_path(upload), 'r+b') as fh:
+            fh.seek(first)
+            while written < length:
+                block = stream.read(min(READ_BLOCK, length - written))
+                if not block:
+                    break
+                fh.write(block)
+                digest.update(block)
+                written += len(block)
+        if written != length:
+            raise UploadError("The chunk was cut short, please send it again.")
+        if digest.hexdigest() != checksum.strip().lower():
+            raise UploadError("Chunk checksum mismatch, please send it again.")
+    except BaseException:
+        claim.update(status='uploading')
+        raise
+
+    received = last + 1
+    status = 'complete' if received == upload.size else 'uploading'
+    if not claim.update(received=received, status=status, updated_at=timezone.now()):
+        # Took longer than WRITE_CLAIM_TIMEOUT and another request took the range over
+        upload.refresh_from_db()
+        raise UploadError(f"Expected the chunk starting at byte {upload.received}.", status=409)
+    upload.received, upload.status = received, status
+    return upload
+
+
+def progress(upload):
+    return {
+        'token': upload.token,
+        'filename': upload.filename,
+        'size': upload.size,
+        'received': upload.received,
+        'complete': upload.status == 'complete',
+        'chunk_size': _config()['chunk_size'],
+    }
+
+
+class AssembledFile(File):
+    """An assembled upload; storages move it into place instead of copying it"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def claim(token, purpose, user=None):
+    """The complete upload for a submitted token, checked against the form's purpose and user"""
+    upload = get_upload(token, user)
+    if upload.purpose != purpose:
+        raise UploadError("This upload was made for a different field.")
+    if upload.status != 'complete' or not part_path(upload).exists():
+        raise UploadError("The upload has not finished.")
+    return upload
+
+
+def open_file(upload):
+    """The assembled file, named as uploaded; saving it to a FileField moves it into media storage"""
+    return AssembledFile(open(part_path(upload), 'rb'), name=upload.filename)
+
+
+def release(upload):
+    """Forget a claimed upload once its file has been saved"""
+    try:
+        part_path(upload).unlink()
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def clear_expired():
+    """Delete uploads untouched for expire_hours, and stray part files; returns how many were deleted"""
+    cutoff = timezone.now() - timedelta(hours=_config()['expire_hours'])
+    deleted = 0
+    for upload in ChunkedUpload.objects.filter(updated_at__lt=cutoff).iterator():
+        release(upload)
+        deleted += 1
+
+    temp_dir = Path(_config()['temp_dir'])
+    if temp_dir.exists():
+        live = set(ChunkedUpload.objects.values_list('token', flat=True))
+        for path in temp_dir.glob('*.part'):
+            if path.stem not in live and path.stat().st_mtime < cutoff.timestamp():
+                path.unlink()
+                deleted += 1
+    return deleted
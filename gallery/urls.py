@@ -8,4 +8,6 @@ urlpatterns = [
     path('artwork/<int:pk>/', views.artwork_detail, name='artwork_detail'),
     path('category/<str:category_name>/', views.category_view, name='category'),
     path('api/artworks/', views.artwork_api, name='artwork_api'),  # For AJAX filtering
+    path('uploads/', views.upload_start, name='upload_start'),
+    path('uploads/<str:token>/', views.upload_detail, name='upload_detail'),
 ]
\ No newline at end of file
@@ -1,26 +1,25 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.core.paginator import Paginator
 from django.db.models import Q
-from .models import Artwork, Category
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods, require_POST
+import json
+from . import uploads
+from .categories import all_categories, get_category, get_category_by_name
+from .models import Artwork
 
 
 def gallery_home(request):
     """Homepage with featured artworks and gallery overview"""
     # Get hero image from site settings or fallback to first featured artwork
-    from pages.models import SiteSettings, GalleryPageSettings, Exhibition
-    
-    try:
-        settings = SiteSettings.objects.first()
-        hero_artwork = settings.hero_image if settings and settings.hero_image else None
-    except:
-        hero_artwork = None
-    
-    # Get gallery page settings
-    try:
-        gallery_settings = GalleryPageSettings.objects.first()
-    except:
-        gallery_settings = None
+    from pages.exhibitions import highlights
+    from pages.site_settings import get_gallery_settings, get_site_settings
+    from pages.testimonials import carousel
+
+    site_settings = get_site_settings()
+    hero_artwork = site_settings.hero_image if site_settings else None
+    gallery_settings = get_gallery_settings()
     
     # Get featured artworks
     featured_count = gallery_settings.featured_artworks_count if gallery_settings else 6
@@ -35,7 +34,7 @@ def gallery_home(request):
     recent_artworks = Artwork.objects.filter(is_active=True).order_by('-created_at')[:recent_count]
     
     # Get categories with artwork counts
-    categories = Category.objects.all()
+    categories = all_categories()
     category_data = []
     for category in categories:
         artwork_count = category.artwork_set.filter(is_active=True).count()
@@ -48,8 +47,8 @@ def gallery_home(request):
                 'sample_artwork': sample_artwork
             })
     
-    # Get upcoming/recent exhibitions for gallery page
-    exhibitions = Exhibition.objects.filter(is_featured=True)[:3]
+    # Current and upcoming featured exhibitions, then the most recent past ones
+    exhibitions = highlights(3)
     
     context = {
         'hero_artwork': hero_artwork,
@@ -57,6 +56,7 @@ def gallery_home(request):
         'recent_artworks': recent_artworks,
         'categories': category_data,
         'exhibitions': exhibitions,
+        'testimonials': carousel(),
         'gallery_settings': gallery_settings,
         'page_title': 'Jasem Shuman - Contemporary Palestinian Artist',
         'meta_description': 'Explore the contemporary Palestinian artwork of Jasem Shuman. Original paintings and sculptures available for purchase.',
@@ -66,7 +66,10 @@ def gallery_home(request):
 
 def artwork_detail(request, pk):
     """Detailed view of a specific artwork"""
-    artwork = get_object_or_404(Artwork, pk=pk, is_active=True)
+    artwork = get_object_or_404(Artwork.objects.select_related('rating_summary'), pk=pk, is_active=True)
+    category = get_category(artwork.category_id)
+    if category is not None:
+        artwork.category = category  # from the registry; otherwise loaded on access
     
     # Get related artworks from same category (excluding current)
     related_artworks = Artwork.objects.filter(
@@ -91,7 +94,9 @@ def artwork_detail(request, pk):
 
 def category_view(request, category_name):
     """View artworks by category (paintings or sculptures)"""
-    category = get_object_or_404(Category, name=category_name)
+    category = get_category_by_name(category_name)
+    if category is None:
+        raise Http404("No Category matches the given query.")
     
     # Get all artworks in this category
     artworks_list = Artwork.objects.filter(
@@ -131,7 +136,8 @@ def artwork_api(request):
     artworks = Artwork.objects.filter(is_active=True)
     
     if category_name:
-        artworks = artworks.filter(category__name=category_name)
+        category = get_category_by_name(category_name)
+        artworks = artworks.filter(category=category) if category else artworks.none()
     
     if search_query:
         artworks = artworks.filter(
@@ -142,13 +148,14 @@ def artwork_api(request):
     # Prepare JSON response
     artwork_data = []
     for artwork in artworks[:20]:  # Limit to 20 results
+        category = get_category(artwork.category_id)
         artwork_data.append({
             'id': artwork.id,
             'title': artwork.title,
             'image_url': artwork.main_image.url if artwork.main_image else '',
             'original_price': str(artwork.original_price),
             'second_option_price': str(artwork.second_option_price),
-            'category': artwork.category.display_name,
+            'category': category.display_name if category else '',
             'url': f'/artwork/{artwork.id}/',
             'original_available': artwork.original_available,
             'second_option_available': artwork.second_option_available,
@@ -159,3 +166,45 @@ def artwork_api(request):
         'artworks': artwork_data,
         'count': len(artwork_data)
     })
+
+
+def _upload_response(upload, status=200):
+    data = uploads.progress(upload)
+    data['url'] = reverse('gallery:upload_detail', kwargs={'token': upload.token})
+    return JsonResponse(data, status=status)
+
+
+@require_POST
+def upload_start(request):
+    """Open a chunked upload session; body is JSON with purpose, filename and size"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid request data'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Invalid request data'}, status=400)
+    if not uploads.allow_start(request):
+        return JsonResponse({'error': 'Too many uploads, please try again in a minute.'}, status=429)
+    try:
+        upload = uploads.start(request.user, data.get('purpose'), data.get('filename'), data.get('size'))
+    except uploads.UploadError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+    return _upload_response(upload, status=201)
+
+
+@require_http_methods(['GET', 'PUT'])
+def upload_detail(request, token):
+    """GET an upload's progress, or PUT its next chunk (Content-Range and X-Chunk-SHA256)"""
+    try:
+        upload = uploads.get_upload(token, request.user)
+    except uploads.UploadError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+    if request.method == 'PUT':
+        try:
+            upload = uploads.write_chunk(
+                upload, request, request.headers.get('Content-Range'), request.headers.get('X-Chunk-SHA256')
+            )
+        except uploads.UploadError as e:
+            # `received` tells the client where to resume from
+            return JsonResponse({'error': str(e), 'received': upload.received}, status=e.status)
+    return _upload_response(upload)
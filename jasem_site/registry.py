@@ -0,0 +1,51 @@
+"""
+Process-local registries invalidated through a shared cache version.
+
+Small tables that almost never change but are read on every request (the art
+categories, the settings singletons) are loaded once per process. The owning
+model's signals call invalidate(), which drops this process's copy and stores a
+new version token in the shared cache; the other worker processes compare their
+version with it at most once per check_interval and reload when it moved, so
+steady state reads cost no queries.
+
+The loaded data is shared between requests - treat it as read-only.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+
+class VersionedRegistry:
+    """Whatever load() returns, kept per process and reloaded when version_key changes"""
+
+    def __init__(self, version_key, load, check_interval=1.0):
+        self.version_key = version_key
+        self.load = load
+        self.check_interval = check_interval  # seconds between shared version checks
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        data = self._data
+        if data is not None and now - self._checked_at < self.check_interval:
+            return data
+
+        with self._lock:
+            version = cache.get(self.version_key)
+            if self._data is None or version != self._version:
+                self._data = self.load()
+                self._version = version
+            self._checked_at = now
+            return self._data
+
+    def invalidate(self):
+        """Drop this process's copy and tell the other processes to reload"""
+        with self._lock:
+            self._data = None
+            # A fresh token, never a counter: after an eviction a restarted count could repeat a version
+            # some process still holds
+            cache.set(self.version_key, time.time_ns(), None)
@@ -73,6 +73,8 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'store.context_processors.cart_context',
+                'accounts.context_processors.wishlist_context',
+                'pages.context_processors.site_settings_context',
             ],
         },
     },
@@ -100,6 +102,68 @@ DATABASES = {
 }
 
 
+# Cache
+# Version keys and invalidations must reach every gunicorn worker, so outside DEBUG the
+# default is the database cache (deploy.sh runs createcachetable). Local memory is per
+# process and only fit for development. Override with CACHE_BACKEND/CACHE_LOCATION, e.g.
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+# The database and local-memory caches drop a third of their entries once they hold more
+# than MAX_ENTRIES (Django's default is only 300), taking version keys and throttle buckets
+# with them, so CACHE_MAX_ENTRIES is set well above what the site keeps. For busy sites
+# prefer redis or memcached, which evict by memory instead.
+CACHE_BACKEND = os.environ.get(
+    'CACHE_BACKEND',
+    'django.core.cache.backends.locmem.LocMemCache' if DEBUG else 'django.core.cache.backends.db.DatabaseCache',
+)
+# Backends that cull themselves; redis and memcached pass OPTIONS on to their client and reject MAX_ENTRIES
+CULLING_CACHE_BACKENDS = ('.DatabaseCache', '.LocMemCache', '.FileBasedCache')
+SESSION_CACHE_BACKEND = os.environ.get('SESSION_CACHE_BACKEND', CACHE_BACKEND)
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'jasem_cache'),  # table name for the database cache
+        'OPTIONS': (
+            {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 100000))}
+            if CACHE_BACKEND.endswith(CULLING_CACHE_BACKENDS) else {}
+        ),
+    },
+    # Sessions get their own cache so evictions of page data never log anyone out
+    'sessions': {
+        'BACKEND': SESSION_CACHE_BACKEND,
+        'LOCATION': os.environ.get('SESSION_CACHE_LOCATION', 'jasem_session_cache'),
+        'TIMEOUT': None,
+        'OPTIONS': (
+            {'MAX_ENTRIES': int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', 1000000))}
+            if SESSION_CACHE_BACKEND.endswith(CULLING_CACHE_BACKENDS) else {}
+        ),
+    },
+}
+
+
+# Sessions
+# SESSION_STORE picks the backend per deployment:
+#   db             - django_session table only (default)
+#   cached_db      - write-through cache, reads skip MySQL on a cache hit
+#   cache          - cache only, no MySQL at all; needs a persistent shared cache
+#   signed_cookies - session data lives in the browser, no server storage
+# cache and cached_db need SESSION_CACHE_BACKEND to be shared by all workers
+# (memcached/redis); a per-process locmem cache would serve stale sessions.
+# cache additionally needs a backend that never culls (redis or memcached with
+# enough memory): the database cache drops entries past MAX_ENTRIES, logging those
+# visitors out. cached_db falls back to the table, so culling only costs a query.
+# Run `manage.py migrate_sessions` once after switching to cache to keep visitors logged in.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_STORE', 'db')]
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_SAVE_EVERY_REQUEST = False  # only write sessions whose data changed
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -143,6 +207,8 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'  # For production - collected static file
 # Media files (User uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Uploads waiting for a worker, never served (see jasem_site/storage.py)
+PRIVATE_MEDIA_ROOT = Path(os.environ.get('PRIVATE_MEDIA_ROOT', BASE_DIR / 'private_media'))
 
 # Django REST Framework
 REST_FRAMEWORK = {
@@ -161,10 +227,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Authentication settings
 AUTHENTICATION_BACKENDS = [
-    'accounts.backends.EmailBackend',  # Custom email authentication
-    'django.contrib.auth.backends.ModelBackend',  # Default username authentication (fallback)
+    'accounts.backends.EmailBackend',  # Email authentication, falls back to username
 ]
 
+# Login/registration throttling (token buckets: (capacity, tokens refilled per second))
+LOGIN_THROTTLE = {
+    'cache': 'default',
+    'num_proxies': int(os.environ.get('NUM_PROXIES', 0)),  # reverse proxies in front of gunicorn (nginx = 1)
+    'ip': (20, 1 / 6),
+    'account': (5, 1 / 60),
+    'register_ip': (5, 1 / 300),
+}
+
 # CSRF settings
 CSRF_COOKIE_HTTPONLY = False  # Allow JavaScript to access CSRF token
 
@@ -173,10 +247,34 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')  # console for development
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')  # `manage.py smtp_sink` listens on localhost:1025
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
 DEFAULT_FROM_EMAIL = 'noreply@jasemshuman.com'
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')  # for links in emails
 ADMIN_EMAIL = 'jasem_403@hotmail.com'
 
+# Newsletter sending (send_newsletters worker)
+NEWSLETTER = {
+    'batch_size': 200,  # subscribers per audience query
+    'rate': float(os.environ.get('NEWSLETTER_RATE', 10)),  # messages per second, keep under the SMTP provider's limit
+}
+
+# Static pre-rendering of public pages (`manage.py prerender`; nginx serves the files to anonymous visitors)
+PRERENDER = {
+    'enabled': os.environ.get('PRERENDER', 'False').lower() == 'true',  # rebuild changed pages on save
+    'root': os.environ.get('PRERENDER_ROOT', str(BASE_DIR / 'prerendered')),
+}
+
+# Chunked, resumable uploads of large files (artwork videos/images, contact attachments)
+CHUNKED_UPLOADS = {
+    'temp_dir': os.environ.get('CHUNKED_UPLOAD_DIR', str(BASE_DIR / 'uploads_tmp')),  # same filesystem as MEDIA_ROOT
+    'chunk_size': 8 * 1024 * 1024,  # keep nginx client_max_body_size above this
+    'expire_hours': 24,  # unfinished or unclaimed uploads are deleted by clear_uploads
+    'max_anonymous': 100,  # open contact attachment sessions; each may hold a 10 MB temp file
+    'start_ip': (10, 1 / 60),  # sessions per client IP: bucket capacity, refill per second
+}
+
 # For production, use SMTP:
 # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST = 'smtp.gmail.com'  # or your SMTP server
@@ -0,0 +1,46 @@
+"""
+Storage for uploads that must not be served.
+
+Files waiting for a background worker (contact form attachments before their
+type is checked, bulk import manifests and zips) live under
+PRIVATE_MEDIA_ROOT, which is outside MEDIA_ROOT and so never exposed by nginx
+or the development media view. They are stored under random names, and the
+workers delete them once processed.
+"""
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+class PrivateStorage(FileSystemStorage):
+    """FileSystemStorage under PRIVATE_MEDIA_ROOT, read on every use like MEDIA_ROOT is"""
+
+    @property
+    def base_location(self):
+        return settings.PRIVATE_MEDIA_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+def private_storage():
+    """Callable for FileField(storage=...), so migrations don't record a location"""
+    return PrivateStorage()
+
+
+@deconstructible
+class RandomName:
+    """upload_to that keeps only the extension of the uploaded filename"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __call__(self, instance, filename):
+        return f'{self.directory}/{uuid.uuid4().hex}{os.path.splitext(filename)[1].lower()[:10]}'
+
+    def __eq__(self, other):
+        return isinstance(other, RandomName) and other.directory == self.directory
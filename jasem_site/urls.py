@@ -18,11 +18,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from store.admin_views import admin_dashboard
+from pages.views import sitemap_index, sitemap_section
+from store.admin_views import admin_dashboard, refresh_dashboard
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # Must come before admin.site.urls, whose catch-all view would answer these with a 404
     path('admin/dashboard/', admin_dashboard, name='admin_dashboard'),
+    path('admin/dashboard/refresh/', refresh_dashboard, name='admin_dashboard_refresh'),
+    path('admin/', admin.site.urls),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemap-<str:section>.xml', sitemap_section, name='sitemap_section'),
     path('', include('gallery.urls')),  # Gallery as main homepage
     path('store/', include('store.urls')),
     path('account/', include('accounts.urls')),
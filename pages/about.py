@@ -0,0 +1,95 @@
+"""
+Cached content of the about page.
+
+The about page combines the about Page with every CV section (education,
+awards, featured exhibitions, publications). That content changes a few times
+a year, so it is snapshotted as plain data (no model instances, so templates
+cannot trigger lazy loads) under a single cache key with no timeout. Saving
+or deleting any of those models rebuilds the snapshot once the transaction
+commits; a request only builds it when the cache was cleared.
+
+Bump SNAPSHOT_VERSION whenever the snapshot's shape changes, so a deploy never
+renders a snapshot pickled by the previous code.
+"""
+from django.core.cache import cache
+
+from .models import ArtistAward, ArtistEducation, ArtistPublication, Exhibition, Page
+
+SNAPSHOT_VERSION = 1
+FEATURED_EXHIBITIONS = 6
+RECENT_PUBLICATIONS = 5
+
+
+def _cache_key():
+    return f'pages:about:v{SNAPSHOT_VERSION}'
+
+
+def _file_url(field):
+    return field.url if field else ''
+
+
+def build_snapshot():
+    """All about page content as plain dicts"""
+    page = Page.objects.filter(page_type='about', is_published=True).first()
+    return {
+        'page': page and {
+            'title': page.title,
+            'content': page.content,
+            'featured_image_url': _file_url(page.featured_image),
+        },
+        'education_list': list(ArtistEducation.objects.values(
+            'degree_title', 'institution', 'location', 'year_start', 'year_end', 'description'
+        )),
+        'awards_list': [
+            {
+                'award_title': award.award_title,
+                'organization': award.organization,
+                'year': award.year,
+                'description': award.description,
+                'certificate_image_url': _file_url(award.certificate_image),
+            }
+            for award in ArtistAward.objects.all()
+        ],
+        'exhibitions_list': [
+            {
+                'title': exhibition.title,
+                'exhibition_type_display': exhibition.get_exhibition_type_display(),
+                'venue': exhibition.venue,
+                'date_display': exhibition.date_display,
+                'location_display': exhibition.location_display,
+                'description': exhibition.description,
+                'role': exhibition.role,
+                'website_url': exhibition.website_url,
+                'poster_image_url': _file_url(exhibition.poster_image),
+            }
+            for exhibition in Exhibition.objects.filter(is_featured=True)[:FEATURED_EXHIBITIONS]
+        ],
+        'publications_list': [
+            {
+                'title': publication.title,
+                'publication_type_display': publication.get_publication_type_display(),
+                'publication_name': publication.publication_name,
+                'author': publication.author,
+                'publication_date': publication.publication_date,
+                'description': publication.description,
+                'url': publication.url,
+                'pdf_url': _file_url(publication.pdf_file),
+                'cover_image_url': _file_url(publication.cover_image),
+            }
+            for publication in ArtistPublication.objects.all()[:RECENT_PUBLICATIONS]
+        ],
+    }
+
+
+def rebuild():
+    snapshot = build_snapshot()
+    cache.set(_cache_key(), snapshot, None)
+    return snapshot
+
+
+def get_snapshot():
+    """The about page content; one cache read, or five queries if it was never built"""
+    snapshot = cache.get(_cache_key())
+    if snapshot is None:
+        snapshot = rebuild()
+    return snapshot
@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import (Page, Testimonial, NewsUpdate, ContactSubmission, 
+from accounts.inquiries import DuplicateListFilter, annotate_cluster_size, bulk_update_status
+from gallery.changelist import LargeTableAdminMixin
+from . import testimonials
+from .models import (Page, Testimonial, NewsUpdate, ContactSubmission, ContactQueueItem, 
                     SocialMediaLink, SiteSettings, GalleryPageSettings,
                     ArtistEducation, ArtistAward, Exhibition, ArtistPublication)
 
@@ -53,12 +56,13 @@ class TestimonialAdmin(admin.ModelAdmin):
     actions = ['approve_testimonials', 'feature_testimonials']
     
     def approve_testimonials(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        # Not queryset.update(): the rating summaries have to count the newly approved ratings
+        updated = testimonials.approve(queryset)
         self.message_user(request, f'{updated} testimonials approved.')
     approve_testimonials.short_description = 'Approve selected testimonials'
     
     def feature_testimonials(self, request, queryset):
-        updated = queryset.update(is_featured=True)
+        updated = testimonials.feature(queryset)
         self.message_user(request, f'{updated} testimonials featured.')
     feature_testimonials.short_description = 'Feature selected testimonials'
 
@@ -92,10 +96,10 @@ class NewsUpdateAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactSubmission)
-class ContactSubmissionAdmin(admin.ModelAdmin):
+class ContactSubmissionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'contact_type', 'subject', 'is_responded', 
-                   'created_at']
-    list_filter = ['contact_type', 'is_responded', 'created_at']
+                   'duplicates', 'created_at']
+    list_filter = ['is_responded', DuplicateListFilter, 'contact_type', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
     readonly_fields = ['created_at', 'updated_at']
     
@@ -115,13 +119,37 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['mark_as_responded']
+    def get_queryset(self, request):
+        return annotate_cluster_size(super().get_queryset(request))
+    
+    def duplicates(self, obj):
+        return obj.cluster_size - 1 if getattr(obj, 'cluster_size', None) else 0
+    duplicates.short_description = 'Repeats'
+    
+    actions = ['mark_as_responded', 'mark_with_duplicates_as_responded']
     
     def mark_as_responded(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.update(is_responded=True, response_date=timezone.now())
+        updated = bulk_update_status(queryset, is_responded=True, responded=True)
         self.message_user(request, f'{updated} submissions marked as responded.')
     mark_as_responded.short_description = 'Mark as responded'
+    
+    def mark_with_duplicates_as_responded(self, request, queryset):
+        updated = bulk_update_status(queryset, include_duplicates=True, is_responded=True, responded=True)
+        self.message_user(request, f'{updated} submissions (including repeats) marked as responded.')
+    mark_with_duplicates_as_responded.short_description = 'Mark as responded, with their repeats'
+
+
+@admin.register(ContactQueueItem)
+class ContactQueueItemAdmin(admin.ModelAdmin):
+    list_display = ['sender', 'attempts', 'last_error', 'created_at']
+    readonly_fields = ['payload', 'attachment', 'attempts', 'last_error', 'created_at', 'updated_at']
+    
+    def sender(self, obj):
+        return obj.payload.get('email', '')
+    sender.short_description = 'Email'
+    
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(SocialMediaLink)
@@ -0,0 +1,69 @@
+"""
+Navigation and footer shared by every page (the "site chrome").
+
+Content pages flagged show_in_menu appear in the navbar and footer links, and
+active SocialMediaLinks in the footer. base.html renders these fragments with
+the {% site_chrome %} tag from the `site_chrome` library. All fragments are
+rendered together and cached under the chrome version, which Page and
+SocialMediaLink signals bump, so the chrome of a page costs two cache reads
+(version and fragments) and no queries.
+"""
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+VERSION_KEY = 'pages:chrome:version'
+FRAGMENTS = ('menu', 'footer_links', 'social')
+CACHE_TIMEOUT = 60 * 60 * 24  # old versions just expire
+SOCIAL_ICONS = {
+    'instagram': 'bi-instagram',
+    'facebook': 'bi-facebook',
+    'twitter': 'bi-twitter-x',
+    'linkedin': 'bi-linkedin',
+    'youtube': 'bi-youtube',
+    'pinterest': 'bi-pinterest',
+    'behance': 'bi-behance',
+}
+
+
+def bump_version():
+    cache.set(VERSION_KEY, timezone.now().timestamp(), None)
+
+
+def chrome_data():
+    """Menu pages and social links as plain dicts"""
+    from .models import Page, SocialMediaLink
+
+    return {
+        'menu_pages': [
+            {'title': page.title, 'url': page.get_absolute_url()}
+            for page in Page.objects.filter(is_published=True, show_in_menu=True).only('title', 'slug')
+        ],
+        'social_links': [
+            {
+                'label': link.get_platform_display(),
+                'url': link.url,
+                'icon': SOCIAL_ICONS.get(link.platform, 'bi-link-45deg'),
+            }
+            for link in SocialMediaLink.objects.filter(is_active=True)
+        ],
+    }
+
+
+def _render_all():
+    data = chrome_data()
+    return {name: render_to_string(f'pages/chrome/{name}.html', data) for name in FRAGMENTS}
+
+
+def fragments():
+    """{fragment name: HTML} for the current chrome version"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = timezone.now().timestamp()
+        cache.add(VERSION_KEY, version, None)
+    key = f'pages:chrome:{version}'
+    rendered = cache.get(key)
+    if rendered is None:
+        rendered = _render_all()
+        cache.set(key, rendered, CACHE_TIMEOUT)
+    return rendered
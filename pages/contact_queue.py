@@ -0,0 +1,190 @@
+"""
+Contact form pipeline.
+
+The contact view only validates the post and stores it as a ContactQueueItem
+(one INSERT, plus the raw attachment if any, size-checked and kept in private
+storage under a random name), so it answers in milliseconds
+whatever the mail server is doing. The process_contact_queue worker (cron, or
+--interval) then:
+
+1. turns queued items into ContactSubmissions, checking attachment size and
+   sniffing the file type from its first bytes; rejected files are dropped and
+   noted in admin_notes. Items that keep failing stay queued with the error
+   after MAX_ATTEMPTS tries.
+2. emails staff one digest per batch of new submissions. A failed send is
+   retried on later runs, up to MAX_ATTEMPTS.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import ContactQueueItem, ContactSubmission
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+MAX_ATTACHMENT_SIZE = 10 * 1024 * 1024
+LOCK_KEY = 'pages:contact_queue:running'
+LOCK_TIMEOUT = 600
+
+# (leading bytes, extension) of the attachment types we accept
+FILE_SIGNATURES = [
+    (b'%PDF-', '.pdf'),
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+]
+FIELD_LIMITS = {'name': 200, 'email': 254, 'phone': 20, 'organization': 200, 'subject': 200, 'message': 10000}
+REQUIRED_FIELDS = {'name': 'Name', 'email': 'Email', 'subject': 'Subject', 'message': 'Message'}
+
+
+def clean_contact_data(data):
+    """Validate a contact post; returns (cleaned data, {field: error})"""
+    cleaned = {field: str(data.get(field) or '').strip() for field in FIELD_LIMITS}
+    contact_types = dict(ContactSubmission.CONTACT_TYPES)
+    cleaned['contact_type'] = data.get('contact_type') if data.get('contact_type') in contact_types else 'general'
+
+    errors = {}
+    for field, label in REQUIRED_FIELDS.items():
+        if not cleaned[field]:
+            errors[field] = f'{label} is required'
+    for field, limit in FIELD_LIMITS.items():
+        if len(cleaned[field]) > limit and field not in errors:
+            errors[field] = f'Please keep this under {limit} characters'
+    if cleaned['email'] and 'email' not in errors:
+        try:
+            validate_email(cleaned['email'])
+        except ValidationError:
+            errors['email'] = 'Please enter a valid email address'
+    return cleaned, errors
+
+
+def clean_attachment(attachment):
+    """Error message for an attachment over the size limit, or None; the type is sniffed by the worker"""
+    if attachment is not None and attachment.size > MAX_ATTACHMENT_SIZE:
+        return f'Attachments can be at most {MAX_ATTACHMENT_SIZE // (1024 * 1024)} MB'
+    return None
+
+
+def enqueue(cleaned, attachment=None):
+    """Store a validated post for the worker"""
+    item = ContactQueueItem(payload=cleaned)
+    if attachment is not None:
+        # Kept in private storage under a random name; the visitor's filename is only used once accepted
+        item.payload = {**cleaned, 'attachment_name': os.path.basename(attachment.name)[-100:]}
+        item.attachment.save(attachment.name, attachment, save=False)
+    item.save()
+    return item
+
+
+def sniff_extension(head):
+    """File extension for the attachment's leading bytes, or None if the type isn't accepted"""
+    for signature, extension in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+def _attach(submission, item):
+    """Move an accepted queued attachment onto the submission; returns a note for admin_notes or ''"""
+    queued = item.attachment
+    try:
+        size = queued.size
+    except OSError:
+        return 'Attachment was lost before processing.'
+    if size > MAX_ATTACHMENT_SIZE:
+        return f'Attachment rejected: {size} bytes is over the {MAX_ATTACHMENT_SIZE} byte limit.'
+
+    with queued.open('rb') as fh:
+        extension = sniff_extension(fh.read(16))
+        if extension is None:
+            return 'Attachment rejected: file type is not PDF, JPEG, PNG or GIF.'
+        fh.seek(0)
+        stem = os.path.splitext(get_valid_filename(item.payload.get('attachment_name') or 'attachment'))[0]
+        submission.attachment.save(f'{stem}{extension}', fh, save=False)
+    return ''
+
+
+def persist_queued(limit=200):
+    """Turn queued contact posts into submissions; returns how many were stored"""
+    stored = 0
+    for item in ContactQueueItem.objects.filter(attempts__lt=MAX_ATTEMPTS)[:limit]:
+        try:
+            with transaction.atomic():
+                fields = {name: item.payload.get(name, '') for name in [*FIELD_LIMITS, 'contact_type']}
+                submission = ContactSubmission(**fields)
+                if item.attachment:
+                    submission.admin_notes = _attach(submission, item)
+                submission.save()
+                item.delete()
+        except Exception as e:
+            logger.exception("Could not store queued contact post %s", item.pk)
+            ContactQueueItem.objects.filter(pk=item.pk).update(attempts=F('attempts') + 1, last_error=str(e))
+            continue
+        if item.attachment:
+            item.attachment.delete(save=False)
+        stored += 1
+    return stored
+
+
+def notify_staff(batch_size=50):
+    """Email staff one digest per batch of unnotified submissions; returns how many were covered"""
+    recipient = getattr(settings, 'ADMIN_EMAIL', None)
+    if not recipient:
+        return 0
+
+    notified = 0
+    while True:
+        submissions = list(
+            ContactSubmission.objects.filter(notified_at__isnull=True, notify_attempts__lt=MAX_ATTEMPTS)
+            .order_by('pk')[:batch_size]
+        )
+        if not submissions:
+            return notified
+        pks = [submission.pk for submission in submissions]
+
+        subject = (
+            f'New contact message: {submissions[0].subject}' if len(submissions) == 1
+            else f'{len(submissions)} new contact messages'
+        )
+        body = render_to_string('pages/emails/contact_digest.txt', {
+            'submissions': submissions,
+            'site_url': getattr(settings, 'SITE_URL', '').rstrip('/'),
+        })
+        message = EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient])
+        if len(submissions) == 1:
+            message.reply_to = [submissions[0].email]
+
+        try:
+            message.send()
+        except Exception:
+            logger.exception("Staff notification for %s contact submissions failed, will retry", len(pks))
+            ContactSubmission.objects.filter(pk__in=pks).update(notify_attempts=F('notify_attempts') + 1)
+            return notified
+
+        ContactSubmission.objects.filter(pk__in=pks).update(notified_at=timezone.now())
+        notified += len(pks)
+
+
+def process_queue():
+    """One worker pass; None if another worker is running"""
+    if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        return None
+    try:
+        return {
+            'stored': persist_queued(),
+            'notified': notify_staff(),
+        }
+    finally:
+        cache.delete(LOCK_KEY)
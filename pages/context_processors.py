@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+
+from .site_settings import get_site_settings
+
+
+def site_settings_context(request):
+    """Add the SiteSettings singleton to all templates (cached per process, loaded only when used)"""
+    return {
+        'site_settings': SimpleLazyObject(get_site_settings)
+    }
@@ -0,0 +1,146 @@
+"""
+Exhibition timeline.
+
+Exhibitions split by today's date into upcoming (not started yet), current
+(started and not over; an exhibition without an end_date lasts one day) and
+past. Every query filters on is_featured and ranges over start_date, so it is
+served by the (is_featured, start_date, end_date) index, with end_date checked
+from the index itself. Queries over all exhibitions use the same index through
+a skip scan of the two is_featured values.
+
+The archive groups exhibitions by year, newest first, a few years per page
+with a year cursor, so it never counts or offsets through decades of entries.
+Pages are cached as plain data under a version bumped by Exhibition signals;
+the timeout bounds how long artwork edits can show stale.
+"""
+from django.core.cache import cache
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+from .models import Exhibition
+
+VERSION_KEY = 'pages:exhibitions:version'
+ARCHIVE_TIMEOUT = 60 * 60
+YEARS_PER_PAGE = 5
+
+
+def exhibitions(featured=None, with_artworks=False):
+    queryset = Exhibition.objects.all()
+    if featured is not None:
+        queryset = queryset.filter(is_featured=featured)
+    else:
+        # Lets the database use the (is_featured, ...) index for all exhibitions
+        queryset = queryset.filter(is_featured__in=[True, False])
+    if with_artworks:
+        from gallery.models import Artwork
+        queryset = queryset.prefetch_related(Prefetch(
+            'featured_artworks',
+            queryset=Artwork.objects.filter(is_active=True).only('id', 'title', 'main_image'),
+        ))
+    return queryset
+
+
+def upcoming(featured=None, with_artworks=False, today=None):
+    """Exhibitions that have not started, soonest first"""
+    today = today or timezone.localdate()
+    return exhibitions(featured, with_artworks).filter(start_date__gt=today).order_by('start_date', 'display_order')
+
+
+def current(featured=None, with_artworks=False, today=None):
+    """Exhibitions running today, most recently opened first"""
+    today = today or timezone.localdate()
+    return exhibitions(featured, with_artworks).filter(
+        Q(end_date__gte=today) | Q(end_date__isnull=True, start_date=today),
+        start_date__lte=today,
+    ).order_by('-start_date', 'display_order')
+
+
+def past(featured=None, with_artworks=False, today=None):
+    """Exhibitions that are over, most recent first"""
+    today = today or timezone.localdate()
+    return exhibitions(featured, with_artworks).filter(
+        Q(end_date__lt=today) | Q(end_date__isnull=True),
+        start_date__lt=today,
+    ).order_by('-start_date', 'display_order')
+
+
+def highlights(limit, featured=True):
+    """Current and upcoming exhibitions first, then the most recent past ones, up to limit"""
+    today = timezone.localdate()
+    selected = list(current(featured, today=today)[:limit])
+    selected += list(upcoming(featured, today=today)[:limit - len(selected)])
+    if len(selected) < limit:
+        selected += list(past(featured, today=today)[:limit - len(selected)])
+    return selected
+
+
+def bump_version():
+    cache.set(VERSION_KEY, timezone.now().timestamp(), None)
+
+
+def _exhibition_data(exhibition, today):
+    return {
+        'id': exhibition.id,
+        'title': exhibition.title,
+        'type': exhibition.exhibition_type,
+        'type_display': exhibition.get_exhibition_type_display(),
+        'venue': exhibition.venue,
+        'location': exhibition.location_display,
+        'start_date': exhibition.start_date.isoformat(),
+        'end_date': exhibition.end_date.isoformat() if exhibition.end_date else None,
+        'date_display': exhibition.date_display,
+        'status': exhibition.status(today),
+        'role': exhibition.role,
+        'description': exhibition.description,
+        'website_url': exhibition.website_url,
+        'poster_url': exhibition.poster_image.url if exhibition.poster_image else '',
+        'is_featured': exhibition.is_featured,
+        'artworks': [
+            {
+                'id': artwork.id,
+                'title': artwork.title,
+                'url': artwork.get_absolute_url(),
+                'image_url': artwork.main_image.url if artwork.main_image else '',
+            }
+            for artwork in exhibition.featured_artworks.all()
+        ],
+    }
+
+
+def build_archive_page(before_year=None, featured=None):
+    """Up to YEARS_PER_PAGE years of exhibitions starting before before_year, newest first"""
+    today = timezone.localdate()
+    queryset = exhibitions(featured)
+    if before_year:
+        queryset = queryset.filter(start_date__year__lt=before_year)
+    years = [day.year for day in queryset.dates('start_date', 'year', order='DESC')[:YEARS_PER_PAGE + 1]]
+    if not years:
+        return {'years': [], 'next_before': None}
+
+    page_years = years[:YEARS_PER_PAGE]
+    entries = exhibitions(featured, with_artworks=True).filter(
+        start_date__year__gte=page_years[-1],
+        start_date__year__lte=page_years[0],
+    ).order_by('-start_date', 'display_order')
+
+    grouped = {year: [] for year in page_years}
+    for exhibition in entries:
+        grouped[exhibition.start_date.year].append(_exhibition_data(exhibition, today))
+    return {
+        'years': [{'year': year, 'exhibitions': items} for year, items in grouped.items()],
+        'next_before': page_years[-1] if len(years) > YEARS_PER_PAGE else None,
+    }
+
+
+def archive_page(before_year=None, featured=None):
+    """Cached build_archive_page"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = timezone.now().timestamp()
+        cache.add(VERSION_KEY, version, None)
+    key = f'pages:exhibitions:archive:{version}:{timezone.localdate()}:{before_year}:{featured}'
+    page = cache.get(key)
+    if page is None:
+        page = build_archive_page(before_year, featured)
+        cache.set(key, page, ARCHIVE_TIMEOUT)
+    return page
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from pages import prerender
+
+
+class Command(BaseCommand):
+    help = 'Render the public pages to static HTML files for nginx to serve to anonymous visitors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*',
+                            help='Only re-render these URL paths, e.g. /pages/about/ (default: every page)')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete every pre-rendered file first')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            prerender.clear()
+        if options['paths']:
+            written, removed = prerender.build(options['paths'])
+        else:
+            written, removed = prerender.build_all()
+        self.stdout.write(f"Wrote {written} pages, removed {removed} to {prerender.root()}")
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.contact_queue import process_queue
+
+
+class Command(BaseCommand):
+    help = 'Store queued contact form posts and email staff notifications (run from cron, or with --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and process the queue every N seconds (default: once and exit)')
+
+    def handle(self, *args, **options):
+        while True:
+            result = process_queue()
+            if result is None:
+                self.stdout.write('Another worker is processing the contact queue')
+            else:
+                self.stdout.write(f"Stored {result['stored']} submissions, notified staff about {result['notified']}")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
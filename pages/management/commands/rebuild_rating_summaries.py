@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pages.testimonials import recompute
+
+
+class Command(BaseCommand):
+    help = 'Recompute the testimonial rating summaries from the approved testimonials'
+
+    def handle(self, *args, **options):
+        rows = recompute()
+        self.stdout.write(f"Rebuilt {rows} rating summaries")
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0005_artistaward_artisteducation_artistpublication_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['-created_at', '-id'], name='pages_conta_created_e2e87c_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0006_contactsubmission_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='dedup_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['is_responded', 'created_at'], name='pages_conta_is_resp_cdde05_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['dedup_key', 'created_at'], name='pages_conta_dedup_k_c5b049_idx'),
+        ),
+    ]
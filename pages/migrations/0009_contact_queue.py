@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0008_backfill_contact_dedup_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactQueueItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('payload', models.JSONField()),
+                ('attachment', models.FileField(blank=True, null=True, upload_to='contact_queue/')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='contactsubmission',
+            name='notify_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['notified_at', 'notify_attempts'], name='pages_conta_notifie_505c12_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated manually so the notification worker doesn't email staff about old submissions
+
+from django.db import migrations
+from django.db.models import F
+
+
+def mark_notified(apps, schema_editor):
+    """Existing submissions predate staff notifications; treat them as already notified"""
+    ContactSubmission = apps.get_model('pages', 'ContactSubmission')
+    ContactSubmission.objects.filter(notified_at__isnull=True).update(notified_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0009_contact_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_notified, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_sculptureimage_height_sculptureimage_width'),
+        ('pages', '0010_mark_existing_submissions_notified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsupdate',
+            index=models.Index(fields=['is_published', 'publish_date', 'id'], name='pages_newsu_is_publ_544421_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_sculptureimage_height_sculptureimage_width'),
+        ('pages', '0011_news_listing_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestimonialRatingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('rating_total', models.PositiveIntegerField(default=0)),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Testimonial Rating Summary',
+                'verbose_name_plural': 'Testimonial Rating Summaries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(fields=['is_approved', 'is_featured', 'created_at'], name='pages_testi_is_appr_8a1807_idx'),
+        ),
+        migrations.AddField(
+            model_name='testimonialratingsummary',
+            name='artwork',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rating_summary', to='gallery.artwork'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated manually to total the ratings of testimonials approved before the summaries existed
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_rating_summaries(apps, schema_editor):
+    Testimonial = apps.get_model('pages', 'Testimonial')
+    TestimonialRatingSummary = apps.get_model('pages', 'TestimonialRatingSummary')
+
+    totals = {None: TestimonialRatingSummary(artwork_id=None)}
+    approved = Testimonial.objects.filter(is_approved=True).values('related_artwork_id', 'rating').annotate(
+        n=Count('pk')
+    ).order_by()
+    for group in approved:
+        for artwork_id in {None, group['related_artwork_id']}:
+            summary = totals.setdefault(artwork_id, TestimonialRatingSummary(artwork_id=artwork_id))
+            summary.count += group['n']
+            summary.rating_total += group['n'] * group['rating']
+            field = f"stars_{group['rating']}"
+            setattr(summary, field, getattr(summary, field) + group['n'])
+    TestimonialRatingSummary.objects.bulk_create(totals.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0012_testimonial_rating_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_sculptureimage_height_sculptureimage_width'),
+        ('pages', '0013_backfill_rating_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exhibition',
+            index=models.Index(fields=['is_featured', 'start_date', 'end_date'], name='pages_exhib_is_feat_47e697_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:03
+
+import jasem_site.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0014_exhibition_timeline_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contactqueueitem',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=jasem_site.storage.private_storage, upload_to=jasem_site.storage.RandomName('contact_queue')),
+        ),
+    ]
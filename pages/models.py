@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 from gallery.models import TimestampedModel
+from jasem_site.storage import RandomName, private_storage
 
 
 class Page(TimestampedModel):
@@ -71,9 +75,86 @@ class Testimonial(TimestampedModel):
     
     class Meta:
         ordering = ['-is_featured', '-created_at']
+        indexes = [models.Index(fields=['is_approved', 'is_featured', 'created_at'])]
     
     def __str__(self):
         return f"{self.name} - {self.rating} stars"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept so saves can tell how the approved ratings changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class TestimonialRatingSummary(models.Model):
+    """Running totals of approved testimonial ratings, site-wide (no artwork) or for one artwork"""
+    artwork = models.OneToOneField('gallery.Artwork', on_delete=models.CASCADE, null=True, blank=True,
+                                   related_name='rating_summary')
+    count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Testimonial Rating Summary"
+        verbose_name_plural = "Testimonial Rating Summaries"
+    
+    def __str__(self):
+        scope = self.artwork if self.artwork_id else "Site"
+        return f"{scope}: {self.average} from {self.count} ratings"
+    
+    @property
+    def average(self):
+        return round(self.rating_total / self.count, 1) if self.count else None
+    
+    @property
+    def histogram(self):
+        """(stars, count, percent of ratings) from 5 stars down to 1"""
+        return [
+            (stars, getattr(self, f'stars_{stars}'),
+             round(100 * getattr(self, f'stars_{stars}') / self.count) if self.count else 0)
+            for stars in range(5, 0, -1)
+        ]
+
+
+@receiver(post_save, sender=Testimonial)
+def record_testimonial_rating(sender, instance, created, raw=False, **kwargs):
+    """Move the testimonial's rating between the summaries when its approval, rating or artwork changed"""
+    if raw:
+        return
+    from . import testimonials
+    loaded = getattr(instance, '_loaded_values', None)
+    new = testimonials.rating_state(instance.is_approved, instance.related_artwork_id, instance.rating)
+    if created:
+        testimonials.record_change(None, new)
+    elif loaded is None:
+        # Saved without having been loaded, so the previous state is unknown
+        testimonials.recompute()
+    else:
+        old = testimonials.rating_state(loaded['is_approved'], loaded['related_artwork_id'], loaded['rating'])
+        testimonials.record_change(old, new)
+    instance._previous_artwork_id = (loaded or {}).get('related_artwork_id')
+    instance._loaded_values = {
+        **(loaded or {}),
+        'is_approved': instance.is_approved,
+        'related_artwork_id': instance.related_artwork_id,
+        'rating': instance.rating,
+    }
+    transaction.on_commit(testimonials.invalidate)
+
+
+@receiver(post_delete, sender=Testimonial)
+def remove_testimonial_rating(sender, instance, **kwargs):
+    from . import testimonials
+    old = testimonials.rating_state(instance.is_approved, instance.related_artwork_id, instance.rating)
+    testimonials.record_change(old, None)
+    transaction.on_commit(testimonials.invalidate)
 
 
 class NewsUpdate(TimestampedModel):
@@ -109,6 +190,7 @@ class NewsUpdate(TimestampedModel):
     
     class Meta:
         ordering = ['-publish_date']
+        indexes = [models.Index(fields=['is_published', 'publish_date', 'id'])]
         verbose_name = "News Update"
         verbose_name_plural = "News Updates"
     
@@ -119,6 +201,18 @@ class NewsUpdate(TimestampedModel):
         return reverse('pages:news_detail', kwargs={'slug': self.slug})
 
 
+@receiver(post_save, sender=NewsUpdate)
+@receiver(post_delete, sender=NewsUpdate)
+@receiver(m2m_changed, sender=NewsUpdate.related_artworks.through)
+def refresh_news_caches(sender, raw=False, **kwargs):
+    """Invalidate the cached news listing and regenerate the feed files"""
+    if raw:
+        return
+    from . import news
+    transaction.on_commit(news.bump_version)
+    transaction.on_commit(news.write_feeds)
+
+
 class ContactSubmission(TimestampedModel):
     """Contact form submissions"""
     CONTACT_TYPES = [
@@ -148,11 +242,45 @@ class ContactSubmission(TimestampedModel):
     response_date = models.DateTimeField(null=True, blank=True)
     admin_notes = models.TextField(blank=True)
     
+    # Hash of email + normalized subject; repeat submissions share it
+    dedup_key = models.CharField(max_length=64, blank=True, editable=False)
+    
+    # Staff notification, sent in batches by the contact queue worker
+    notified_at = models.DateTimeField(null=True, blank=True, editable=False)
+    notify_attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['notified_at', 'notify_attempts']),
+            models.Index(fields=['is_responded', 'created_at']),
+            models.Index(fields=['dedup_key', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.subject}"
+    
+    def save(self, *args, **kwargs):
+        from accounts.inquiries import dedup_key
+        self.dedup_key = dedup_key(self.email, self.subject)
+        super().save(*args, **kwargs)
+
+
+class ContactQueueItem(TimestampedModel):
+    """A validated contact form post waiting for the worker to turn it into a ContactSubmission"""
+    payload = models.JSONField()
+    # Unchecked upload: kept out of public media under a random name until the worker checks it
+    attachment = models.FileField(upload_to=RandomName('contact_queue'), storage=private_storage,
+                                  null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"Queued contact from {self.payload.get('email', '?')}"
 
 
 class SocialMediaLink(TimestampedModel):
@@ -180,6 +308,17 @@ class SocialMediaLink(TimestampedModel):
         return f"{self.get_platform_display()}: {self.url}"
 
 
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+@receiver(post_save, sender=SocialMediaLink)
+@receiver(post_delete, sender=SocialMediaLink)
+def invalidate_site_chrome(sender, **kwargs):
+    """Re-render the cached navigation and footer"""
+    from . import chrome
+    # After commit, or a render in between would cache the old menu under the new version
+    transaction.on_commit(chrome.bump_version)
+
+
 class SiteSettings(models.Model):
     """Global site settings"""
     site_name = models.CharField(max_length=200, default="Jasem Shuman Art")
@@ -277,6 +416,25 @@ class GalleryPageSettings(models.Model):
         super().save(*args, **kwargs)
 
 
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_save, sender=GalleryPageSettings)
+@receiver(post_delete, sender=GalleryPageSettings)
+def invalidate_site_settings(sender, **kwargs):
+    """Reload the cached settings singletons in every process"""
+    from . import site_settings
+    transaction.on_commit(site_settings.invalidate)
+
+
+@receiver(post_save, sender='gallery.Artwork')
+@receiver(pre_delete, sender='gallery.Artwork')  # by post_delete, SET_NULL has already cleared hero_image
+def invalidate_hero_artwork(sender, instance, **kwargs):
+    """The cached SiteSettings carries its hero artwork; reload it when that artwork changes"""
+    from . import site_settings
+    if SiteSettings.objects.filter(hero_image_id=instance.pk).exists():
+        transaction.on_commit(site_settings.invalidate)
+
+
 class ArtistEducation(TimestampedModel):
     """Artist's education and degrees"""
     degree_title = models.CharField(max_length=200, help_text="e.g., Bachelor of Fine Arts")
@@ -357,10 +515,20 @@ class Exhibition(TimestampedModel):
         ordering = ['-start_date', 'display_order']
         verbose_name = "Exhibition/Event"
         verbose_name_plural = "Exhibitions & Events"
+        indexes = [models.Index(fields=['is_featured', 'start_date', 'end_date'])]
     
     def __str__(self):
         return f"{self.title} - {self.venue} ({self.start_date.year})"
     
+    def status(self, today=None):
+        """'upcoming', 'current' or 'past' relative to today"""
+        today = today or timezone.localdate()
+        if self.start_date > today:
+            return 'upcoming'
+        if (self.end_date or self.start_date) >= today:
+            return 'current'
+        return 'past'
+    
     @property
     def date_display(self):
         """Format date range for display"""
@@ -378,6 +546,14 @@ class Exhibition(TimestampedModel):
         return f"{self.city}, {self.country}"
 
 
+@receiver(post_save, sender=Exhibition)
+@receiver(post_delete, sender=Exhibition)
+@receiver(m2m_changed, sender=Exhibition.featured_artworks.through)
+def invalidate_exhibition_archive(sender, **kwargs):
+    from . import exhibitions
+    transaction.on_commit(exhibitions.bump_version)
+
+
 class ArtistPublication(TimestampedModel):
     """Publications, press, and media coverage"""
     PUBLICATION_TYPES = [
@@ -410,3 +586,56 @@ class ArtistPublication(TimestampedModel):
     
     def __str__(self):
         return f"{self.title} - {self.publication_name} ({self.publication_date.year})"
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+@receiver(post_save, sender=ArtistEducation)
+@receiver(post_delete, sender=ArtistEducation)
+@receiver(post_save, sender=ArtistAward)
+@receiver(post_delete, sender=ArtistAward)
+@receiver(post_save, sender=Exhibition)
+@receiver(post_delete, sender=Exhibition)
+@receiver(post_save, sender=ArtistPublication)
+@receiver(post_delete, sender=ArtistPublication)
+def rebuild_about_snapshot(sender, raw=False, **kwargs):
+    """Rebuild the cached about page content after a change to any of its sections"""
+    if raw:
+        return
+    from . import about
+    transaction.on_commit(about.rebuild)
+
+
+@receiver(post_save, sender='gallery.Artwork')
+@receiver(post_delete, sender='gallery.Artwork')
+@receiver(post_save, sender='gallery.Category')
+@receiver(post_delete, sender='gallery.Category')
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+@receiver(post_save, sender=SocialMediaLink)
+@receiver(post_delete, sender=SocialMediaLink)
+@receiver(post_save, sender=NewsUpdate)
+@receiver(post_delete, sender=NewsUpdate)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+@receiver(post_save, sender=Exhibition)
+@receiver(post_delete, sender=Exhibition)
+@receiver(post_save, sender=ArtistEducation)
+@receiver(post_delete, sender=ArtistEducation)
+@receiver(post_save, sender=ArtistAward)
+@receiver(post_delete, sender=ArtistAward)
+@receiver(post_save, sender=ArtistPublication)
+@receiver(post_delete, sender=ArtistPublication)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_save, sender=GalleryPageSettings)
+@receiver(post_delete, sender=GalleryPageSettings)
+def prerender_dependents(sender, instance, raw=False, **kwargs):
+    """Re-render the static copies of the pages showing the instance, after the commit"""
+    if raw:
+        return
+    from . import prerender
+    if not prerender.enabled():
+        return
+    paths = prerender.dependents(instance)
+    transaction.on_commit(lambda: prerender.rebuild_async(paths))
@@ -0,0 +1,133 @@
+"""
+News listing and feeds.
+
+The listing pages through published news newest first with a (publish_date,
+id) cursor and prefetches the related artworks in one query. Its HTML is
+fragment-cached under the news version: the time of the last change to any
+NewsUpdate, kept in the cache and bumped by the model's signals.
+
+The Atom and RSS feeds are rendered to files in default storage whenever news
+changes, and served as those bytes (with Last-Modified, so feed readers get
+304s) instead of being built per request.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Max, Prefetch, Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from .models import NewsUpdate
+
+VERSION_KEY = 'pages:news:version'
+PER_PAGE = 10
+FEED_ITEMS = 20
+FEEDS = {
+    'atom': ('feeds/news.atom', Atom1Feed),
+    'rss': ('feeds/news.rss', Rss201rev2Feed),
+}
+
+
+def news_version():
+    """Timestamp of the last change to the news, as a cache key component"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        latest = NewsUpdate.objects.aggregate(latest=Max('updated_at'))['latest']
+        version = latest.timestamp() if latest else 0
+        cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def bump_version():
+    cache.set(VERSION_KEY, timezone.now().timestamp(), None)
+
+
+def encode_cursor(item):
+    return f'{item.publish_date.isoformat()},{item.pk}'
+
+
+def decode_cursor(value):
+    publish_date, _, pk = (value or '').rpartition(',')
+    publish_date = parse_datetime(publish_date)
+    if publish_date is None or not pk.isdigit():
+        return None
+    return publish_date, int(pk)
+
+
+def published_news():
+    from gallery.models import Artwork
+
+    return NewsUpdate.objects.filter(is_published=True).prefetch_related(
+        Prefetch('related_artworks', queryset=Artwork.objects.filter(is_active=True).only('id', 'title', 'main_image'))
+    ).order_by('-publish_date', '-pk')
+
+
+def news_page(cursor=None, per_page=PER_PAGE):
+    """One page of published news after the cursor, with the cursor of the next page (or None)"""
+    news = published_news()
+    position = decode_cursor(cursor)
+    if position:
+        publish_date, pk = position
+        news = news.filter(Q(publish_date__lt=publish_date) | Q(publish_date=publish_date, pk__lt=pk))
+    items = list(news[:per_page + 1])
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(items[-1]) if has_more else None,
+    }
+
+
+def build_feed(kind):
+    """Render a feed of the latest published news to bytes"""
+    site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+    feed_class = FEEDS[kind][1]
+    feed = feed_class(
+        title='Jasem Shuman Art - News & Updates',
+        link=site_url + reverse('pages:news_list'),
+        description='Latest news, exhibitions, and updates from Palestinian artist Jasem Shuman.',
+        language='en',
+        feed_url=site_url + reverse('pages:news_feed', args=[kind]),
+    )
+    for item in NewsUpdate.objects.filter(is_published=True).order_by('-publish_date', '-pk')[:FEED_ITEMS]:
+        feed.add_item(
+            title=item.title,
+            link=f'{site_url}{item.get_absolute_url()}',
+            description=item.summary,
+            unique_id=f'{site_url}{item.get_absolute_url()}',
+            pubdate=item.publish_date,
+            updateddate=item.updated_at,
+            categories=[item.get_update_type_display()],
+        )
+    return feed.writeString('utf-8').encode('utf-8'), feed.content_type
+
+
+def write_feeds():
+    """Regenerate every feed file"""
+    for kind, (path, _) in FEEDS.items():
+        content, _ = build_feed(kind)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(content))
+
+
+def read_feed(kind):
+    """(bytes, content type) of a feed, generating the file if it is missing"""
+    path, feed_class = FEEDS[kind]
+    try:
+        with default_storage.open(path, 'rb') as fh:
+            return fh.read(), feed_class.content_type
+    except (FileNotFoundError, OSError):
+        write_feeds()
+        with default_storage.open(path, 'rb') as fh:
+            return fh.read(), feed_class.content_type
+
+
+def feed_last_modified(kind):
+    try:
+        return default_storage.get_modified_time(FEEDS[kind][0])
+    except (FileNotFoundError, OSError, NotImplementedError):
+        return None
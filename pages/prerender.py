@@ -0,0 +1,274 @@
+"""
+Static pre-rendering of the public pages.
+
+The homepage, category listings, artwork details, the about page, content
+pages and news are the same for every anonymous visitor, so they are rendered
+to PRERENDER['root']/<path>/index.html and nginx serves those files directly
+to visitors with no session (see deploy.sh), without touching Django.
+
+- `manage.py prerender` renders every public URL and removes files of URLs
+  that no longer exist.
+- With PRERENDER['enabled'], saving or deleting a model re-renders just the
+  URLs that depend on it (DEPENDENTS below) in a background thread once the
+  transaction commits. Settings, categories, content pages and social links
+  appear in the navigation or footer of every page, so they trigger a full
+  rebuild.
+
+Pages are rendered as an anonymous visitor with an empty session. Embedded
+CSRF tokens are stripped, since they would not match the visitor's cookie;
+the templates' scripts fall back to the csrftoken cookie. nginx only serves
+the files to visitors who already have that cookie, and base.html requests
+it from pages:csrf_cookie when it is missing anyway.
+"""
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve, reverse
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.html'
+CSRF_TOKEN_RE = re.compile(
+    r'(<input type="hidden" name="csrfmiddlewaretoken" value=")[^"]*(")|'
+    r'(<meta name="csrf-token" content=")[^"]*(")'
+)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prerender')
+_write_lock = threading.Lock()
+
+
+def enabled():
+    return getattr(settings, 'PRERENDER', {}).get('enabled', False)
+
+
+def root():
+    return Path(getattr(settings, 'PRERENDER', {}).get('root') or Path(settings.BASE_DIR) / 'prerendered')
+
+
+# URLs -----------------------------------------------------------------------
+
+def home_urls():
+    return [reverse('gallery:home')]
+
+
+def category_urls(category):
+    return [reverse('gallery:category', kwargs={'category_name': category.name})]
+
+
+def all_urls():
+    """Every URL that is pre-rendered"""
+    from gallery.categories import all_categories
+    from gallery.models import Artwork
+
+    from .models import NewsUpdate, Page
+
+    urls = [*home_urls(), reverse('pages:about'), reverse('pages:news_list')]
+    for category in all_categories():
+        urls.extend(category_urls(category))
+    urls.extend(reverse('gallery:artwork_detail', kwargs={'pk': pk})
+                for pk in Artwork.objects.filter(is_active=True).values_list('pk', flat=True))
+    urls.extend(reverse('pages:page_detail', kwargs={'slug': slug})
+                for slug in Page.objects.filter(is_published=True).values_list('slug', flat=True))
+    urls.extend(reverse('pages:news_detail', kwargs={'slug': slug})
+                for slug in NewsUpdate.objects.filter(is_published=True).values_list('slug', flat=True))
+    return urls
+
+
+# Dependency graph: model label -> function(instance) returning the URLs to re-render.
+# A URL whose page no longer renders (404) has its file removed.
+
+def _artwork_dependents(artwork):
+    from gallery.categories import get_category
+
+    urls = [artwork.get_absolute_url(), *home_urls()]
+    category_ids = {artwork.category_id, getattr(artwork, '_loaded_values', {}).get('category_id')}
+    for category_id in category_ids:
+        category = get_category(category_id)
+        if category is not None:
+            urls.extend(category_urls(category))
+    return urls
+
+
+def _news_dependents(news_item):
+    return [news_item.get_absolute_url(), reverse('pages:news_list')]
+
+
+def _testimonial_dependents(testimonial):
+    urls = home_urls()
+    for artwork_id in {testimonial.related_artwork_id, getattr(testimonial, '_previous_artwork_id', None)}:
+        if artwork_id:
+            urls.append(reverse('gallery:artwork_detail', kwargs={'pk': artwork_id}))
+    return urls
+
+
+def _exhibition_dependents(exhibition):
+    return [*home_urls(), reverse('pages:about')]
+
+
+def _cv_dependents(instance):
+    return [reverse('pages:about')]
+
+
+def _gallery_settings_dependents(instance):
+    return home_urls()
+
+
+def _everything(instance):
+    return None
+
+
+DEPENDENTS = {
+    'gallery.artwork': _artwork_dependents,
+    'gallery.category': _everything,
+    'pages.newsupdate': _news_dependents,
+    'pages.page': _everything,  # may be (or have just left) the navigation
+    'pages.socialmedialink': _everything,
+    'pages.testimonial': _testimonial_dependents,
+    'pages.exhibition': _exhibition_dependents,
+    'pages.artisteducation': _cv_dependents,
+    'pages.artistaward': _cv_dependents,
+    'pages.artistpublication': _cv_dependents,
+    'pages.sitesettings': _everything,
+    'pages.gallerypagesettings': _gallery_settings_dependents,
+}
+
+
+def dependents(instance):
+    """URLs to re-render after a change to the instance; None means all of them"""
+    return DEPENDENTS[instance._meta.label_lower](instance)
+
+
+# Rendering ------------------------------------------------------------------
+
+def render_url(path):
+    """HTML of the page at path as an anonymous visitor sees it, or None if it isn't a 200"""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+
+    site_url = urlsplit(getattr(settings, 'SITE_URL', ''))
+    request = RequestFactory().get(path, HTTP_HOST=site_url.netloc or 'localhost', secure=site_url.scheme == 'https')
+    request.user = AnonymousUser()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response = response.render()
+    except Http404:
+        return None
+    except Exception:
+        logger.exception("Could not pre-render %s", path)
+        return None
+    if response.status_code != 200 or not response['Content-Type'].startswith('text/html'):
+        return None
+    return CSRF_TOKEN_RE.sub(lambda m: (m.group(1) or m.group(3)) + (m.group(2) or m.group(4)),
+                             response.content.decode(response.charset))
+
+
+def file_for(path):
+    return root() / path.strip('/') / INDEX_FILE
+
+
+def write(path, html):
+    target = file_for(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=target.parent, delete=False, suffix='.tmp') as fh:
+        fh.write(html)
+    os.chmod(fh.name, 0o644)
+    os.replace(fh.name, target)  # atomic, nginx never serves a half-written file
+
+
+def remove(path):
+    try:
+        file_for(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def build(paths):
+    """Re-render the given URLs; returns (written, removed) counts"""
+    written = removed = 0
+    with _write_lock:
+        for path in dict.fromkeys(paths):
+            html = render_url(path)
+            if html is None:
+                remove(path)
+                removed += 1
+            else:
+                write(path, html)
+                written += 1
+    return written, removed
+
+
+def build_all():
+    """Render every URL and delete files left from URLs that are gone; returns (written, removed)"""
+    urls = all_urls()
+    written, removed = build(urls)
+    keep = {file_for(path) for path in urls}
+    with _write_lock:
+        for existing in root().rglob(INDEX_FILE):
+            if existing not in keep:
+                existing.unlink()
+                removed += 1
+        for directory in sorted((d for d in root().rglob('*') if d.is_dir()), reverse=True):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+    return written, removed
+
+
+def clear():
+    shutil.rmtree(root(), ignore_errors=True)
+
+
+# Incremental rebuilds -------------------------------------------------------
+
+_pending = {'paths': set(), 'all': False, 'queued': False}
+_pending_lock = threading.Lock()
+
+
+def _run():
+    with _pending_lock:
+        paths = None if _pending['all'] else list(_pending['paths'])
+        _pending.update(paths=set(), all=False, queued=False)
+
+    close_old_connections()
+    try:
+        if paths is None:
+            build_all()
+        else:
+            build(paths)
+    except Exception:
+        logger.exception("Pre-rendering failed")
+    finally:
+        close_old_connections()
+
+
+def rebuild_async(paths):
+    """Queue URLs (None for everything) for re-rendering in the background thread.
+
+    Changes that arrive while a rebuild is waiting are merged into it, so a
+    burst of saves renders each page (the homepage, say) only once.
+    """
+    with _pending_lock:
+        if paths is None:
+            _pending['all'] = True
+        else:
+            _pending['paths'].update(paths)
+        if _pending['queued']:
+            return
+        _pending['queued'] = True
+    _executor.submit(_run)
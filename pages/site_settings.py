@@ -0,0 +1,41 @@
+"""
+Process-local cache of the singleton settings models.
+
+SiteSettings and GalleryPageSettings are single rows that change only when
+staff edit them in the admin, yet the homepage (and anything showing contact
+or footer data) reads them on every request. They are kept in a
+jasem_site.registry.VersionedRegistry, SiteSettings together with its
+hero_image artwork, invalidated by their post_save/post_delete signals and by
+changes to the hero artwork.
+
+The returned instances are shared between requests - treat them as read-only.
+"""
+from jasem_site.registry import VersionedRegistry
+
+VERSION_KEY = 'pages:settings:version'
+
+
+def _load():
+    from .models import GalleryPageSettings, SiteSettings
+
+    return {
+        'site': SiteSettings.objects.select_related('hero_image').first(),
+        'gallery': GalleryPageSettings.objects.first(),
+    }
+
+
+_registry = VersionedRegistry(VERSION_KEY, _load)
+
+
+def get_site_settings():
+    """The SiteSettings row (with hero_image loaded), or None if it was never created"""
+    return _registry.get()['site']
+
+
+def get_gallery_settings():
+    """The GalleryPageSettings row, or None if it was never created"""
+    return _registry.get()['gallery']
+
+
+def invalidate():
+    _registry.invalidate()
@@ -0,0 +1,194 @@
+"""
+sitemap.xml for crawlers.
+
+/sitemap.xml is a sitemap index with one entry per MAX_URLS chunk of each
+section, and /sitemap-<section>.xml?after=<id> lists one chunk. Chunks are
+keyset ranges on the primary key, so no query uses OFFSET, and both documents
+are streamed from iterator() over narrow only()/values_list() projections, so
+memory stays flat however many artworks there are.
+
+Every URL carries a lastmod taken from updated_at (a listing's lastmod is its
+newest entry's), and every index entry the newest lastmod in its chunk, so
+crawlers only refetch what changed. Exhibitions have no pages of their own;
+they count towards the about page's lastmod.
+"""
+from xml.sax.saxutils import escape
+
+from django.db.models import Max, Q
+from django.urls import reverse
+
+MAX_URLS = 50000
+CHUNK_SIZE = 2000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _url_entry(loc, lastmod, changefreq=None, priority=None):
+    parts = [f'<url><loc>{escape(loc)}</loc>']
+    if lastmod:
+        parts.append(f'<lastmod>{lastmod.isoformat()}</lastmod>')
+    if changefreq:
+        parts.append(f'<changefreq>{changefreq}</changefreq>')
+    if priority:
+        parts.append(f'<priority>{priority}</priority>')
+    parts.append('</url>\n')
+    return ''.join(parts)
+
+
+def _latest(*values):
+    values = [value for value in values if value]
+    return max(values) if values else None
+
+
+class ModelSection:
+    """Sitemap section listing one URL per row of a queryset"""
+    changefreq = 'weekly'
+    priority = None
+    fields = ('id', 'updated_at')
+
+    def queryset(self):
+        raise NotImplementedError
+
+    def location(self, obj):
+        return obj.get_absolute_url()
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+    def chunks(self):
+        """Yield (after id, newest updated_at) for each MAX_URLS chunk, from one streamed query"""
+        after, count, newest = 0, 0, None
+        rows = self.queryset().order_by('pk').values_list('pk', 'updated_at')
+        for pk, updated_at in rows.iterator(chunk_size=CHUNK_SIZE):
+            newest = _latest(newest, updated_at)
+            count += 1
+            if count == MAX_URLS:
+                yield after, newest
+                after, count, newest = pk, 0, None
+        if count or not after:
+            yield after, newest
+
+    def entries(self, base_url, after=0):
+        """Yield <url> elements for the chunk after the given id"""
+        objects = self.queryset().filter(pk__gt=after).order_by('pk').only(*self.fields)[:MAX_URLS]
+        for obj in objects.iterator(chunk_size=CHUNK_SIZE):
+            yield _url_entry(base_url + self.location(obj), self.lastmod(obj), self.changefreq, self.priority)
+
+
+class ArtworkSection(ModelSection):
+    priority = '0.8'
+
+    def queryset(self):
+        from gallery.models import Artwork
+        return Artwork.objects.filter(is_active=True)
+
+    def location(self, obj):
+        return reverse('gallery:artwork_detail', kwargs={'pk': obj.pk})
+
+
+class CategorySection(ModelSection):
+    changefreq = 'daily'
+    priority = '0.7'
+    fields = ('id', 'name', 'updated_at')
+
+    def queryset(self):
+        from gallery.models import Category
+        return Category.objects.annotate(
+            latest_artwork=Max('artwork__updated_at', filter=Q(artwork__is_active=True))
+        )
+
+    def chunks(self):
+        # A handful of rows: one chunk, dated by its newest listing
+        newest = None
+        for category in self.queryset().only(*self.fields):
+            newest = _latest(newest, self.lastmod(category))
+        yield 0, newest
+
+    def location(self, obj):
+        return reverse('gallery:category', kwargs={'category_name': obj.name})
+
+    def lastmod(self, obj):
+        return _latest(obj.updated_at, obj.latest_artwork)
+
+
+class PageSection(ModelSection):
+    changefreq = 'monthly'
+    fields = ('id', 'slug', 'updated_at')
+
+    def queryset(self):
+        from .models import Page
+        return Page.objects.filter(is_published=True)
+
+
+class NewsSection(ModelSection):
+    priority = '0.6'
+    fields = ('id', 'slug', 'updated_at')
+
+    def queryset(self):
+        from .models import NewsUpdate
+        return NewsUpdate.objects.filter(is_published=True)
+
+
+class StaticSection:
+    """The homepage, about page and news listing, dated by their newest content"""
+
+    def _pages(self):
+        from gallery.models import Artwork
+
+        from .models import ArtistAward, ArtistEducation, ArtistPublication, Exhibition, NewsUpdate, Page
+
+        def newest(queryset):
+            return queryset.aggregate(latest=Max('updated_at'))['latest']
+
+        return [
+            (reverse('gallery:home'), newest(Artwork.objects.filter(is_active=True)), 'daily', '1.0'),
+            (reverse('pages:about'), _latest(
+                newest(Page.objects.filter(page_type='about')),
+                newest(ArtistEducation.objects.all()),
+                newest(ArtistAward.objects.all()),
+                newest(Exhibition.objects.all()),
+                newest(ArtistPublication.objects.all()),
+            ), 'monthly', '0.8'),
+            (reverse('pages:news_list'), newest(NewsUpdate.objects.filter(is_published=True)), 'weekly', '0.6'),
+        ]
+
+    def chunks(self):
+        yield 0, _latest(*(lastmod for _, lastmod, _, _ in self._pages()))
+
+    def entries(self, base_url, after=0):
+        for location, lastmod, changefreq, priority in self._pages():
+            yield _url_entry(base_url + location, lastmod, changefreq, priority)
+
+
+SECTIONS = {
+    'static': StaticSection(),
+    'artworks': ArtworkSection(),
+    'categories': CategorySection(),
+    'pages': PageSection(),
+    'news': NewsSection(),
+}
+
+
+def stream_index(base_url):
+    """Yield the sitemap index document"""
+    yield XML_HEADER
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for name, section in SECTIONS.items():
+        for after, lastmod in section.chunks():
+            loc = base_url + reverse('sitemap_section', kwargs={'section': name})
+            if after:
+                loc += f'?after={after}'
+            yield f'<sitemap><loc>{escape(loc)}</loc>'
+            if lastmod:
+                yield f'<lastmod>{lastmod.isoformat()}</lastmod>'
+            yield '</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def stream_section(section, base_url, after=0):
+    """Yield one chunk of a section as a sitemap document"""
+    yield XML_HEADER
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    yield from SECTIONS[section].entries(base_url, after)
+    yield '</urlset>\n'
@@ -0,0 +1,17 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from pages import chrome
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def site_chrome(context, name):
+    """Render a cached navigation/footer fragment: {% site_chrome 'menu' %}"""
+    if name not in chrome.FRAGMENTS:
+        raise template.TemplateSyntaxError(f"Unknown site chrome fragment {name!r}")
+    # Fetched once per page render, however many fragments it shows
+    if 'site_chrome' not in context.render_context:
+        context.render_context['site_chrome'] = chrome.fragments()
+    return mark_safe(context.render_context['site_chrome'][name])
@@ -0,0 +1,161 @@
+"""
+Testimonials for the public site.
+
+Approved ratings are kept as running totals in TestimonialRatingSummary: one
+site-wide row (no artwork) and one row per artwork with approved testimonials.
+Approving, unapproving, re-rating, moving or deleting a testimonial applies
+the difference to those rows with F() updates inside the same transaction, so
+no page ever aggregates ratings. Artwork detail pages get their artwork's row
+through select_related('rating_summary') in the query that loads the artwork.
+
+The homepage carousel (approved testimonials, featured first) and the
+site-wide stats are cached as plain data until a testimonial changes.
+`manage.py rebuild_rating_summaries` recomputes the totals from scratch.
+"""
+import logging
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.urls import reverse
+
+from .models import Testimonial, TestimonialRatingSummary
+
+logger = logging.getLogger(__name__)
+
+CAROUSEL_KEY = 'pages:testimonials:carousel'
+CAROUSEL_SIZE = 8
+STAR_FIELDS = {stars: f'stars_{stars}' for stars in range(1, 6)}
+
+
+def rating_state(is_approved, artwork_id, rating):
+    """(artwork id, rating) the testimonial counts towards, or None while it isn't approved"""
+    return (artwork_id, rating) if is_approved else None
+
+
+def _add(artwork_id, rating, count):
+    """Add count ratings of the given stars (negative to remove) to the site and artwork totals"""
+    changes = {
+        'count': F('count') + count,
+        'rating_total': F('rating_total') + count * rating,
+        STAR_FIELDS[rating]: F(STAR_FIELDS[rating]) + count,
+    }
+    # The site row is created by the 0013 migration (or recompute) and only ever updated: a
+    # unique constraint doesn't stop two concurrent get_or_create calls inserting two NULL rows
+    if not TestimonialRatingSummary.objects.filter(artwork__isnull=True).update(**changes):
+        logger.error("Site-wide rating summary is missing, run manage.py rebuild_rating_summaries")
+    if artwork_id is not None:
+        rows = TestimonialRatingSummary.objects.filter(artwork_id=artwork_id)
+        if not rows.update(**changes):
+            TestimonialRatingSummary.objects.get_or_create(artwork_id=artwork_id)  # unique per artwork
+            rows.update(**changes)
+
+
+def record_change(old, new):
+    """Apply a testimonial moving from one rating_state to another"""
+    if old == new:
+        return
+    if old is not None:
+        _add(*old, -1)
+    if new is not None:
+        _add(*new, 1)
+
+
+def approve(queryset):
+    """Approve the testimonials in the queryset, adding their ratings set by set; returns how many"""
+    with transaction.atomic():
+        # is_approved is checked again under the lock, so one approved concurrently isn't counted twice
+        rows = list(Testimonial.objects.filter(
+            pk__in=list(queryset.filter(is_approved=False).values_list('pk', flat=True)), is_approved=False,
+        ).select_for_update().values_list('pk', 'related_artwork_id', 'rating'))
+        approved = Testimonial.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(is_approved=True)
+        groups = Counter((artwork_id, rating) for _, artwork_id, rating in rows)
+        for (artwork_id, rating), n in groups.items():
+            _add(artwork_id, rating, n)
+        transaction.on_commit(lambda: _bulk_changed({artwork_id for artwork_id, _ in groups}))
+    return approved
+
+
+def feature(queryset):
+    """Feature the testimonials in the queryset; returns how many"""
+    artwork_ids = set(queryset.values_list('related_artwork_id', flat=True))
+    featured = queryset.update(is_featured=True)
+    transaction.on_commit(lambda: _bulk_changed(artwork_ids))
+    return featured
+
+
+def _bulk_changed(artwork_ids):
+    """Queryset updates send no signals: drop the carousel and re-render the pages showing the testimonials"""
+    from . import prerender
+
+    invalidate()
+    if prerender.enabled():
+        prerender.rebuild_async(prerender.home_urls() + [
+            reverse('gallery:artwork_detail', kwargs={'pk': artwork_id}) for artwork_id in artwork_ids if artwork_id
+        ])
+
+
+def _empty_totals():
+    return {'count': 0, 'rating_total': 0, **{field: 0 for field in STAR_FIELDS.values()}}
+
+
+def recompute():
+    """Rebuild every summary from the approved testimonials; returns how many rows were written"""
+    totals = {None: _empty_totals()}
+    approved = Testimonial.objects.filter(is_approved=True).values('related_artwork_id', 'rating').annotate(
+        n=Count('pk')
+    ).order_by()
+    for group in approved:
+        for artwork_id in {None, group['related_artwork_id']}:
+            row = totals.setdefault(artwork_id, _empty_totals())
+            row['count'] += group['n']
+            row['rating_total'] += group['n'] * group['rating']
+            row[STAR_FIELDS[group['rating']]] += group['n']
+
+    with transaction.atomic():
+        TestimonialRatingSummary.objects.filter(artwork__isnull=False).exclude(artwork_id__in=list(totals)).delete()
+        for artwork_id, row in totals.items():
+            if artwork_id is not None:
+                TestimonialRatingSummary.objects.update_or_create(artwork_id=artwork_id, defaults=row)
+            elif not TestimonialRatingSummary.objects.filter(artwork__isnull=True).update(**row):
+                TestimonialRatingSummary.objects.create(**row)
+        transaction.on_commit(invalidate)
+    return len(totals)
+
+
+def _summary_data(summary):
+    if summary is None or not summary.count:
+        return None
+    return {'count': summary.count, 'average': summary.average, 'histogram': summary.histogram}
+
+
+def carousel():
+    """Cached {'testimonials': [...], 'summary': {...} or None} for the homepage"""
+    data = cache.get(CAROUSEL_KEY)
+    if data is None:
+        testimonials = Testimonial.objects.filter(is_approved=True).select_related('related_artwork').order_by(
+            '-is_featured', '-created_at'
+        )[:CAROUSEL_SIZE]
+        data = {
+            'testimonials': [
+                {
+                    'name': testimonial.name,
+                    'title': testimonial.title,
+                    'testimonial': testimonial.testimonial,
+                    'rating': testimonial.rating,
+                    'is_featured': testimonial.is_featured,
+                    'photo_url': testimonial.customer_photo.url if testimonial.customer_photo else '',
+                    'artwork_title': testimonial.related_artwork.title if testimonial.related_artwork else '',
+                    'artwork_url': testimonial.related_artwork.get_absolute_url() if testimonial.related_artwork else '',
+                }
+                for testimonial in testimonials
+            ],
+            'summary': _summary_data(TestimonialRatingSummary.objects.filter(artwork__isnull=True).first()),
+        }
+        cache.set(CAROUSEL_KEY, data, None)
+    return data
+
+
+def invalidate():
+    cache.delete(CAROUSEL_KEY)
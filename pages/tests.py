@@ -1,3 +1,223 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from gallery.models import Artwork, Category
+from . import contact_queue, news, prerender, testimonials
+from .models import ContactQueueItem, ContactSubmission, NewsUpdate, Testimonial, TestimonialRatingSummary
+
+
+SUMMARY_FIELDS = ('count', 'rating_total', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5')
+
+
+def make_artwork(category, title):
+    return Artwork.objects.create(
+        title=title, description='-', artist_statement='-', artwork_creation_date=date(2020, 1, 1),
+        height=10, width=10, main_image='artworks/test.jpg', price=100, category=category,
+    )
+
+
+class RatingSummaryTests(TestCase):
+    """The incrementally maintained summaries must always equal a full recompute()"""
+
+    def setUp(self):
+        cache.clear()
+        category, _ = Category.objects.get_or_create(
+            name='original_painting', defaults={'display_name': 'Original Painting'}
+        )
+        self.first = make_artwork(category, 'First')
+        self.second = make_artwork(category, 'Second')
+
+    def add(self, rating, artwork=None, approved=False):
+        return Testimonial.objects.create(
+            name='Collector', testimonial='-', rating=rating, related_artwork=artwork, is_approved=approved,
+        )
+
+    def snapshot(self):
+        # An artwork whose last rating moved away keeps an empty row until the next recompute
+        return {
+            summary.artwork_id: tuple(getattr(summary, field) for field in SUMMARY_FIELDS)
+            for summary in TestimonialRatingSummary.objects.all()
+            if summary.count or summary.artwork_id is None
+        }
+
+    def assertMatchesRecompute(self):
+        incremental = self.snapshot()
+        testimonials.recompute()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_site_row_exists_before_any_rating(self):
+        self.assertEqual(TestimonialRatingSummary.objects.filter(artwork__isnull=True).count(), 1)
+
+    def test_create_approve_rerate_move_and_delete(self):
+        self.add(5, self.first, approved=True)
+        self.add(4, approved=True)
+        pending = self.add(2, self.second)
+        self.assertMatchesRecompute()
+
+        pending.is_approved = True
+        pending.save()
+        self.assertMatchesRecompute()
+
+        pending = Testimonial.objects.get(pk=pending.pk)
+        pending.rating = 3
+        pending.related_artwork = self.first
+        pending.save()
+        self.assertMatchesRecompute()
+
+        pending.is_approved = False
+        pending.save()
+        self.assertMatchesRecompute()
+
+        Testimonial.objects.filter(rating=5).get().delete()
+        self.assertMatchesRecompute()
+
+        site = TestimonialRatingSummary.objects.get(artwork__isnull=True)
+        self.assertEqual((site.count, site.average), (1, 4.0))
+
+    def test_approve_counts_each_testimonial_once(self):
+        for rating in (5, 5, 3):
+            self.add(rating, self.first)
+        self.add(1)
+        self.add(4, self.second, approved=True)
+
+        self.assertEqual(testimonials.approve(Testimonial.objects.all()), 4)
+        # Already approved: a second run must not add them again
+        self.assertEqual(testimonials.approve(Testimonial.objects.all()), 0)
+        self.assertMatchesRecompute()
+
+        site = TestimonialRatingSummary.objects.get(artwork__isnull=True)
+        self.assertEqual((site.count, site.rating_total, site.stars_5), (5, 18, 2))
+        self.assertEqual(self.first.rating_summary.count, 3)
+
+    def test_recompute_drops_artworks_without_approved_ratings(self):
+        testimonial = self.add(5, self.first, approved=True)
+        Testimonial.objects.filter(pk=testimonial.pk).update(is_approved=False)  # no signals
+        testimonials.recompute()
+
+        self.assertFalse(TestimonialRatingSummary.objects.filter(artwork=self.first).exists())
+        self.assertEqual(TestimonialRatingSummary.objects.get(artwork__isnull=True).count, 0)
+
+    def test_recompute_recreates_missing_site_row(self):
+        self.add(4, approved=True)
+        TestimonialRatingSummary.objects.filter(artwork__isnull=True).delete()
+        testimonials.recompute()
+
+        site = TestimonialRatingSummary.objects.get(artwork__isnull=True)
+        self.assertEqual((site.count, site.stars_4), (1, 1))
+
+
+@override_settings(PRERENDER={'enabled': True})
+class PrerenderDependentsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.painting, _ = Category.objects.get_or_create(
+            name='original_painting', defaults={'display_name': 'Original Painting'}
+        )
+        self.sculpture, _ = Category.objects.get_or_create(
+            name='original_sculpture', defaults={'display_name': 'Original Sculpture'}
+        )
+        self.rebuild = self.enterContext(mock.patch.object(prerender, 'rebuild_async'))
+
+    def rebuilt_paths(self):
+        return {path for call in self.rebuild.call_args_list for path in call.args[0]}
+
+    def test_moving_an_artwork_rebuilds_both_categories(self):
+        artwork = Artwork.objects.get(pk=make_artwork(self.painting, 'Bronze').pk)
+        artwork.category = self.sculpture
+        artwork.price = 50  # also a price drop, so the wishlist receiver runs as well
+        with self.captureOnCommitCallbacks(execute=True):
+            artwork.save()
+
+        paths = self.rebuilt_paths()
+        self.assertIn(prerender.category_urls(self.painting)[0], paths)
+        self.assertIn(prerender.category_urls(self.sculpture)[0], paths)
+        self.assertIn(artwork.get_absolute_url(), paths)
+
+    def test_later_save_only_rebuilds_the_current_category(self):
+        artwork = Artwork.objects.get(pk=make_artwork(self.painting, 'Bronze').pk)
+        artwork.category = self.sculpture
+        artwork.save()
+        self.rebuild.reset_mock()
+        artwork.title = 'Bronze II'
+        with self.captureOnCommitCallbacks(execute=True):
+            artwork.save()
+
+        paths = self.rebuilt_paths()
+        self.assertNotIn(prerender.category_urls(self.painting)[0], paths)
+        self.assertIn(prerender.category_urls(self.sculpture)[0], paths)
+
+
+class ContactAttachmentTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        media_root, private_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        for path in (media_root, private_root):
+            self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, PRIVATE_MEDIA_ROOT=private_root))
+        self.enterContext(mock.patch.object(contact_queue, 'MAX_ATTACHMENT_SIZE', 1024))
+        self.media_root, self.private_root = Path(media_root), Path(private_root)
+
+    def post(self, content):
+        return self.client.post(reverse('pages:contact'), {
+            'name': 'Visitor', 'email': 'visitor@example.com', 'subject': 'Commission', 'message': 'Hello',
+            'attachment': SimpleUploadedFile('My Sketch.pdf', content),
+        }, headers={'X-Requested-With': 'XMLHttpRequest'})
+
+    def test_oversized_attachment_is_refused_before_storing(self):
+        response = self.post(b'%PDF-' + b'x' * 2048)
+        self.assertIn('attachment', response.json()['errors'])
+        self.assertFalse(ContactQueueItem.objects.exists())
+        self.assertEqual(list(self.private_root.rglob('*.*')), [])
+
+    def test_queued_attachment_is_private_until_accepted(self):
+        self.assertTrue(self.post(b'%PDF-1.4 sketch').json()['success'])
+        item = ContactQueueItem.objects.get()
+        self.assertNotIn('Sketch', item.attachment.name)
+        self.assertTrue((self.private_root / item.attachment.name).exists())
+        self.assertEqual(list(self.media_root.rglob('*.*')), [])
+
+        self.assertEqual(contact_queue.persist_queued(), 1)
+        submission = ContactSubmission.objects.get()
+        self.assertEqual(submission.attachment.name, 'contact_attachments/My_Sketch.pdf')
+        self.assertEqual(list(self.private_root.rglob('*.*')), [])
+
+
+class NewsListTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for n in range(news.PER_PAGE + 2):
+            NewsUpdate.objects.create(title=f'News {n}', slug=f'news-{n}', summary='-', content='-')
+
+    def fragment_cached(self, cursor):
+        return cache.get(make_template_fragment_key('news_list', [news.news_version(), cursor])) is not None
+
+    def test_only_the_first_page_is_cached(self):
+        response = self.client.get(reverse('pages:news_list'))
+        self.assertTrue(self.fragment_cached(''))
+
+        cursor = response.context['news_page']['next_cursor']
+        response = self.client.get(reverse('pages:news_list'), {'after': cursor})
+        self.assertEqual(len(response.context['news_page']['items']), 2)
+        self.assertFalse(self.fragment_cached(cursor))
+
+    def test_unusable_cursor_shows_the_latest_news(self):
+        response = self.client.get(reverse('pages:news_list'), {'after': 'junk'})
+        self.assertEqual(response.context['cursor'], '')
+        self.assertFalse(self.fragment_cached('junk'))
+
+    def test_feed_links_follow_the_urlconf(self):
+        content, _ = news.build_feed('atom')
+        self.assertIn(reverse('pages:news_list').encode(), content)
+        self.assertIn(reverse('pages:news_feed', args=['atom']).encode(), content)
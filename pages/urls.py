@@ -4,9 +4,12 @@ from . import views
 app_name = 'pages'
 
 urlpatterns = [
+    path('csrf/', views.csrf_cookie, name='csrf_cookie'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
     path('page/<slug:slug>/', views.page_detail, name='page_detail'),
+    path('exhibitions/archive/', views.exhibition_archive, name='exhibition_archive'),
     path('news/', views.news_list, name='news_list'),
+    path('news/feed/<str:kind>/', views.news_feed, name='news_feed'),
     path('news/<slug:slug>/', views.news_detail, name='news_detail'),
 ]
\ No newline at end of file
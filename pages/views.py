@@ -1,38 +1,34 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 import json
 import logging
-from .models import Page, NewsUpdate, ContactSubmission
+import re
+from .about import get_snapshot as about_snapshot
+from .contact_queue import clean_attachment, clean_contact_data, enqueue
+from .exhibitions import archive_page
+from .models import Page, NewsUpdate
+from .news import FEEDS, decode_cursor, feed_last_modified, news_page, news_version, read_feed
+from .sitemaps import SECTIONS as SITEMAP_SECTIONS, stream_index, stream_section
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+@ensure_csrf_cookie
+def csrf_cookie(request):
+    """Sets the csrftoken cookie for pages served pre-rendered, whose embedded tokens are stripped"""
+    return HttpResponse(status=204)
+
+
 def about(request):
     """About page view"""
-    from .models import ArtistEducation, ArtistAward, Exhibition, ArtistPublication
-    
-    try:
-        about_page = Page.objects.get(page_type='about', is_published=True)
-    except Page.DoesNotExist:
-        about_page = None
-    
-    # Get artist education and credentials
-    education_list = ArtistEducation.objects.all()
-    awards_list = ArtistAward.objects.all()
-    exhibitions_list = Exhibition.objects.filter(is_featured=True)[:6]  # Show featured exhibitions
-    publications_list = ArtistPublication.objects.all()[:5]  # Show recent 5 publications
-    
     context = {
-        'page': about_page,
-        'education_list': education_list,
-        'awards_list': awards_list,
-        'exhibitions_list': exhibitions_list,
-        'publications_list': publications_list,
+        **about_snapshot(),
         'page_title': 'About Jasem Shuman - Palestinian Contemporary Artist',
         'meta_description': 'Learn about Jasem Shuman, a contemporary Palestinian artist creating powerful paintings and sculptures.',
     }
@@ -40,83 +36,39 @@ def about(request):
 
 
 def contact(request):
-    """Contact page view with form submission"""
+    """Contact page view; posts are validated and queued, the worker does the rest"""
     if request.method == 'POST':
-        # Handle AJAX form submission
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            try:
-                # Debug: Log request details
-                logger.info(f"Received AJAX request")
-                logger.info(f"Content-Type: {request.content_type}")
-                logger.info(f"Request body length: {len(request.body)}")
-                
-                # Parse JSON data
-                try:
-                    data = json.loads(request.body)
-                    logger.info(f"Successfully parsed JSON data: {list(data.keys())}")
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON decode error: {e}")
-                    return JsonResponse({'success': False, 'errors': {'general': f'JSON decode error: {str(e)}'}})
-                
-                name = data.get('name', '').strip()
-                email = data.get('email', '').strip()
-                phone = data.get('phone', '').strip()
-                contact_type = data.get('contact_type', 'general')
-                subject = data.get('subject', '').strip()
-                message = data.get('message', '').strip()
-                
-                logger.info(f"Form data: name={name}, email={email}, subject={subject}")
-                
-                # Validation
-                errors = {}
-                if not name:
-                    errors['name'] = 'Name is required'
-                if not email:
-                    errors['email'] = 'Email is required'
-                if not subject:
-                    errors['subject'] = 'Subject is required'
-                if not message:
-                    errors['message'] = 'Message is required'
-                
-                if errors:
-                    logger.info(f"Validation errors: {errors}")
-                    return JsonResponse({'success': False, 'errors': errors})
-                
-                # Save contact submission
-                try:
-                    submission = ContactSubmission.objects.create(
-                        name=name,
-                        email=email,
-                        phone=phone,
-                        contact_type=contact_type,
-                        subject=subject,
-                        message=message
-                    )
-                    logger.info(f"Contact submission created successfully: {submission.id}")
-                except Exception as e:
-                    logger.error(f"Database error creating submission: {e}")
-                    return JsonResponse({'success': False, 'errors': {'general': f'Database error: {str(e)}'}})
-                
-                # For now, let's skip email sending to isolate the issue
-                logger.info("Skipping email sending for debugging")
-                
-                return JsonResponse({'success': True, 'message': 'Message sent successfully! (Debug mode - emails skipped)'})
-                
-            except Exception as e:
-                error_message = f"Error: {type(e).__name__}: {str(e)}"
-                logger.error(f"General error in contact form: {error_message}")
-                return JsonResponse({'success': False, 'errors': {'general': error_message}})
+        is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
         
-        # Handle regular form submission (fallback)
-        name = request.POST.get('name', '').strip()
-        email = request.POST.get('email', '').strip()
-        phone = request.POST.get('phone', '').strip()
-        contact_type = request.POST.get('contact_type', 'general')
-        subject = request.POST.get('subject', '').strip()
-        message = request.POST.get('message', '').strip()
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body)
+            except json.JSONDecodeError:
+                return JsonResponse({'success': False, 'errors': {'general': 'Invalid request data'}})
+            if not isinstance(data, dict):
+                return JsonResponse({'success': False, 'errors': {'general': 'Invalid request data'}})
+        else:
+            data = request.POST
         
-        # Basic validation
-        if not all([name, email, subject, message]):
+        cleaned, errors = clean_contact_data(data)
+        attachment, upload = request.FILES.get('attachment'), None
+        if data.get('attachment_token') and not errors:
+            # Sent ahead in chunks by the page's script (gallery/uploads.py)
+            from gallery import uploads
+            try:
+                upload = uploads.claim(data['attachment_token'], 'contact_attachment', request.user)
+            except uploads.UploadError as e:
+                errors['attachment'] = str(e)
+            else:
+                attachment = uploads.open_file(upload)
+        attachment_error = clean_attachment(attachment) if not errors else None
+        if attachment_error:
+            errors['attachment'] = attachment_error
+        if errors:
+            if upload is not None:
+                attachment.close()
+            if is_ajax:
+                return JsonResponse({'success': False, 'errors': errors})
             messages.error(request, 'Please fill in all required fields.')
             return render(request, 'pages/contact.html', {
                 'form_data': request.POST,
@@ -124,16 +76,13 @@ def contact(request):
                 'meta_description': 'Get in touch with Jasem Shuman for commissions, exhibitions, or general inquiries.',
             })
         
-        # Save contact submission
-        ContactSubmission.objects.create(
-            name=name,
-            email=email,
-            phone=phone,
-            contact_type=contact_type,
-            subject=subject,
-            message=message
-        )
+        enqueue(cleaned, attachment)
+        if upload is not None:
+            attachment.close()
+            uploads.release(upload)
         
+        if is_ajax:
+            return JsonResponse({'success': True, 'message': 'Thank you for your message! We will get back to you soon.'})
         messages.success(request, 'Thank you for your message! We will get back to you soon.')
         return render(request, 'pages/contact.html', {'success': True})
     
@@ -161,17 +110,78 @@ def page_detail(request, slug):
 
 
 def news_list(request):
-    """News and updates listing"""
-    news_updates = NewsUpdate.objects.filter(is_published=True).order_by('-publish_date')
+    """News and updates listing, one keyset page at a time"""
+    cursor = request.GET.get('after', '')
+    if decode_cursor(cursor) is None:
+        cursor = ''  # an unusable cursor shows the latest news
     
     context = {
-        'news_updates': news_updates,
+        # Only evaluated when the cached fragment has to be rendered
+        'news_page': SimpleLazyObject(lambda: news_page(cursor)),
+        'news_version': news_version(),
+        'cursor': cursor,
+        # Only the first page is cached: every distinct ?after would otherwise add a fragment
+        'fragment_timeout': 0 if cursor else 600,
         'page_title': 'News & Updates - Jasem Shuman Art',
         'meta_description': 'Latest news, exhibitions, and updates from Palestinian artist Jasem Shuman.',
     }
     return render(request, 'pages/news_list.html', context)
 
 
+def news_feed(request, kind):
+    """Atom/RSS feed, served from the file regenerated whenever news changes"""
+    if kind not in FEEDS:
+        raise Http404
+    
+    @condition(last_modified_func=lambda request: feed_last_modified(kind))
+    def serve(request):
+        content, content_type = read_feed(kind)
+        return HttpResponse(content, content_type=content_type)
+    
+    return serve(request)
+
+
+def _int_param(request, name, minimum, maximum):
+    """Integer query parameter (ASCII digits only), None if absent; ValueError if invalid or out of range"""
+    value = request.GET.get(name, '')
+    if not value:
+        return None
+    if not re.fullmatch(r'[0-9]{1,18}', value) or not minimum <= int(value) <= maximum:
+        raise ValueError(f"Invalid {name}")
+    return int(value)
+
+
+def exhibition_archive(request):
+    """JSON archive of exhibitions grouped by year, newest first; page with ?before=<year>"""
+    try:
+        before = _int_param(request, 'before', 1, 9999)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    featured = {'1': True, 'true': True, '0': False, 'false': False}.get(request.GET.get('featured', '').lower())
+    return JsonResponse(archive_page(before, featured))
+
+
+def sitemap_index(request):
+    """sitemap.xml: an index of every section's sitemap chunks, streamed"""
+    base_url = request.build_absolute_uri('/').rstrip('/')
+    return StreamingHttpResponse(stream_index(base_url), content_type='application/xml')
+
+
+def sitemap_section(request, section):
+    """One chunk of a section's sitemap, starting after the id given in ?after="""
+    if section not in SITEMAP_SECTIONS:
+        raise Http404("No such sitemap")
+    try:
+        after = _int_param(request, 'after', 0, 2 ** 63 - 1) or 0
+    except ValueError:
+        raise Http404("No such sitemap")
+    base_url = request.build_absolute_uri('/').rstrip('/')
+    return StreamingHttpResponse(
+        stream_section(section, base_url, after),
+        content_type='application/xml',
+    )
+
+
 def news_detail(request, slug):
     """Individual news article view"""
     news_item = get_object_or_404(NewsUpdate, slug=slug, is_published=True)
@@ -1,7 +1,25 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
+from gallery.changelist import CachedChoicesListFilter, LargeTableAdminMixin
 from .models import Order, OrderItem, ShippingAddress, PaymentInfo, Cart, CartItem
+from .rankings import record_order
+
+
+class ShippingCountryListFilter(CachedChoicesListFilter):
+    title = 'shipping country'
+    parameter_name = 'shipping_address__country'
+
+    def get_choices(self, request, model_admin):
+        countries = ShippingAddress.objects.exclude(country='').order_by('country').values_list(
+            'country', flat=True
+        ).distinct()
+        return [(country, country) for country in countries]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(shipping_address__country=self.value())
+        return queryset
 
 
 class OrderItemInline(admin.TabularInline):
@@ -12,10 +30,10 @@ class OrderItemInline(admin.TabularInline):
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'customer_name', 'order_status', 'total_amount', 
                    'created_at', 'payment_status', 'shipping_country']
-    list_filter = ['order_status', 'created_at', 'payment_info__is_paid', 'shipping_address__country']
+    list_filter = ['order_status', 'created_at', 'payment_info__is_paid', ShippingCountryListFilter]
     search_fields = ['customer__username', 'customer__email', 
                     'shipping_address__full_name', 'id']
     readonly_fields = ['total_amount', 'created_at', 'updated_at']
@@ -58,23 +76,29 @@ class OrderAdmin(admin.ModelAdmin):
         return "No payment info"
     payment_status.short_description = 'Payment Status'
     
+    def _update_status(self, queryset, status):
+        # A bulk update skips Order.save(), so cancelled orders are put back into the rankings here
+        for order in queryset.filter(order_status='cancelled'):
+            record_order(order)
+        queryset.update(order_status=status)
+    
     def mark_as_confirmed(self, request, queryset):
-        queryset.update(order_status='confirmed')
+        self._update_status(queryset, 'confirmed')
         self.message_user(request, f'{queryset.count()} orders marked as confirmed.')
     mark_as_confirmed.short_description = 'Mark as Confirmed'
     
     def mark_as_processing(self, request, queryset):
-        queryset.update(order_status='processing')
+        self._update_status(queryset, 'processing')
         self.message_user(request, f'{queryset.count()} orders marked as processing.')
     mark_as_processing.short_description = 'Mark as Processing'
     
     def mark_as_shipped(self, request, queryset):
-        queryset.update(order_status='shipped')
+        self._update_status(queryset, 'shipped')
         self.message_user(request, f'{queryset.count()} orders marked as shipped.')
     mark_as_shipped.short_description = 'Mark as Shipped'
     
     def mark_as_delivered(self, request, queryset):
-        queryset.update(order_status='delivered')
+        self._update_status(queryset, 'delivered')
         self.message_user(request, f'{queryset.count()} orders marked as delivered.')
     mark_as_delivered.short_description = 'Mark as Delivered'
     
@@ -83,7 +107,7 @@ class OrderAdmin(admin.ModelAdmin):
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['order_link', 'artwork', 'artwork_category', 'quantity', 'unit_price', 'total_price']
     list_filter = ['order__order_status', 'order__created_at', 'artwork__category']
     search_fields = ['artwork__title', 'order__id']
@@ -141,7 +165,7 @@ class CartItemInline(admin.TabularInline):
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['cart_owner', 'items_count', 'total_price', 'created_at', 'updated_at']
     list_filter = ['created_at', 'updated_at']
     search_fields = ['user__username', 'user__email', 'session_key']
@@ -161,7 +185,7 @@ class CartAdmin(admin.ModelAdmin):
 
 
 @admin.register(CartItem)
-class CartItemAdmin(admin.ModelAdmin):
+class CartItemAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['cart_owner', 'artwork', 'artwork_category', 'quantity', 'total_price']
     list_filter = ['cart__created_at', 'artwork__category']
     search_fields = ['cart__user__username', 'artwork__title']
@@ -0,0 +1,41 @@
+"""
+Anonymous cart identity.
+
+Anonymous carts are found by a random key stored in the session, not by the
+session key itself. The session key changes on every write with signed-cookie
+sessions and can be rotated by the cache backends, while the cart key is just
+session data and works the same whatever SESSION_ENGINE is in use. Setting it
+also avoids the extra INSERT of request.session.create(); the session is
+written once, by the middleware, at the end of the request.
+
+Carts created before the cart key existed were keyed by the DB session key;
+those are still found (and adopted) as long as the session survives.
+"""
+import secrets
+
+CART_SESSION_KEY = 'cart_key'
+
+
+def get_cart_key(request, create=False):
+    """Key of the anonymous visitor's cart, or None; with create=True one is always returned"""
+    session = getattr(request, 'session', None)
+    if session is None:
+        return None
+
+    cart_key = session.get(CART_SESSION_KEY)
+    if cart_key:
+        return cart_key
+
+    # Legacy carts: Cart.session_key holds the (32 character) DB/cache session key
+    legacy_key = session.session_key
+    if legacy_key and len(legacy_key) <= 32:
+        if not create:
+            return legacy_key
+        cart_key = legacy_key
+    elif not create:
+        return None
+    else:
+        cart_key = secrets.token_hex(16)
+
+    session[CART_SESSION_KEY] = cart_key
+    return cart_key
@@ -1,3 +1,4 @@
+from .carts import get_cart_key
 from .models import Cart
 
 
@@ -15,18 +16,18 @@ def cart_context(request):
                 cart_count = 0
         else:
             # For anonymous users, check session-based cart
-            if hasattr(request, 'session'):
-                # Only look for existing session, don't create new one here
-                # to avoid session creation on every request
-                if request.session.session_key:
-                    try:
-                        cart = Cart.objects.get(session_key=request.session.session_key)
-                        cart_count = cart.total_items
-                    except Cart.DoesNotExist:
-                        cart_count = 0
-                else:
-                    # No session key means no cart yet
+            # Only look for an existing cart key, don't create one here
+            # to avoid session writes on every request
+            cart_key = get_cart_key(request)
+            if cart_key:
+                try:
+                    cart = Cart.objects.get(session_key=cart_key)
+                    cart_count = cart.total_items
+                except Cart.DoesNotExist:
                     cart_count = 0
+            else:
+                # No cart key means no cart yet
+                cart_count = 0
     except Exception as e:
         # Fallback to 0 if anything goes wrong
         cart_count = 0
@@ -0,0 +1,109 @@
+"""
+Cached snapshot of the admin dashboard.
+
+The payload is built by build_snapshot() and kept in the cache with the time
+it was built. Staff page views read the cached copy. Once it is older than
+FRESH_FOR seconds, the page is still served from it and a rebuild is started
+in a background thread (stale-while-revalidate). A cache lock makes sure only
+one rebuild runs at a time across all workers, however many staff have the
+dashboard open. The refresh_dashboard management command rebuilds it on a
+schedule (cron) so page views rarely find it stale.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Order
+from .rankings import WINDOWS, top_artworks
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'store:dashboard:snapshot'
+LOCK_KEY = 'store:dashboard:rebuilding'
+FRESH_FOR = 60  # seconds before a snapshot is considered stale
+LOCK_TIMEOUT = 300  # safety net in case a rebuild dies without releasing the lock
+
+
+def build_snapshot():
+    """Compute the full dashboard payload"""
+    now = timezone.now()
+    week_ago = now - timedelta(days=7)
+
+    # Order statistics in one pass over the table
+    order_counts = Order.objects.aggregate(
+        total_orders=Count('id'),
+        pending_orders=Count('id', filter=Q(order_status='pending')),
+        processing_orders=Count('id', filter=Q(order_status='processing')),
+        shipped_orders=Count('id', filter=Q(order_status='shipped')),
+    )
+
+    # Revenue statistics
+    revenue = Order.objects.filter(payment_info__is_paid=True).aggregate(
+        total_revenue=Sum('total_amount'),
+        weekly_revenue=Sum('total_amount', filter=Q(created_at__gte=week_ago)),
+    )
+
+    recent_orders = list(Order.objects.select_related('customer', 'payment_info').order_by('-created_at')[:10])
+
+    # Best sellers by units over each ranking window
+    popular_artworks = [(days, top_artworks(days=days, limit=5)) for days in WINDOWS]
+
+    top_countries = list(Order.objects.exclude(
+        shipping_address__country=''
+    ).values('shipping_address__country').annotate(
+        order_count=Count('id')
+    ).order_by('-order_count')[:10])
+
+    return {
+        **order_counts,
+        'total_revenue': revenue['total_revenue'] or 0,
+        'weekly_revenue': revenue['weekly_revenue'] or 0,
+        'recent_orders': recent_orders,
+        'popular_artworks': popular_artworks,
+        'top_countries': top_countries,
+        'built_at': now,
+    }
+
+
+def rebuild_snapshot():
+    """Build the payload and store it; returns the new snapshot"""
+    snapshot = build_snapshot()
+    cache.set(SNAPSHOT_KEY, snapshot, None)
+    return snapshot
+
+
+def _rebuild_in_background():
+    try:
+        rebuild_snapshot()
+    except Exception:
+        logger.exception("Dashboard snapshot rebuild failed")
+    finally:
+        cache.delete(LOCK_KEY)
+        connection.close()
+
+
+def refresh_async():
+    """Start a background rebuild unless one is already running; returns True if started"""
+    if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        return False
+    threading.Thread(target=_rebuild_in_background, name='dashboard-refresh', daemon=True).start()
+    return True
+
+
+def is_refreshing():
+    return cache.get(LOCK_KEY) is not None
+
+
+def get_snapshot():
+    """Cached snapshot, rebuilt in the background once stale; built inline only on a cold cache"""
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        return rebuild_snapshot()
+    if timezone.now() - snapshot['built_at'] > timedelta(seconds=FRESH_FOR):
+        refresh_async()
+    return snapshot
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.dashboard import rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the cached admin dashboard snapshot (run from cron, or with --interval as a long-running refresher)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and rebuild every N seconds (default: rebuild once and exit)')
+
+    def handle(self, *args, **options):
+        while True:
+            snapshot = rebuild_snapshot()
+            self.stdout.write(f"Dashboard snapshot rebuilt at {snapshot['built_at']:%Y-%m-%d %H:%M:%S}")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
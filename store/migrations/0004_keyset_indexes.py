@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0003_alter_cartitem_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['-created_at', '-id'], name='store_cart_created_5933ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['-created_at', '-id'], name='store_carti_created_e24a6e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at', '-id'], name='store_order_created_ac7ace_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['-created_at', '-id'], name='store_order_created_85ec4d_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_sculptureimage_height_sculptureimage_width'),
+        ('store', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtworkSalesDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('artwork', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_days', to='gallery.artwork')),
+            ],
+            options={
+                'verbose_name': 'Artwork Sales (Daily)',
+                'verbose_name_plural': 'Artwork Sales (Daily)',
+                'indexes': [models.Index(fields=['date', 'artwork'], name='store_artwo_date_482b9d_idx')],
+                'unique_together': {('artwork', 'date')},
+            },
+        ),
+    ]
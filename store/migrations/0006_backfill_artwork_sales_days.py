@@ -0,0 +1,37 @@
+# Generated manually to seed the best-seller rankings from existing orders
+
+from django.db import migrations
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_sales_days(apps, schema_editor):
+    """Build ArtworkSalesDay rows from the order items placed so far, leaving out cancelled orders"""
+    OrderItem = apps.get_model('store', 'OrderItem')
+    ArtworkSalesDay = apps.get_model('store', 'ArtworkSalesDay')
+    
+    items = OrderItem.objects.exclude(order__order_status='cancelled')
+    totals = items.annotate(day=TruncDate('created_at')).values('artwork', 'day').annotate(
+        units=Sum('quantity'),
+        revenue=Sum('total_price'),
+    ).order_by()
+    
+    ArtworkSalesDay.objects.bulk_create([
+        ArtworkSalesDay(artwork_id=row['artwork'], date=row['day'], units=row['units'], revenue=row['revenue'])
+        for row in totals.iterator()
+    ], batch_size=1000)
+
+
+def clear_sales_days(apps, schema_editor):
+    apps.get_model('store', 'ArtworkSalesDay').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0005_artworksalesday'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sales_days, clear_sales_days),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from gallery.models import Artwork, TimestampedModel
 
@@ -28,15 +30,40 @@ class Order(TimestampedModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['-created_at', '-id'])]
     
     def __str__(self):
         return f"Order #{self.id} - {self.customer.username} - ${self.total_amount}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept so a save can tell when the order was cancelled or un-cancelled (best-seller rankings)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     def save(self, *args, **kwargs):
         # Auto-calculate total
         if self.subtotal is not None and self.shipping_cost is not None:
             self.total_amount = self.subtotal + self.shipping_cost
         super().save(*args, **kwargs)
+        
+        loaded = getattr(self, '_loaded_values', {})
+        if 'order_status' in loaded and (loaded['order_status'] == 'cancelled') != (self.order_status == 'cancelled'):
+            from .rankings import record_order
+            record_order(self, 1 if loaded['order_status'] == 'cancelled' else -1)
+        self._loaded_values = {**loaded, 'order_status': self.order_status}
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_account_summary(sender, instance, **kwargs):
+    """Refresh the customer's profile page summary when an order changes"""
+    from accounts.summary import invalidate
+    invalidate(instance.customer_id)
+
+
+SALE_FIELDS = ('artwork_id', 'quantity', 'total_price')
 
 
 class OrderItem(TimestampedModel):
@@ -48,10 +75,22 @@ class OrderItem(TimestampedModel):
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     
+    class Meta:
+        indexes = [models.Index(fields=['-created_at', '-id'])]
+    
     def __str__(self):
         return f"{self.artwork.title} - {self.quantity}x"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the rankings counted for this item, so a later save only applies the difference
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        
         # Auto-calculate total price
         if self.unit_price and self.quantity:
             self.total_price = self.unit_price * self.quantity
@@ -63,6 +102,20 @@ class OrderItem(TimestampedModel):
         
         super().save(*args, **kwargs)
         
+        # Count the sale towards the best-seller rankings, or apply what changed since it was counted.
+        # Items of a cancelled order don't count; un-cancelling the order adds them as they are then.
+        from .rankings import record_item
+        counted = getattr(self, '_loaded_values', {})
+        if not Order.objects.filter(pk=self.order_id, order_status='cancelled').exists():
+            if is_new:
+                record_item(self)
+            elif all(name in counted for name in SALE_FIELDS) and any(
+                counted[name] != getattr(self, name) for name in SALE_FIELDS
+            ):
+                record_item(OrderItem(created_at=self.created_at, **{name: counted[name] for name in SALE_FIELDS}), -1)
+                record_item(self)
+        self._loaded_values = {**counted, **{name: getattr(self, name) for name in SALE_FIELDS}}
+        
         # Update artwork inventory
         if self.artwork.is_limited_edition:
             self.artwork.sold_copies += self.quantity
@@ -73,6 +126,15 @@ class OrderItem(TimestampedModel):
             self.artwork.save()
 
 
+@receiver(post_delete, sender=OrderItem)
+def remove_sale(sender, instance, **kwargs):
+    """A deleted item no longer counts towards the best-seller rankings"""
+    from .rankings import record_item
+    # Deleting an order deletes its items first, so the order is still there to check
+    if Order.objects.filter(pk=instance.order_id).exclude(order_status='cancelled').exists():
+        record_item(instance, -1)
+
+
 class ShippingAddress(TimestampedModel):
     """Shipping addresses for orders"""
     order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='shipping_address')
@@ -154,6 +216,9 @@ class Cart(TimestampedModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     session_key = models.CharField(max_length=32, null=True, blank=True)
     
+    class Meta:
+        indexes = [models.Index(fields=['-created_at', '-id'])]
+    
     def __str__(self):
         if self.user:
             return f"Cart for {self.user.username}"
@@ -177,6 +242,7 @@ class CartItem(TimestampedModel):
     
     class Meta:
         unique_together = ['cart', 'artwork']
+        indexes = [models.Index(fields=['-created_at', '-id'])]
     
     def __str__(self):
         return f"{self.artwork.title} - {self.quantity}x"
@@ -188,3 +254,20 @@ class CartItem(TimestampedModel):
     @property
     def total_price(self):
         return self.unit_price * self.quantity
+
+
+class ArtworkSalesDay(models.Model):
+    """Units sold and revenue per artwork per day, kept up to date as orders are placed"""
+    artwork = models.ForeignKey(Artwork, on_delete=models.CASCADE, related_name='sales_days')
+    date = models.DateField()
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        unique_together = ['artwork', 'date']
+        indexes = [models.Index(fields=['date', 'artwork'])]
+        verbose_name = "Artwork Sales (Daily)"
+        verbose_name_plural = "Artwork Sales (Daily)"
+    
+    def __str__(self):
+        return f"{self.artwork_id} on {self.date}: {self.units} sold"
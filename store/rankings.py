@@ -0,0 +1,79 @@
+"""
+Best-seller rankings over sliding windows.
+
+Every OrderItem adds its quantity and total to a per-artwork, per-day
+ArtworkSalesDay row (the day it was placed). Editing or deleting an item
+applies the difference, and cancelling an order takes its items back out
+until it is un-cancelled. A ranking over the last N days only sums the rows in that
+window, so it never has to scan order history. Ranked results are cached.
+Each recorded sale bumps a version key, so readers never see a ranking older
+than the last order.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from gallery.models import Artwork
+from .models import ArtworkSalesDay
+
+WINDOWS = (7, 30, 365)
+VERSION_KEY = 'store:rankings:version'
+CACHE_TIMEOUT = 60 * 60
+
+
+def record_sale(artwork_id, quantity, revenue, day=None):
+    """Add a sale to the artwork's bucket for the given day (today by default)"""
+    day = day or timezone.localdate()
+    bucket, _ = ArtworkSalesDay.objects.get_or_create(artwork_id=artwork_id, date=day)
+    ArtworkSalesDay.objects.filter(pk=bucket.pk).update(
+        units=F('units') + quantity,
+        revenue=F('revenue') + revenue,
+    )
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def record_item(item, sign=1):
+    """Add (sign=1) or take back (sign=-1) an order item's sale, in the bucket of the day it was placed"""
+    record_sale(item.artwork_id, sign * item.quantity, sign * item.total_price,
+                day=timezone.localdate(item.created_at))
+
+
+def record_order(order, sign=1):
+    """Add or take back every item of an order, when it leaves or enters the cancelled status"""
+    for item in order.items.all():
+        record_item(item, sign)
+
+
+def top_artworks(days=30, limit=5, order_by='units', public=False):
+    """
+    Top artworks over the last `days` days as dicts with artwork, units and revenue.
+
+    order_by is 'units' or 'revenue'. public=True leaves out inactive artworks.
+    """
+    version = cache.get(VERSION_KEY, 0)
+    cache_key = f'store:rankings:{version}:{days}:{limit}:{order_by}:{int(public)}'
+    ranking = cache.get(cache_key)
+    if ranking is not None:
+        return ranking
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = ArtworkSalesDay.objects.filter(date__gte=since)
+    if public:
+        rows = rows.filter(artwork__is_active=True)
+    rows = list(rows.values('artwork').annotate(
+        units=Sum('units'),
+        revenue=Sum('revenue'),
+    ).order_by(f'-{order_by}', 'artwork')[:limit])
+
+    artworks = Artwork.objects.select_related('category').in_bulk([row['artwork'] for row in rows])
+    ranking = [
+        {'artwork': artworks[row['artwork']], 'units': row['units'], 'revenue': row['revenue']}
+        for row in rows if row['artwork'] in artworks
+    ]
+    cache.set(cache_key, ranking, CACHE_TIMEOUT)
+    return ranking
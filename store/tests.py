@@ -1,3 +1,137 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
 from django.test import TestCase
+from django.utils import timezone
+
+from gallery.models import Artwork, Category
+from . import rankings
+from .admin import OrderAdmin
+from .models import ArtworkSalesDay, Order, OrderItem
+
+
+def make_artwork(category, title, price):
+    return Artwork.objects.create(
+        title=title, description='-', artist_statement='-', artwork_creation_date=date(2020, 1, 1),
+        height=10, width=10, main_image='artworks/test.jpg', price=price, category=category,
+        is_limited_edition=True, total_copies=100,
+    )
+
+
+class SalesBucketTests(TestCase):
+    """ArtworkSalesDay buckets must equal the order items they were built from"""
+
+    def setUp(self):
+        cache.clear()
+        category, _ = Category.objects.get_or_create(
+            name='signed_print_painting', defaults={'display_name': 'Signed Print'}
+        )
+        self.print_a = make_artwork(category, 'Print', Decimal('50.00'))
+        # Same title: rankings group by artwork, not by title
+        self.print_b = make_artwork(category, 'Print', Decimal('80.00'))
+        customer = User.objects.create_user('buyer', 'buyer@example.com', 'password')
+        self.order = Order.objects.create(customer=customer, subtotal=0, total_amount=0)
+
+    def sell(self, artwork, quantity):
+        return OrderItem.objects.create(order=self.order, artwork=artwork, quantity=quantity, unit_price=artwork.price)
+
+    def buckets(self):
+        # A bucket whose sales were all taken back stays behind, empty
+        return {
+            (row.artwork_id, row.date): (row.units, row.revenue)
+            for row in ArtworkSalesDay.objects.all() if row.units
+        }
+
+    def recomputed(self):
+        """What the 0006 backfill migration builds from the order items"""
+        items = OrderItem.objects.exclude(order__order_status='cancelled')
+        totals = items.annotate(day=TruncDate('created_at')).values('artwork', 'day').annotate(
+            units=Sum('quantity'), revenue=Sum('total_price'),
+        ).order_by()
+        return {(row['artwork'], row['day']): (row['units'], row['revenue']) for row in totals}
+
+    def test_buckets_match_order_items(self):
+        self.sell(self.print_a, 2)
+        self.sell(self.print_a, 1)
+        self.sell(self.print_b, 4)
+        self.assertEqual(self.buckets(), self.recomputed())
+        self.assertEqual(self.buckets()[(self.print_a.pk, timezone.localdate())], (3, Decimal('150.00')))
+
+    def test_updating_an_item_does_not_count_it_again(self):
+        item = self.sell(self.print_a, 2)
+        item.save()
+        self.assertEqual(self.buckets(), self.recomputed())
+
+    def test_item_changes_and_deletes_are_applied(self):
+        item = self.sell(self.print_a, 2)
+        self.sell(self.print_b, 1)
+        item = OrderItem.objects.get(pk=item.pk)
+        item.quantity = 5
+        item.save()
+        self.assertEqual(self.buckets(), self.recomputed())
+
+        item.artwork = self.print_b
+        item.save()
+        self.assertEqual(self.buckets(), self.recomputed())
+        self.assertNotIn((self.print_a.pk, timezone.localdate()), self.buckets())
+
+        item.delete()
+        self.assertEqual(self.buckets(), self.recomputed())
+
+    def test_cancelled_orders_do_not_count(self):
+        self.sell(self.print_a, 2)
+        order = Order.objects.get(pk=self.order.pk)
+        order.order_status = 'cancelled'
+        order.save()
+        self.assertEqual(self.buckets(), {})
+        # Changes to a cancelled order's items are not counted either
+        self.sell(self.print_b, 1)
+        self.assertEqual(self.buckets(), {})
+
+        order.order_status = 'confirmed'
+        order.save()
+        self.assertEqual(self.buckets(), self.recomputed())
+        self.assertEqual(self.buckets()[(self.print_b.pk, timezone.localdate())], (1, Decimal('80.00')))
+
+        # The admin's bulk status actions bypass Order.save()
+        order.order_status = 'cancelled'
+        order.save()
+        OrderAdmin(Order, admin.site)._update_status(Order.objects.all(), 'processing')
+        self.assertEqual(self.buckets(), self.recomputed())
+
+    def test_deleting_an_order_takes_its_sales_back(self):
+        self.sell(self.print_a, 2)
+        other = Order.objects.create(customer=self.order.customer, subtotal=0, total_amount=0)
+        OrderItem.objects.create(order=other, artwork=self.print_a, quantity=1, unit_price=self.print_a.price)
+        self.order.delete()
+        self.assertEqual(self.buckets(), self.recomputed())
+        self.assertEqual(self.buckets()[(self.print_a.pk, timezone.localdate())], (1, Decimal('50.00')))
+
+    def test_ranking_by_units_and_revenue(self):
+        self.sell(self.print_a, 3)
+        self.sell(self.print_b, 2)
+
+        by_units = rankings.top_artworks(days=7, order_by='units')
+        self.assertEqual(
+            [(row['artwork'].pk, row['units']) for row in by_units], [(self.print_a.pk, 3), (self.print_b.pk, 2)]
+        )
+        by_revenue = rankings.top_artworks(days=7, order_by='revenue')
+        self.assertEqual([row['artwork'].pk for row in by_revenue], [self.print_b.pk, self.print_a.pk])
+
+    def test_ranking_window_and_new_sales(self):
+        self.sell(self.print_a, 1)
+        rankings.record_sale(self.print_b.pk, 10, Decimal('800.00'), day=timezone.localdate() - timedelta(days=10))
+
+        self.assertEqual([row['artwork'].pk for row in rankings.top_artworks(days=7)], [self.print_a.pk])
+        self.assertEqual(
+            [row['artwork'].pk for row in rankings.top_artworks(days=30)], [self.print_b.pk, self.print_a.pk]
+        )
 
-# Create your tests here.
+        # A sale bumps the version, so the cached 7-day ranking is not served again
+        self.sell(self.print_b, 5)
+        self.assertEqual(rankings.top_artworks(days=7)[0]['artwork'].pk, self.print_b.pk)
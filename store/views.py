@@ -1,12 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 from django.db import models
 from decimal import Decimal
+from .carts import get_cart_key
 from .models import Cart, CartItem, Order, OrderItem, ShippingAddress, PaymentInfo
-from gallery.models import Artwork, Category
+from .rankings import top_artworks
+from gallery.categories import all_categories, get_category_by_name
+from gallery.models import Artwork
 import json
 
 
@@ -16,6 +19,7 @@ def debug_cart(request):
     debug_info = {
         'user_authenticated': request.user.is_authenticated,
         'session_key': request.session.session_key,
+        'cart_key': get_cart_key(request),
         'cart_count_from_context': 0,
         'carts_in_db': [],
         'cart_items': []
@@ -61,7 +65,7 @@ def get_cart_count(request):
 def store_home(request):
     """Store homepage with categories"""
     # Get all categories
-    categories = Category.objects.all()
+    categories = all_categories()
     
     # Get artwork counts and sample artworks for each category
     category_data = []
@@ -87,6 +91,7 @@ def store_home(request):
     context = {
         'page_title': 'Store - Jasem Shuman Art',
         'categories': category_data,
+        'best_sellers': top_artworks(days=30, limit=4, public=True),
     }
     return render(request, 'store/home.html', context)
 
@@ -94,7 +99,9 @@ def store_home(request):
 def category_view(request, category_name):
     """Display artworks for a specific category"""
     # Get the category
-    category = get_object_or_404(Category, name=category_name)
+    category = get_category_by_name(category_name)
+    if category is None:
+        raise Http404("No Category matches the given query.")
     
     # Get artworks for this category that are available
     artworks = Artwork.objects.filter(
@@ -130,9 +137,10 @@ def cart_view(request):
             pass
     else:
         # For anonymous users, check session-based cart
-        if request.session.session_key:
+        cart_key = get_cart_key(request)
+        if cart_key:
             try:
-                cart = Cart.objects.get(session_key=request.session.session_key)
+                cart = Cart.objects.get(session_key=cart_key)
                 cart_items = cart.items.all()
                 cart_total = cart.total_price
                 cart_count = cart.total_items
@@ -171,10 +179,8 @@ def add_to_cart(request):
         if request.user.is_authenticated:
             cart, created = Cart.objects.get_or_create(user=request.user)
         else:
-            # For anonymous users, use session
-            if not request.session.session_key:
-                request.session.create()
-            cart, created = Cart.objects.get_or_create(session_key=request.session.session_key)
+            # For anonymous users, use the cart key kept in the session
+            cart, created = Cart.objects.get_or_create(session_key=get_cart_key(request, create=True))
         
         # Get or create cart item
         cart_item, created = CartItem.objects.get_or_create(
@@ -232,7 +238,8 @@ def update_cart_item(request):
             if cart_item.cart.user != request.user:
                 return JsonResponse({'success': False, 'message': 'Unauthorized'})
         else:
-            if cart_item.cart.session_key != request.session.session_key:
+            cart_key = get_cart_key(request)
+            if not cart_key or cart_item.cart.session_key != cart_key:
                 return JsonResponse({'success': False, 'message': 'Unauthorized'})
         
         # Update quantity
@@ -271,7 +278,8 @@ def remove_cart_item(request):
             if cart_item.cart.user != request.user:
                 return JsonResponse({'success': False, 'message': 'Unauthorized'})
         else:
-            if cart_item.cart.session_key != request.session.session_key:
+            cart_key = get_cart_key(request)
+            if not cart_key or cart_item.cart.session_key != cart_key:
                 return JsonResponse({'success': False, 'message': 'Unauthorized'})
         
         # Get cart for response